@@ -0,0 +1,499 @@
+"""Benchmark de latência por etapa das Lambdas de detecção e OCR."""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from local_store import LocalDynamoDB, LocalS3Client
+from metrics import Metrics
+from result_cache import RESULT_CACHE_MAX_ENTRIES, ResultCache
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+UPLOAD_BUCKET_NAME = "upload-image-first-stage-prod"
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Resume uma lista de durações.
+
+    Args:
+        samples (List[float]): Durações em segundos.
+
+    Returns:
+        Dict[str, float]: Quantidade, média e percentis, em milissegundos.
+    """
+    values = np.asarray(samples) * 1000
+    summary = {"count": len(samples), "mean_ms": round(float(values.mean()), 3)}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}_ms"] = round(
+            float(np.percentile(values, percentile)), 3
+        )
+    return summary
+
+
+class StageTimer:
+    """
+    Mede a duração das etapas substituindo métodos por versões cronometradas.
+
+    Os métodos são trocados apenas nas instâncias (ou módulos) do benchmark, sem
+    alterar o código das Lambdas.
+    """
+
+    def __init__(self):
+        """Inicializa o cronômetro sem amostras."""
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """
+        Registra uma duração.
+
+        Args:
+            stage (str): Nome da etapa.
+            seconds (float): Duração em segundos.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def wrap(
+        self,
+        owner: Any,
+        name: str,
+        stage: str,
+        lock: Optional[threading.Lock] = None,
+    ) -> None:
+        """
+        Substitui ``owner.name`` por uma versão que registra sua duração.
+
+        Args:
+            owner (Any): Objeto ou módulo dono do atributo.
+            name (str): Nome do método ou função.
+            stage (str): Etapa em que a duração é registrada.
+            lock (Optional[threading.Lock]): Trava adquirida antes da medição,
+                para serializar modelos que não aceitam chamadas concorrentes.
+
+        Returns:
+            None
+        """
+        original = getattr(owner, name)
+
+        def timed(*args, **kwargs):
+            with lock or contextlib.nullcontext():
+                start = time.perf_counter()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self.record(stage, time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+
+    def wrap_get_object(self, s3_client: Any) -> None:
+        """
+        Cronometra o ``get_object`` incluindo a leitura do corpo.
+
+        No boto3 o corpo é lido depois da chamada; aqui ele é lido por completo
+        dentro da medição e devolvido em memória.
+
+        Args:
+            s3_client (Any): Cliente S3 a ser instrumentado.
+
+        Returns:
+            None
+        """
+        original = s3_client.get_object
+
+        def timed_get_object(**kwargs):
+            start = time.perf_counter()
+            response = original(**kwargs)
+            data = response["Body"].read()
+            self.record("s3_get", time.perf_counter() - start)
+            return {**response, "Body": io.BytesIO(data)}
+
+        s3_client.get_object = timed_get_object
+
+    def reset(self) -> None:
+        """
+        Descarta as amostras registradas.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self.samples.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Resume as amostras de cada etapa.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Resumo de ``summarize`` por etapa.
+        """
+        with self._lock:
+            return {
+                stage: summarize(samples)
+                for stage, samples in sorted(self.samples.items())
+            }
+
+
+def list_images(corpus_dir: str, limit: Optional[int]) -> List[str]:
+    """
+    Lista as imagens do corpus em ordem fixa.
+
+    Args:
+        corpus_dir (str): Diretório das imagens.
+        limit (Optional[int]): Quantidade máxima de imagens, ou None.
+
+    Returns:
+        List[str]: Caminhos das imagens.
+    """
+    paths = sorted(
+        os.path.join(corpus_dir, name)
+        for name in os.listdir(corpus_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    return paths[:limit] if limit else paths
+
+
+def git_revision() -> Dict[str, Any]:
+    """
+    Identifica o commit em que o benchmark foi executado.
+
+    Returns:
+        Dict[str, Any]: Hash do commit e se havia alterações não commitadas.
+    """
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+        dirty = bool(
+            subprocess.check_output(
+                ["git", "status", "--porcelain", "--untracked-files=no"],
+                text=True,
+                stderr=subprocess.DEVNULL,
+            ).strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+class Pipeline:
+    """Detecção e OCR instrumentados sobre os substitutos locais do S3/DynamoDB."""
+
+    def __init__(self, local_root: str, model_dir: str, with_ocr: bool):
+        """
+        Cria os componentes e instrumenta suas etapas.
+
+        Args:
+            local_root (str): Diretório dos objetos do S3 local.
+            model_dir (str): Diretório dos arquivos do modelo de detecção.
+            with_ocr (bool): Se o OCR também deve ser executado.
+        """
+        # Importados aqui para que o backend escolhido por variável de ambiente
+        # seja lido depois da configuração feita em main()
+        import plate_detection
+        from plate_detection import PLATE_BUCKET_NAME, PlateDetection, plate_crop_key
+
+        self.plate_bucket = PLATE_BUCKET_NAME
+        self.plate_crop_key = plate_crop_key
+        self.s3_client = LocalS3Client(local_root)
+        # Tabelas só em memória: gravar o JSON a cada item distorceria a medição
+        self.dynamodb = LocalDynamoDB()
+        self.timer = StageTimer()
+        # Os tempos são medidos pelo próprio benchmark; as métricas das Lambdas
+        # não são publicadas
+        metrics = Metrics("benchmark", sink="none")
+
+        self.detection = PlateDetection(
+            s3_client=self.s3_client,
+            dynamodb=self.dynamodb,
+            model_dir=model_dir,
+            metrics=metrics,
+        )
+        self.ocr_detection = None
+        if with_ocr:
+            from ocr_plate_detection import OCRPlateDetection
+
+            self.ocr_detection = OCRPlateDetection(
+                s3_client=self.s3_client, dynamodb=self.dynamodb, metrics=metrics
+            )
+
+        self._instrument(plate_detection)
+
+    def _instrument(self, plate_detection_module: Any) -> None:
+        """Troca os métodos de cada etapa pelas versões cronometradas."""
+        timer = self.timer
+        timer.wrap_get_object(self.s3_client)
+        # O upload_fileobj do cliente local também passa pelo put_object
+        timer.wrap(self.s3_client, "put_object", "upload")
+        timer.wrap(plate_detection_module, "decode_for_detection", "decode")
+        timer.wrap(self.detection, "to_full_resolution", "decode_full")
+        # O modelo é compartilhado pelas threads; as chamadas são serializadas,
+        # como em um contêiner Lambda, e a espera pela trava não entra na medição
+        timer.wrap(self.detection.backend, "predict", "inference", threading.Lock())
+        timer.wrap(self.detection, "encode_crop", "crop_encode")
+        timer.wrap(self.detection.table, "put_item", "dynamodb_write")
+        if self.ocr_detection is not None:
+            timer.wrap(self.ocr_detection, "recognize_batch", "ocr", threading.Lock())
+            if self.ocr_detection.table is not self.detection.table:
+                timer.wrap(self.ocr_detection.table, "put_item", "dynamodb_write")
+            timer.wrap(self.ocr_detection.table, "update_item", "dynamodb_write")
+
+    def use_memory_result_cache(self, max_entries: int) -> None:
+        """
+        Troca o cache de resultados das etapas por um só em memória.
+
+        O nível persistente nunca é usado, qualquer que seja ``RESULT_CACHE_TABLE``;
+        com ``max_entries`` igual a 0, toda imagem passa pelo caminho completo.
+
+        Args:
+            max_entries (int): Quantidade máxima de entradas em memória.
+
+        Returns:
+            None
+        """
+        self.detection.result_cache = ResultCache(
+            "detect", None, max_entries=max_entries
+        )
+        if self.ocr_detection is not None:
+            self.ocr_detection.result_cache = ResultCache(
+                "ocr", None, max_entries=max_entries
+            )
+
+    def upload_corpus(self, image_paths: List[str], repeat: int) -> List[str]:
+        """
+        Grava as imagens do corpus no bucket de upload local, fora da medição.
+
+        Cada repetição recebe chaves próprias, para que duas threads nunca
+        processem a mesma imagem (e os mesmos recortes) ao mesmo tempo.
+
+        Args:
+            image_paths (List[str]): Caminhos das imagens.
+            repeat (int): Quantas cópias de cada imagem são gravadas.
+
+        Returns:
+            List[str]: Chaves das imagens no bucket.
+        """
+        keys = []
+        for copy in range(repeat):
+            for path in image_paths:
+                key = f"{copy}_{os.path.basename(path)}"
+                with open(path, "rb") as file:
+                    self.s3_client.put_object(
+                        Bucket=UPLOAD_BUCKET_NAME, Key=key, Body=file.read()
+                    )
+                keys.append(key)
+        self.timer.reset()
+        return keys
+
+    def process(self, image_key: str) -> float:
+        """
+        Processa uma imagem como a Lambda de detecção e, em seguida, a de OCR.
+
+        Args:
+            image_key (str): Chave da imagem no bucket de upload.
+
+        Returns:
+            float: Duração total, em segundos.
+        """
+        start = time.perf_counter()
+        self.detection.process_image(UPLOAD_BUCKET_NAME, image_key)
+
+        if self.ocr_detection is not None:
+            # Cada recorte gravado no bucket de placas é o gatilho da Lambda de OCR
+            index = 0
+            while True:
+                crop_key = self.plate_crop_key(image_key, index)
+                crop_path = os.path.join(
+                    self.s3_client.root, self.plate_bucket, crop_key
+                )
+                if not os.path.exists(crop_path):
+                    break
+                self.ocr_detection.process_image(self.plate_bucket, crop_key)
+                os.remove(crop_path)
+                index += 1
+        return time.perf_counter() - start
+
+
+def run_level(pipeline: Pipeline, keys: List[str], concurrency: int) -> Dict[str, Any]:
+    """
+    Processa o corpus com um nível de concorrência e resume as medições.
+
+    Args:
+        pipeline (Pipeline): Componentes instrumentados.
+        keys (List[str]): Chaves das imagens.
+        concurrency (int): Quantidade de imagens processadas em paralelo.
+
+    Returns:
+        Dict[str, Any]: Vazão, latência de ponta a ponta e latência por etapa.
+    """
+    pipeline.timer.reset()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(pipeline.process, keys))
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "images": len(keys),
+        "wall_s": round(wall, 3),
+        "throughput_ips": round(len(keys) / wall, 3),
+        "end_to_end": summarize(latencies),
+        "stages": pipeline.timer.summary(),
+    }
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """
+    Mostra as medições em tabelas de texto.
+
+    Args:
+        results (List[Dict[str, Any]]): Resultados de ``run_level``.
+
+    Returns:
+        None
+    """
+    for level in results:
+        print(
+            f"\nconcurrency={level['concurrency']}  images={level['images']}  "
+            f"throughput={level['throughput_ips']:.2f} img/s"
+        )
+        print(f"{'stage':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        rows = {**level["stages"], "end_to_end": level["end_to_end"]}
+        for stage, summary in rows.items():
+            print(
+                f"{stage:<16}{summary['count']:>7}{summary['p50_ms']:>10.2f}"
+                f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}"
+            )
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    """
+    Mostra a variação do p50 e do p95 de cada etapa em relação a um resultado anterior.
+
+    Args:
+        baseline (Dict[str, Any]): Resultado anterior (JSON deste benchmark).
+        current (Dict[str, Any]): Resultado atual.
+
+    Returns:
+        None
+    """
+    print(
+        f"\nComparação com {baseline['git'].get('commit')} "
+        f"(variação percentual; negativo é mais rápido)"
+    )
+    previous = {level["concurrency"]: level for level in baseline["results"]}
+    for level in current["results"]:
+        old = previous.get(level["concurrency"])
+        if old is None:
+            continue
+        print(
+            f"concurrency={level['concurrency']}  throughput "
+            f"{old['throughput_ips']:.2f} -> {level['throughput_ips']:.2f} img/s"
+        )
+        old_rows = {**old["stages"], "end_to_end": old["end_to_end"]}
+        rows = {**level["stages"], "end_to_end": level["end_to_end"]}
+        for stage, summary in rows.items():
+            if stage not in old_rows:
+                continue
+            deltas = [
+                (
+                    (summary[key] - old_rows[stage][key]) / old_rows[stage][key] * 100
+                    if old_rows[stage][key]
+                    else 0.0
+                )
+                for key in ("p50_ms", "p95_ms")
+            ]
+            print(f"  {stage:<16}p50 {deltas[0]:+7.1f}%   p95 {deltas[1]:+7.1f}%")
+
+
+def main() -> None:
+    """Executa o benchmark e grava os resultados em JSON."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--corpus", required=True, help="Diretório das imagens.")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--concurrency", default="1,2,4,8")
+    parser.add_argument(
+        "--backend", default=os.environ.get("PLATE_INFERENCE_BACKEND", "torch")
+    )
+    parser.add_argument("--model-dir", default="../lambda_detect_plate")
+    parser.add_argument("--no-ocr", action="store_true", help="Mede só a detecção.")
+    parser.add_argument(
+        "--with-cache",
+        action="store_true",
+        help="Mantém o cache de resultados (por padrão, toda imagem é inferida).",
+    )
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior.")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    os.environ["PLATE_INFERENCE_BACKEND"] = args.backend
+    levels = [int(value) for value in args.concurrency.split(",")]
+    image_paths = list_images(args.corpus, args.limit)
+    if not image_paths:
+        sys.exit(f"Nenhuma imagem encontrada em {args.corpus}")
+
+    with contextlib.ExitStack() as stack:
+        local_root = stack.enter_context(tempfile.TemporaryDirectory())
+        pipeline = Pipeline(local_root, args.model_dir, not args.no_ocr)
+        pipeline.use_memory_result_cache(
+            RESULT_CACHE_MAX_ENTRIES if args.with_cache else 0
+        )
+        keys = pipeline.upload_corpus(image_paths, args.repeat)
+
+        if not args.verbose:
+            # Os logs das Lambdas (stderr) e as mensagens impressas pelas
+            # bibliotecas de inferência (stdout) ficariam misturados ao relatório
+            logging.disable(logging.INFO)
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+
+        # Aquecimento com a primeira imagem, fora da medição
+        pipeline.process(keys[0])
+        results = [run_level(pipeline, keys, level) for level in levels]
+
+    report = {
+        "git": git_revision(),
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "backend": args.backend,
+            "corpus": os.path.abspath(args.corpus),
+            "images": len(image_paths),
+            "repeat": args.repeat,
+            "ocr": not args.no_ocr,
+            "result_cache": args.with_cache,
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    print_report(results)
+    print(f"\nResultados gravados em {args.output}")
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            compare(json.load(file), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Verificação de paridade entre os backends Paddle e ONNX do reconhecedor."""
+
+import argparse
+import json
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+import cv2
+import numpy as np
+from benchmark import list_images
+from local_store import LocalDynamoDB, LocalS3Client
+from metrics import Metrics
+from ocr_plate_detection import OCRPlateDetection
+from recognizer_backend import RecognizerBackend, create_recognizer, ctc_decode
+
+
+def compare_crop(
+    ocr: OCRPlateDetection,
+    reference: RecognizerBackend,
+    candidate: RecognizerBackend,
+    path: str,
+) -> Dict[str, Any]:
+    """
+    Reconhece um recorte com os dois backends e compara as saídas.
+
+    Args:
+        ocr (OCRPlateDetection): Instância usada no pré-processamento.
+        reference (RecognizerBackend): Backend de referência (Paddle).
+        candidate (RecognizerBackend): Backend comparado (ONNX).
+        path (str): Caminho do recorte.
+
+    Returns:
+        Dict[str, Any]: Textos, confianças e a maior diferença entre as
+        probabilidades dos dois modelos.
+    """
+    imagem = cv2.imread(path, cv2.IMREAD_COLOR)
+    batch = np.ascontiguousarray(
+        ocr.preprocess_batch([imagem])[np.newaxis], dtype=np.float32
+    )
+
+    preds_reference = reference.predict(batch)
+    preds_candidate = candidate.predict(batch)
+    ((texto_reference, conf_reference),) = ctc_decode(
+        preds_reference, reference.characters
+    )
+    ((texto_candidate, conf_candidate),) = ctc_decode(
+        preds_candidate, candidate.characters
+    )
+    return {
+        "path": path,
+        "paddle": [texto_reference, round(conf_reference, 5)],
+        "onnx": [texto_candidate, round(conf_candidate, 5)],
+        "same_text": texto_reference == texto_candidate,
+        "confidence_diff": abs(conf_reference - conf_candidate),
+        "max_prob_diff": float(np.abs(preds_reference - preds_candidate).max()),
+    }
+
+
+def main() -> None:
+    """Compara os backends em um conjunto fixo de recortes e falha se divergirem."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--crops", required=True, help="Diretório dos recortes.")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--max-confidence-diff",
+        type=float,
+        default=0.01,
+        help="Maior diferença de confiança aceita em um recorte.",
+    )
+    parser.add_argument("--output", default="ocr_parity.json")
+    args = parser.parse_args()
+
+    paths = list_images(args.crops, args.limit)
+    if not paths:
+        sys.exit(f"Nenhum recorte encontrado em {args.crops}")
+
+    with tempfile.TemporaryDirectory() as local_root:
+        ocr = OCRPlateDetection(
+            s3_client=LocalS3Client(local_root),
+            dynamodb=LocalDynamoDB(),
+            metrics=Metrics("parity", sink="none"),
+        )
+        pipeline = ocr.full_pipeline()
+        if pipeline is None:
+            sys.exit("A referência precisa do PaddleOCR instalado")
+        reference = create_recognizer(
+            "paddle", ocr.rec_model_dir, pipeline.text_recognizer
+        )
+        candidate = create_recognizer("onnx", ocr.rec_model_dir)
+        if candidate.characters != reference.characters:
+            sys.exit("O dicionário do modelo ONNX difere do dicionário do PaddleOCR")
+        results: List[Dict[str, Any]] = [
+            compare_crop(ocr, reference, candidate, path) for path in paths
+        ]
+
+    divergent = [
+        result
+        for result in results
+        if not result["same_text"]
+        or result["confidence_diff"] > args.max_confidence_diff
+    ]
+    for result in divergent:
+        print(f"DIVERGENTE {result['path']}: {result['paddle']} x {result['onnx']}")
+    print(
+        f"{len(results) - len(divergent)}/{len(results)} recortes iguais; "
+        f"maior diferença de probabilidade "
+        f"{max(result['max_prob_diff'] for result in results):.2e}"
+    )
+
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    if divergent:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
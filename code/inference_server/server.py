@@ -0,0 +1,387 @@
+"""Módulo com o servidor HTTP de detecção de placas com micro-batching dinâmico."""
+
+import argparse
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from aiohttp import web
+from botocore.exceptions import ClientError
+from local_store import LocalDynamoDB, LocalS3Client
+from plate_detection import LoadedImage, PlateDetection, plate_crop_key
+
+# Bucket das imagens enviadas no corpo da requisição. Não pode ser o bucket de
+# upload das Lambdas (upload-image-first-stage-prod): o gatilho dele acionaria o
+# lambda_detect_plate e cada imagem seria detectada e gravada duas vezes
+SERVER_UPLOAD_BUCKET = os.environ.get(
+    "SERVER_UPLOAD_BUCKET", "upload-image-inference-server-prod"
+)
+# Códigos de erro do S3 respondidos como 404; os demais viram 502
+S3_NOT_FOUND_CODES = ("NoSuchKey", "NoSuchBucket", "404")
+METRICS_FLUSH_SECONDS = 60
+
+
+class MicroBatcher:
+    """
+    Agrupa requisições concorrentes em lotes para uma única chamada ao modelo.
+
+    Um lote é disparado quando atinge ``max_batch_size`` itens ou quando o
+    primeiro item do lote espera ``max_wait_ms``. A fila é limitada: quando está
+    cheia, ``submit`` levanta ``asyncio.QueueFull`` e o chamador deve recusar a
+    requisição (backpressure).
+    """
+
+    def __init__(
+        self,
+        predict: Callable[[List[Any]], List[Any]],
+        max_batch_size: int,
+        max_wait_ms: float,
+        queue_size: int,
+    ):
+        """
+        Inicializa o agrupador.
+
+        Args:
+            predict (Callable[[List[Any]], List[Any]]): Função que processa um lote
+                e retorna um resultado por item, na mesma ordem.
+            max_batch_size (int): Tamanho máximo de um lote.
+            max_wait_ms (float): Espera máxima pelo fechamento de um lote, em ms.
+            queue_size (int): Quantidade máxima de itens aguardando na fila.
+        """
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # O modelo roda em uma única thread; os lotes são executados em sequência
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.items = 0
+        self.rejected = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Enfileira um item e aguarda o resultado do lote em que ele entrar.
+
+        Args:
+            item (Any): Item a ser processado.
+
+        Returns:
+            Any: Resultado do item.
+
+        Raises:
+            asyncio.QueueFull: Se a fila estiver cheia.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise
+        return await future
+
+    async def run(self) -> None:
+        """
+        Laço que monta e executa os lotes até ser cancelado.
+
+        Returns:
+            None
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.predict, [item for item, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores do agrupador.
+
+        Returns:
+            Dict[str, Any]: Lotes, itens, tamanho médio dos lotes, rejeições e fila.
+        """
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "rejected": self.rejected,
+            "queued": self.queue.qsize(),
+        }
+
+
+class InferenceServer:
+    """Servidor HTTP que expõe o PlateDetection com micro-batching."""
+
+    def __init__(
+        self,
+        detection: PlateDetection,
+        max_batch_size: int,
+        max_wait_ms: float,
+        queue_size: int,
+        persist_workers: int,
+        upload_bucket: str = SERVER_UPLOAD_BUCKET,
+    ):
+        """
+        Inicializa o servidor.
+
+        Args:
+            detection (PlateDetection): Detector com o modelo e a persistência.
+            max_batch_size (int): Tamanho máximo de um lote.
+            max_wait_ms (float): Espera máxima pelo fechamento de um lote, em ms.
+            queue_size (int): Quantidade máxima de imagens aguardando o modelo.
+            persist_workers (int): Threads para decodificação e persistência.
+            upload_bucket (str): Bucket, sem gatilho, das imagens enviadas no corpo.
+        """
+        self.detection = detection
+        self.upload_bucket = upload_bucket
+        self.batcher = MicroBatcher(
+            detection.detect, max_batch_size, max_wait_ms, queue_size
+        )
+        # Separado do io_pool do detector, que save_detections usa internamente
+        self.worker_pool = ThreadPoolExecutor(max_workers=persist_workers)
+        self._tasks: List[asyncio.Task] = []
+
+    def create_app(self) -> web.Application:
+        """
+        Cria a aplicação aiohttp com as rotas do servidor.
+
+        Returns:
+            web.Application: Aplicação pronta para ``web.run_app``.
+        """
+        app = web.Application(client_max_size=32 * 1024 * 1024)
+        app.router.add_post("/detect", self.handle_detect)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self._start_batcher)
+        app.on_cleanup.append(self._stop_batcher)
+        return app
+
+    async def _start_batcher(self, app: web.Application) -> None:
+        """Inicia o laço do agrupador e a publicação das métricas."""
+        self._tasks = [
+            asyncio.create_task(self.batcher.run()),
+            asyncio.create_task(self._flush_metrics()),
+        ]
+
+    async def _stop_batcher(self, app: web.Application) -> None:
+        """Encerra os laços e publica as métricas restantes."""
+        for task in self._tasks:
+            task.cancel()
+        self.detection.metrics.flush()
+
+    async def _flush_metrics(self) -> None:
+        """Publica as métricas do detector periodicamente, como a Lambda por invocação."""
+        while True:
+            await asyncio.sleep(METRICS_FLUSH_SECONDS)
+            self.detection.metrics.flush()
+
+    def _download(self, bucket_name: str, image_key: str) -> bytes:
+        """Baixa um objeto do S3 (ou do substituto local)."""
+        response = self.detection.s3_client.get_object(
+            Bucket=bucket_name, Key=image_key
+        )
+        return response["Body"].read()
+
+    async def _read_image(self, request: web.Request) -> Tuple[str, str, bytes]:
+        """
+        Lê a imagem da requisição.
+
+        Aceita um JSON ``{"bucket": ..., "key": ...}`` com um objeto já enviado ao
+        S3, ou os bytes da imagem no corpo com a chave em ``?key=``; neste caso a
+        imagem é gravada no bucket do servidor, que não aciona as Lambdas, antes
+        do processamento.
+        """
+        loop = asyncio.get_running_loop()
+        s3_client = self.detection.s3_client
+
+        if request.content_type == "application/json":
+            payload = await request.json()
+            if not isinstance(payload, dict):
+                raise ValueError(
+                    'O JSON deve ser um objeto {"bucket": ..., "key": ...}'
+                )
+            bucket_name, image_key = payload["bucket"], payload["key"]
+            img_data = await loop.run_in_executor(
+                self.worker_pool, self._download, bucket_name, image_key
+            )
+            return bucket_name, image_key, img_data
+
+        bucket_name = self.upload_bucket
+        image_key = request.query.get("key") or f"{time.time_ns()}.jpg"
+        img_data = await request.read()
+        await loop.run_in_executor(
+            self.worker_pool,
+            lambda: s3_client.put_object(
+                Bucket=bucket_name, Key=image_key, Body=img_data
+            ),
+        )
+        return bucket_name, image_key, img_data
+
+    async def handle_detect(self, request: web.Request) -> web.Response:
+        """
+        Detecta as placas de uma imagem e grava os resultados.
+
+        Args:
+            request (web.Request): Requisição HTTP.
+
+        Returns:
+            web.Response: JSON com as caixas e as chaves dos recortes; 400 para
+            requisições inválidas, 404 ou 502 se o S3 falhar, 502 se a detecção
+            ou a gravação dos resultados falhar e 503 se a fila estiver cheia.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            bucket_name, image_key, img_data = await self._read_image(request)
+            image: LoadedImage = await loop.run_in_executor(
+                self.worker_pool, self.detection.prepare_image, img_data, image_key
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        except FileNotFoundError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            status = 404 if code in S3_NOT_FOUND_CODES else 502
+            return web.json_response(
+                {"error": f"Erro do S3 ({code}): {e}"}, status=status
+            )
+
+        try:
+            img, boxes = await self.batcher.submit(image)
+        except asyncio.QueueFull:
+            return web.json_response(
+                {"error": "Fila cheia, tente novamente."},
+                status=503,
+                headers={"Retry-After": "1"},
+            )
+        except Exception as e:
+            return web.json_response({"error": f"Falha na detecção: {e}"}, status=502)
+
+        try:
+            await loop.run_in_executor(
+                self.worker_pool,
+                self.detection.save_detections,
+                bucket_name,
+                image_key,
+                img,
+                boxes,
+            )
+        except Exception as e:
+            return web.json_response(
+                {"error": f"Falha ao gravar os resultados: {e}"}, status=502
+            )
+        return web.json_response(
+            {
+                "key": image_key,
+                "boxes": np.asarray(boxes).tolist(),
+                "crop_keys": [plate_crop_key(image_key, i) for i in range(len(boxes))],
+                "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            }
+        )
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """
+        Indica que o servidor está pronto.
+
+        Args:
+            request (web.Request): Requisição HTTP.
+
+        Returns:
+            web.Response: JSON ``{"status": "ok"}``.
+        """
+        return web.json_response({"status": "ok"})
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """
+        Retorna os contadores do agrupador e do cache de resultados.
+
+        Args:
+            request (web.Request): Requisição HTTP.
+
+        Returns:
+            web.Response: JSON com os contadores.
+        """
+        return web.json_response(
+            {
+                "batcher": self.batcher.stats(),
+                "result_cache": self.detection.result_cache.stats(),
+            }
+        )
+
+
+def build_detection(store: str, local_root: str, model_dir: str) -> PlateDetection:
+    """
+    Cria o detector com a persistência escolhida.
+
+    Args:
+        store (str): ``aws`` para S3/DynamoDB reais ou ``local`` para o disco.
+        local_root (str): Diretório dos dados quando ``store`` é ``local``.
+        model_dir (str): Diretório dos arquivos do modelo.
+
+    Returns:
+        PlateDetection: Detector pronto para uso.
+    """
+    if store == "local":
+        return PlateDetection(
+            s3_client=LocalS3Client(os.path.join(local_root, "s3")),
+            dynamodb=LocalDynamoDB(os.path.join(local_root, "dynamodb")),
+            model_dir=model_dir,
+        )
+    return PlateDetection(model_dir=model_dir)
+
+
+def main() -> None:
+    """Inicia o servidor de detecção."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-wait-ms", type=float, default=10.0)
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--persist-workers", type=int, default=8)
+    parser.add_argument("--store", choices=["aws", "local"], default="aws")
+    parser.add_argument("--local-root", default="./local_store")
+    parser.add_argument("--upload-bucket", default=SERVER_UPLOAD_BUCKET)
+    parser.add_argument("--model-dir", default=os.environ.get("PLATE_MODEL_DIR", "."))
+    args = parser.parse_args()
+
+    detection = build_detection(args.store, args.local_root, args.model_dir)
+    server = InferenceServer(
+        detection,
+        args.max_batch_size,
+        args.max_wait_ms,
+        args.queue_size,
+        args.persist_workers,
+        args.upload_bucket,
+    )
+    web.run_app(server.create_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
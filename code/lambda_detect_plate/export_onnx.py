@@ -0,0 +1,165 @@
+"""Módulo para exportar o modelo YOLO para ONNX (FP32) e quantizá-lo para INT8."""
+
+import argparse
+import os
+import random
+import shutil
+from typing import List, Optional
+
+import cv2
+import numpy as np
+from inference_backend import DEFAULT_IMAGE_SIZE, MODEL_FILES, letterbox
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+class YoloCalibrationReader:
+    """Leitor que alimenta o quantizador com imagens do split de teste."""
+
+    def __init__(self, input_name: str, image_paths: List[str], image_size: int):
+        """
+        Inicializa o leitor de calibração.
+
+        Args:
+            input_name (str): Nome da entrada do modelo ONNX.
+            image_paths (List[str]): Imagens usadas na calibração.
+            image_size (int): Lado da entrada do modelo.
+        """
+        self.input_name = input_name
+        self.image_size = image_size
+        self.image_paths = iter(image_paths)
+
+    def get_next(self) -> Optional[dict]:
+        """
+        Retorna a próxima entrada de calibração, pré-processada como na inferência.
+
+        Returns:
+            Optional[dict]: Entrada do modelo ou None quando as imagens acabarem.
+        """
+        for path in self.image_paths:
+            img = cv2.imread(path, cv2.IMREAD_COLOR)
+            if img is None:
+                print(f"Imagem ignorada na calibração: {path}")
+                continue
+            tensor, _, _ = letterbox(img, self.image_size)
+            return {self.input_name: tensor[np.newaxis]}
+        return None
+
+
+def list_calibration_images(calibration_dir: str, num_images: int) -> List[str]:
+    """
+    Lista as imagens do split de teste usadas na calibração.
+
+    Args:
+        calibration_dir (str): Diretório das imagens (ex.: ``test/images``).
+        num_images (int): Quantidade máxima de imagens.
+
+    Returns:
+        List[str]: Caminhos das imagens, amostrados de forma reprodutível.
+    """
+    image_paths = sorted(
+        os.path.join(calibration_dir, name)
+        for name in os.listdir(calibration_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    random.Random(0).shuffle(image_paths)
+    return image_paths[:num_images]
+
+
+def export_fp32(weights: str, output_dir: str, image_size: int) -> str:
+    """
+    Exporta os pesos PyTorch para ONNX FP32 com batch dinâmico.
+
+    Args:
+        weights (str): Caminho dos pesos ``.pt``.
+        output_dir (str): Diretório de saída.
+        image_size (int): Lado da entrada do modelo.
+
+    Returns:
+        str: Caminho do modelo ONNX exportado.
+    """
+    from ultralytics import YOLO
+
+    exported = YOLO(weights).export(
+        format="onnx", imgsz=image_size, dynamic=True, simplify=True
+    )
+    output_path = os.path.join(output_dir, MODEL_FILES["onnx"])
+    if os.path.abspath(exported) != os.path.abspath(output_path):
+        shutil.move(exported, output_path)
+    print(f"Modelo FP32 exportado para {output_path}")
+    return output_path
+
+
+def quantize_int8(
+    fp32_path: str, output_dir: str, image_paths: List[str], image_size: int
+) -> str:
+    """
+    Quantiza estaticamente o modelo ONNX para INT8 (pesos por canal, formato QDQ).
+
+    Args:
+        fp32_path (str): Caminho do modelo ONNX FP32.
+        output_dir (str): Diretório de saída.
+        image_paths (List[str]): Imagens usadas na calibração.
+        image_size (int): Lado da entrada do modelo.
+
+    Returns:
+        str: Caminho do modelo INT8.
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import (
+        CalibrationMethod,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    preprocessed_path = os.path.join(output_dir, "yolov8_model.preprocessed.onnx")
+    quant_pre_process(fp32_path, preprocessed_path)
+
+    input_name = (
+        ort.InferenceSession(fp32_path, providers=["CPUExecutionProvider"])
+        .get_inputs()[0]
+        .name
+    )
+    reader = YoloCalibrationReader(input_name, image_paths, image_size)
+
+    output_path = os.path.join(output_dir, MODEL_FILES["onnx-int8"])
+    quantize_static(
+        preprocessed_path,
+        output_path,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+    os.remove(preprocessed_path)
+    print(f"Modelo INT8 calibrado com {len(image_paths)} imagens: {output_path}")
+    return output_path
+
+
+def main() -> None:
+    """Exporta o modelo para ONNX FP32 e gera a versão INT8 calibrada."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--weights", default=MODEL_FILES["torch"])
+    parser.add_argument(
+        "--calibration-dir",
+        required=True,
+        help="Diretório com as imagens do split de teste (test/images).",
+    )
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--num-calibration-images", type=int, default=80)
+    parser.add_argument("--imgsz", type=int, default=DEFAULT_IMAGE_SIZE)
+    args = parser.parse_args()
+
+    fp32_path = export_fp32(args.weights, args.output_dir, args.imgsz)
+    image_paths = list_calibration_images(
+        args.calibration_dir, args.num_calibration_images
+    )
+    quantize_int8(fp32_path, args.output_dir, image_paths, args.imgsz)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Módulo com os backends de inferência do detector de placas (PyTorch e ONNX)."""
+
+import ast
+import os
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+DEFAULT_IMAGE_SIZE = 640
+PLATE_CLASS_NAME = "placa"
+LETTERBOX_COLOR = (114, 114, 114)
+
+# Nome do backend -> arquivo do modelo dentro do diretório da Lambda
+MODEL_FILES = {
+    "torch": "yolov8_model.pt",
+    "onnx": "yolov8_model.onnx",
+    "onnx-int8": "yolov8_model.int8.onnx",
+}
+
+
+def clip_boxes(xyxy: np.ndarray, image_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Clip boxes to the image and drop the ones left empty.
+
+    Args:
+        xyxy (np.ndarray): An ``(N, 4)`` array of ``x_min, y_min, x_max, y_max``.
+        image_shape (Tuple[int, ...]): The shape of the image the boxes refer to.
+
+    Returns:
+        np.ndarray: The clipped boxes as integer pixel coordinates.
+    """
+    height, width = image_shape[:2]
+    xyxy = np.clip(xyxy, 0, [width, height, width, height]).astype(int)
+    non_empty = (xyxy[:, 2] > xyxy[:, 0]) & (xyxy[:, 3] > xyxy[:, 1])
+    return xyxy[non_empty]
+
+
+def extract_plate_boxes(detections, image_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Return the plate boxes of a YOLO result as integer pixel coordinates.
+
+    Args:
+        detections: The ultralytics result for one image.
+        image_shape (Tuple[int, ...]): The shape of the image the result refers to.
+
+    Returns:
+        np.ndarray: An ``(N, 4)`` array of ``x_min, y_min, x_max, y_max`` boxes,
+        clipped to the image and without empty boxes.
+    """
+    boxes = detections.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty((0, 4), dtype=int)
+
+    plate_classes = [
+        class_id
+        for class_id, name in detections.names.items()
+        if name == PLATE_CLASS_NAME
+    ]
+    classes = boxes.cls.cpu().numpy().astype(int)
+    xyxy = boxes.xyxy.cpu().numpy()[np.isin(classes, plate_classes)]
+    return clip_boxes(xyxy, image_shape)
+
+
+def letterbox(
+    img: np.ndarray, size: int = DEFAULT_IMAGE_SIZE
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize and pad an image to the square model input, as ultralytics does.
+
+    Args:
+        img (np.ndarray): The BGR image.
+        size (int): The side of the model input.
+
+    Returns:
+        Tuple[np.ndarray, float, Tuple[int, int]]: The ``(3, size, size)`` RGB
+        float32 tensor scaled to ``[0, 1]``, the resize ratio and the
+        ``(left, top)`` padding.
+    """
+    height, width = img.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = round(width * ratio), round(height * ratio)
+    resized = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    left = (size - new_width) // 2
+    top = (size - new_height) // 2
+    padded = cv2.copyMakeBorder(
+        resized,
+        top,
+        size - new_height - top,
+        left,
+        size - new_width - left,
+        cv2.BORDER_CONSTANT,
+        value=LETTERBOX_COLOR,
+    )
+
+    tensor = padded[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+    return tensor, ratio, (left, top)
+
+
+class InferenceBackend:
+    """Interface comum dos backends de inferência do detector."""
+
+    def predict(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Detect the plates of a batch of images.
+
+        Args:
+            images (List[np.ndarray]): The BGR images.
+
+        Returns:
+            List[np.ndarray]: For each image, an ``(N, 4)`` integer array of
+            ``x_min, y_min, x_max, y_max`` plate boxes in image coordinates.
+        """
+        raise NotImplementedError
+
+
+class TorchBackend(InferenceBackend):
+    """Backend original, com o modelo PyTorch executado pelo ultralytics."""
+
+    def __init__(self, model_path: str):
+        """
+        Load the ultralytics model.
+
+        Args:
+            model_path (str): The path of the ``.pt`` weights.
+        """
+        # Importado aqui para que a imagem ONNX não precise de torch/ultralytics
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+
+    def predict(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Detect the plates of a batch of images.
+
+        Args:
+            images (List[np.ndarray]): The BGR images.
+
+        Returns:
+            List[np.ndarray]: The plate boxes of each image.
+        """
+        results = self.model(images, verbose=False)
+        return [
+            extract_plate_boxes(result, img.shape)
+            for img, result in zip(images, results)
+        ]
+
+
+class OnnxBackend(InferenceBackend):
+    """Backend ONNX Runtime (CPU) para modelos exportados em FP32 ou INT8."""
+
+    def __init__(
+        self,
+        model_path: str,
+        conf_threshold: float = 0.25,
+        iou_threshold: float = 0.7,
+        num_threads: int = 0,
+    ):
+        """
+        Create the ONNX Runtime session.
+
+        Args:
+            model_path (str): The path of the ``.onnx`` model.
+            conf_threshold (float): The minimum confidence of a detection.
+            iou_threshold (float): The IoU threshold of the non-maximum suppression.
+            num_threads (int): The intra-op thread count; 0 lets ONNX Runtime choose.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.image_size = self._read_image_size(metadata)
+        names = self._read_names(metadata)
+        self.plate_classes = [
+            class_id for class_id, name in names.items() if name == PLATE_CLASS_NAME
+        ]
+
+    @staticmethod
+    def _read_image_size(metadata: Dict[str, str]) -> int:
+        """Read the input size stored by the ultralytics exporter, if any."""
+        if "imgsz" not in metadata:
+            return DEFAULT_IMAGE_SIZE
+        return int(max(ast.literal_eval(metadata["imgsz"])))
+
+    @staticmethod
+    def _read_names(metadata: Dict[str, str]) -> Dict[int, str]:
+        """Read the class names stored by the ultralytics exporter, if any."""
+        if "names" not in metadata:
+            return {0: PLATE_CLASS_NAME}
+        return ast.literal_eval(metadata["names"])
+
+    def predict(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        """
+        Detect the plates of a batch of images.
+
+        Args:
+            images (List[np.ndarray]): The BGR images.
+
+        Returns:
+            List[np.ndarray]: The plate boxes of each image.
+        """
+        letterboxed = [letterbox(img, self.image_size) for img in images]
+        batch = np.stack([tensor for tensor, _, _ in letterboxed])
+        # Saída do YOLOv8: (batch, 4 + classes, âncoras) com caixas em cxcywh
+        outputs = self.session.run(None, {self.input_name: batch})[0]
+
+        return [
+            self._postprocess(output, ratio, padding, img.shape)
+            for output, (_, ratio, padding), img in zip(outputs, letterboxed, images)
+        ]
+
+    def _postprocess(
+        self,
+        output: np.ndarray,
+        ratio: float,
+        padding: Tuple[int, int],
+        image_shape: Tuple[int, ...],
+    ) -> np.ndarray:
+        """Filter, suppress and map the raw predictions of one image back to it."""
+        predictions = output.T
+        scores = predictions[:, 4:][:, self.plate_classes].max(axis=1)
+        keep = scores > self.conf_threshold
+        if not keep.any():
+            return np.empty((0, 4), dtype=int)
+
+        cx, cy, w, h = predictions[keep, :4].T
+        scores = scores[keep]
+        xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+        indices = cv2.dnn.NMSBoxes(
+            xywh.tolist(), scores.tolist(), self.conf_threshold, self.iou_threshold
+        )
+        xywh = xywh[np.asarray(indices, dtype=int).reshape(-1)]
+
+        xyxy = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1)
+        xyxy = (xyxy - np.tile(padding, 2)) / ratio
+        return clip_boxes(xyxy, image_shape)
+
+
+def create_backend(name: str, model_dir: str) -> InferenceBackend:
+    """
+    Build the inference backend selected by name.
+
+    Args:
+        name (str): One of ``torch``, ``onnx`` or ``onnx-int8``.
+        model_dir (str): The directory holding the model files.
+
+    Returns:
+        InferenceBackend: The loaded backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if name not in MODEL_FILES:
+        raise ValueError(
+            f"Unknown inference backend '{name}'. Use one of {sorted(MODEL_FILES)}."
+        )
+
+    model_path = os.path.join(model_dir, MODEL_FILES[name])
+    if name == "torch":
+        return TorchBackend(model_path)
+    return OnnxBackend(
+        model_path, num_threads=int(os.environ.get("PLATE_ONNX_THREADS", "0"))
+    )
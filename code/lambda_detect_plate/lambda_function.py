@@ -1,164 +1,100 @@
 """Módulo para a função Lambda de detecção de placas de carro usando YOLO."""
 
-import io
-import json
-import os
-from datetime import datetime
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
 
 import boto3
-import cv2
-import numpy as np
-from PIL import Image
-from ultralytics import YOLO
-
-
-class PlateDetection:
-    """Classe para detecção de placas de carro usando YOLO."""
-
-    def __init__(self):
-        """Inicializa a instância do PlateDetection."""
-        self.s3_client = boto3.client("s3")
-        self.dynamodb = boto3.resource("dynamodb")
-        self.table = self.dynamodb.Table("plate-detection-info-prod")
-        self.model_path = "/var/task/yolov8_model.pt"
-        self.model = YOLO(self.model_path)
-        self.yolo_config_dir = "/tmp"
-        os.environ["YOLO_CONFIG_DIR"] = self.yolo_config_dir
-
-    def save_metadata(self, bucket_name: str, image_key: str, unique_id: str) -> None:
-        """
-        Save metadata to S3.
-
-        Args:
-            bucket_name (str): The name of the S3 bucket.
-            image_key (str): The key of the image in the S3 bucket.
-            unique_id (str): The unique identifier for the metadata.
-
-        Returns:
-            None
-        """
-        metadata = {"timestamp": unique_id, "image_name": os.path.basename(image_key)}
-
-        metadata_json = json.dumps(metadata)
-        metadata_key = f"metadata/{os.path.basename(image_key)}.metadata.json"
-
-        self.s3_client.put_object(
-            Bucket=bucket_name,
-            Key=metadata_key,
-            Body=metadata_json,
-            ContentType="application/json",
-        )
-
-        print(f"Metadata saved to S3: {metadata_key}")
-
-    def save_image_data(
-        self, image_key: str, image_path: str, plate_key: str, detected: int
-    ) -> str:
-        """
-        Save image data to DynamoDB.
-
-        Args:
-            image_key (str): The key of the image in the S3 bucket.
-            image_path (str): The URL of the image in the S3 bucket.
-            plate_key (str): The key of the cropped plate image in the S3 bucket.
-            detected (int): Whether a plate was detected (1) or not (0).
-
-        Returns:
-            str: The timestamp when the data was saved.
-        """
-        timestamp = datetime.utcnow().isoformat()
-
-        self.table.put_item(
-            Item={
-                "PK": image_key,
-                "timestamp": timestamp,
-                "image_path": image_path,
-                "cropped_image_path": plate_key,
-                "detected": detected,
-            }
-        )
-        return timestamp
-
-    def process_image(self, bucket_name: str, image_key: str) -> None:
-        """
-        Process the image to detect plates and save results.
-
-        Args:
-            bucket_name (str): The name of the S3 bucket.
-            image_key (str): The key of the image in the S3 bucket.
-
-        Returns:
-            None
-        """
-        response = self.s3_client.get_object(Bucket=bucket_name, Key=image_key)
-        img_data = response["Body"].read()
-
-        nparr = np.frombuffer(img_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        results = self.model(img)
-        detections = results[0]
-        plate_detected = 0
-
-        for detection in detections:
-            if detection.names[0] == "placa":
-                print("Plate detected!!!")
-                plate_detected = 1
-                x_min, y_min, x_max, y_max = map(
-                    int, detection.boxes[0].xyxy[0].tolist()
-                )
-                plate_img = img[y_min:y_max, x_min:x_max]
-
-                pil_image = Image.fromarray(plate_img)
-                buf = io.BytesIO()
-                pil_image.save(buf, format="JPEG")
-                buf.seek(0)
-
-                plate_key = os.path.basename(image_key)
-                bucket_plate_name = "upload-image-second-stage-prod"
-
-                self.s3_client.upload_fileobj(
-                    buf,
-                    bucket_plate_name,
-                    plate_key,
-                    ExtraArgs={"ContentType": "image/jpeg"},
-                )
-
-                file_url = f"https://{bucket_plate_name}.s3.amazonaws.com/{plate_key}"
-                timestamp = self.save_image_data(
-                    image_key,
-                    f"https://{bucket_name}.s3.amazonaws.com/{image_key}",
-                    file_url,
-                    plate_detected,
-                )
-                self.save_metadata(bucket_plate_name, plate_key, timestamp)
-
-        if plate_detected == 0:
-            print("Plate NOT detected!!!")
-            self.save_image_data(
-                image_key,
-                f"https://{bucket_name}.s3.amazonaws.com/{image_key}",
-                "",
-                plate_detected,
-            )
-
-
-def lambda_handler(event: dict, context: Optional[object]) -> None:
+from metrics import get_logger
+from plate_detection import (
+    IO_WORKERS,
+    PlateDetection,
+    batch_response,
+    parse_event,
+    prefetch_image,
+)
+
+logger = get_logger(__name__)
+
+# Instância reaproveitada entre invocações no mesmo container (warm start)
+_plate_detection: Optional[PlateDetection] = None
+
+
+def get_plate_detection(s3_client: Optional[Any] = None) -> PlateDetection:
+    """
+    Return the PlateDetection instance shared by every invocation of this process.
+
+    The model, the S3 client and the DynamoDB table handle are created on the first
+    call only, so warm invocations skip the model load entirely.
+
+    Args:
+        s3_client (Optional[Any]): S3 client for the instance, if one is created.
+
+    Returns:
+        PlateDetection: The shared instance.
+    """
+    global _plate_detection
+    if _plate_detection is None:
+        start = time.perf_counter()
+        _plate_detection = PlateDetection(s3_client=s3_client)
+        elapsed = (time.perf_counter() - start) * 1000
+        _plate_detection.metrics.timing("cold_start_init", elapsed)
+        logger.info(f"Cold start: PlateDetection ready in {elapsed:.1f} ms")
+    return _plate_detection
+
+
+def lambda_handler(event: dict, context: Optional[object]) -> dict:
     """
     AWS Lambda handler function.
 
+    Accepts an S3 event notification or an SQS batch of S3 notifications and
+    processes every record it contains.
+
     Args:
         event (dict): The event data.
         context (Optional[object]): The context object.
 
     Returns:
-        None
-    """
-    bucket_name = event["Records"][0]["s3"]["bucket"]["name"]
-    image_key = event["Records"][0]["s3"]["object"]["key"]
-    print("detectPlate ", bucket_name)
-    print("detectPlate ", image_key)
+        dict: For SQS events, the ``batchItemFailures`` of the partial batch
+        response. For S3 events, an empty dict.
 
-    plate_detection = PlateDetection()
-    plate_detection.process_image(bucket_name, image_key)
+    Raises:
+        RuntimeError: If any object of an S3 event could not be processed, so
+            that Lambda retries the invocation.
+    """
+    objects, invalid_messages = parse_event(event)
+    for obj in objects:
+        logger.info(f"detectPlate {obj.bucket_name} {obj.image_key}")
+
+    cold_start = _plate_detection is None
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as prefetch_pool:
+        prefetched = {}
+        if cold_start:
+            # Downloads and decodes run while the model loads, so the cold start
+            # costs the longer of the two instead of their sum
+            s3_client = boto3.client("s3")
+            prefetched = {
+                obj: prefetch_pool.submit(prefetch_image, s3_client, obj)
+                for obj in objects
+            }
+            plate_detection = get_plate_detection(s3_client)
+        else:
+            plate_detection = get_plate_detection()
+        metrics = plate_detection.metrics
+
+        start = time.perf_counter()
+        failures = plate_detection.process_batch(objects, prefetched)
+        elapsed = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"{len(objects)} image(s) processed in {elapsed:.1f} ms "
+        f"({'cold' if cold_start else 'warm'} start), {len(failures)} failure(s)"
+    )
+    logger.debug(f"Result cache: {plate_detection.result_cache.stats()}")
+
+    metrics.timing("invocation", elapsed)
+    metrics.count("images", len(objects))
+    metrics.count("failures", len(failures) + len(invalid_messages))
+    metrics.count("cold_starts", int(cold_start))
+    metrics.flush(RequestId=getattr(context, "aws_request_id", None))
+
+    return batch_response(event, invalid_messages, failures)
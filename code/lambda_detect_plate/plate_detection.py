@@ -0,0 +1,729 @@
+"""Módulo com a detecção de placas de carro usando YOLO."""
+
+import io
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, unquote_plus
+
+import boto3
+import cv2
+import numpy as np
+from inference_backend import clip_boxes, create_backend
+from metrics import Metrics, get_logger
+from PIL import Image
+from result_cache import ResultCache, create_result_cache
+
+logger = get_logger(__name__)
+
+MODEL_DIR = os.environ.get("PLATE_MODEL_DIR", "/var/task")
+INFERENCE_BACKEND = os.environ.get("PLATE_INFERENCE_BACKEND", "torch")
+WARMUP_IMAGE_SIZE = 640
+MAX_BATCH_SIZE = int(os.environ.get("PLATE_MAX_BATCH_SIZE", "8"))
+IO_WORKERS = int(os.environ.get("PLATE_IO_WORKERS", "8"))
+PLATE_BUCKET_NAME = "upload-image-second-stage-prod"
+# O gatilho do lambda_ocr no bucket de placas é filtrado pelo prefixo dos
+# recortes a reconhecer; os recortes só arquivados (lambda_pipeline e ingestão de
+# vídeo, que já reconhecem a placa) ficam fora dele e não acionam o OCR
+PLATE_OCR_PREFIX = "ocr/"
+PLATE_ARCHIVE_PREFIX = "archive/"
+# Metadados de usuário do recorte lidos pelo lambda_ocr (x-amz-meta-*)
+CROP_METADATA_TIMESTAMP = "timestamp"
+CROP_METADATA_SOURCE_KEY = "source-key"
+DETECTION_MIN_SIDE = int(os.environ.get("PLATE_DETECTION_MIN_SIDE", "640"))
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class S3Object(NamedTuple):
+    """An image referenced by an incoming event record."""
+
+    bucket_name: str
+    image_key: str
+    item_id: Optional[str] = None
+
+
+class LoadedImage(NamedTuple):
+    """An image downloaded from S3, ready for detection."""
+
+    data: bytes
+    content_hash: str
+    detection_img: Optional[np.ndarray]
+    cached_boxes: Optional[np.ndarray]
+
+
+class PrefetchedImage(NamedTuple):
+    """An image downloaded and decoded while the model was still loading."""
+
+    data: bytes
+    detection_img: Optional[np.ndarray]
+    elapsed_ms: float
+
+
+class PlateDetection:
+    """Classe para detecção de placas de carro usando YOLO."""
+
+    def __init__(
+        self,
+        s3_client: Optional[Any] = None,
+        dynamodb: Optional[Any] = None,
+        model_dir: str = MODEL_DIR,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Inicializa a instância do PlateDetection.
+
+        Args:
+            s3_client (Optional[Any]): S3 client to use instead of the boto3 one,
+                such as a local stand-in.
+            dynamodb (Optional[Any]): DynamoDB resource to use instead of the boto3
+                one, such as a local stand-in.
+            model_dir (str): The directory holding the model files.
+            metrics (Optional[Metrics]): Where stage timings and counters are
+                recorded. Defaults to a new ``detect`` accumulator.
+        """
+        self.yolo_config_dir = "/tmp"
+        os.environ["YOLO_CONFIG_DIR"] = self.yolo_config_dir
+        self.s3_client = s3_client or boto3.client("s3")
+        self.dynamodb = dynamodb or boto3.resource("dynamodb")
+        self.table = self.dynamodb.Table("plate-detection-info-prod")
+        self.io_pool = ThreadPoolExecutor(max_workers=IO_WORKERS)
+        self.metrics = metrics or Metrics("detect")
+        self.result_cache = create_result_cache("detect", self.dynamodb, self.metrics)
+
+        start = time.perf_counter()
+        self.backend = create_backend(INFERENCE_BACKEND, model_dir)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.timing("model_load", elapsed)
+        logger.info(f"Model loaded ({INFERENCE_BACKEND} backend) in {elapsed:.1f} ms")
+
+        self.warmup()
+
+    def warmup(self) -> None:
+        """
+        Run a dummy inference so the first real image does not pay the model setup.
+
+        Returns:
+            None
+        """
+        start = time.perf_counter()
+        dummy = np.zeros((WARMUP_IMAGE_SIZE, WARMUP_IMAGE_SIZE, 3), dtype=np.uint8)
+        self.backend.predict([dummy])
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.timing("warmup", elapsed)
+        logger.info(f"Model warm-up done in {elapsed:.1f} ms")
+
+    def save_image_data(
+        self,
+        image_key: str,
+        image_path: str,
+        plate_key: str,
+        detected: int,
+        timestamp: Optional[str] = None,
+        extra_attributes: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Save image data to DynamoDB.
+
+        Args:
+            image_key (str): The key of the image in the S3 bucket.
+            image_path (str): The URL of the image in the S3 bucket.
+            plate_key (str): The key of the cropped plate image in the S3 bucket.
+            detected (int): Whether a plate was detected (1) or not (0).
+            timestamp (Optional[str]): The sort key of the item. Defaults to the
+                current UTC time.
+            extra_attributes (Optional[Dict[str, Any]]): Additional attributes to
+                store in the same item, such as the OCR results.
+
+        Returns:
+            str: The timestamp when the data was saved.
+        """
+        timestamp = timestamp or datetime.utcnow().isoformat()
+
+        with self.metrics.span("dynamodb_write"):
+            self.table.put_item(
+                Item={
+                    "PK": image_key,
+                    "timestamp": timestamp,
+                    "image_path": image_path,
+                    "cropped_image_path": plate_key,
+                    "detected": detected,
+                    **(extra_attributes or {}),
+                }
+            )
+        return timestamp
+
+    def load_image(self, bucket_name: str, image_key: str) -> LoadedImage:
+        """
+        Download an image from S3 and prepare it for detection.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            image_key (str): The key of the image in the S3 bucket.
+
+        Returns:
+            LoadedImage: The downloaded image, see ``prepare_image``.
+        """
+        with self.metrics.span("s3_get"):
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=image_key)
+            img_data = response["Body"].read()
+        return self.prepare_image(img_data, image_key)
+
+    def load_prefetched(
+        self, prefetched: "Future[PrefetchedImage]", image_key: str
+    ) -> LoadedImage:
+        """
+        Wait for an image fetched by ``prefetch_image`` and prepare it for detection.
+
+        Args:
+            prefetched (Future[PrefetchedImage]): The pending prefetch.
+            image_key (str): The key of the image in the S3 bucket.
+
+        Returns:
+            LoadedImage: The downloaded image, see ``prepare_image``.
+        """
+        start = time.perf_counter()
+        image = prefetched.result()
+        waited = (time.perf_counter() - start) * 1000
+        self.metrics.timing("prefetch", image.elapsed_ms)
+        self.metrics.timing("prefetch_wait", waited)
+        logger.info(
+            f"Prefetch of {image_key} took {image.elapsed_ms:.1f} ms, "
+            f"waited {waited:.1f} ms for it after init"
+        )
+        return self.prepare_image(image.data, image_key, image.detection_img)
+
+    def prepare_image(
+        self,
+        img_data: bytes,
+        image_key: str,
+        detection_img: Optional[np.ndarray] = None,
+    ) -> LoadedImage:
+        """
+        Prepare an encoded image for detection.
+
+        On a result cache hit the cached boxes are returned and the image is not
+        decoded; otherwise it is decoded at the resolution used for detection.
+
+        Args:
+            img_data (bytes): The encoded image.
+            image_key (str): The key of the image, used in messages.
+            detection_img (Optional[np.ndarray]): The image already decoded by
+                ``decode_for_detection``, if available.
+
+        Returns:
+            LoadedImage: The prepared image.
+
+        Raises:
+            ValueError: If the data could not be decoded as an image.
+        """
+        content_hash = ResultCache.content_hash(img_data)
+
+        cached = self.result_cache.get(content_hash)
+        if cached is not None:
+            logger.debug(f"Result cache hit for {image_key}")
+            boxes = np.array(
+                [[int(value) for value in box] for box in cached["boxes"]], dtype=int
+            ).reshape(-1, 4)
+            return LoadedImage(img_data, content_hash, None, boxes)
+
+        img = detection_img
+        if img is None:
+            with self.metrics.span("decode"):
+                img = decode_for_detection(img_data)
+        if img is None:
+            raise ValueError(f"Could not decode image {image_key}")
+        return LoadedImage(img_data, content_hash, img, None)
+
+    def detect(
+        self, images: List[LoadedImage]
+    ) -> List[Tuple[Optional[np.ndarray], np.ndarray]]:
+        """
+        Find the plates of several images with one backend call for the cache misses.
+
+        Args:
+            images (List[LoadedImage]): The images returned by ``load_image``.
+
+        Returns:
+            List[Tuple[Optional[np.ndarray], np.ndarray]]: For each image, the
+            full-resolution image to crop from (None when there are no plates) and
+            the plate boxes in its coordinates.
+        """
+        results: List[Tuple[Optional[np.ndarray], np.ndarray]] = []
+        misses = [image for image in images if image.cached_boxes is None]
+        predictions: Iterator[np.ndarray] = iter([])
+        if misses:
+            with self.metrics.span("inference"):
+                predictions = iter(
+                    self.backend.predict([image.detection_img for image in misses])
+                )
+            self.metrics.count("inference_images", len(misses))
+
+        for image in images:
+            if image.cached_boxes is None:
+                img, boxes = self.to_full_resolution(
+                    image.data, image.detection_img, next(predictions)
+                )
+                self.result_cache.put(image.content_hash, {"boxes": boxes.tolist()})
+            elif len(image.cached_boxes) > 0:
+                with self.metrics.span("decode_full"):
+                    img = cv2.imdecode(
+                        np.frombuffer(image.data, np.uint8), cv2.IMREAD_COLOR
+                    )
+                boxes = image.cached_boxes
+            else:
+                img, boxes = None, image.cached_boxes
+            results.append((img, boxes))
+
+        return results
+
+    def to_full_resolution(
+        self, img_data: bytes, detection_img: np.ndarray, boxes: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the image to crop plates from and the boxes in its coordinates.
+
+        The full-resolution decode only happens when plates were found on a reduced
+        decode, so the crops keep the detail the OCR needs.
+
+        Args:
+            img_data (bytes): The encoded image.
+            detection_img (np.ndarray): The image the detection ran on.
+            boxes (np.ndarray): The plate boxes in ``detection_img`` coordinates.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The image and the boxes mapped onto it.
+        """
+        if len(boxes) == 0:
+            return detection_img, boxes
+
+        with self.metrics.span("decode_full"):
+            img = cv2.imdecode(np.frombuffer(img_data, np.uint8), cv2.IMREAD_COLOR)
+        if img.shape == detection_img.shape:
+            return img, boxes
+        return img, scale_boxes(boxes, detection_img.shape, img.shape)
+
+    def encode_crop(self, plate_img: np.ndarray) -> io.BytesIO:
+        """
+        Encode a plate crop as JPEG.
+
+        Args:
+            plate_img (np.ndarray): The cropped plate, in BGR like the decoded
+                image. It is stored in true colors, so ``cv2.imdecode`` gives
+                back the same channel order.
+
+        Returns:
+            io.BytesIO: The encoded crop, rewound to the start.
+        """
+        with self.metrics.span("crop_encode"):
+            pil_image = Image.fromarray(cv2.cvtColor(plate_img, cv2.COLOR_BGR2RGB))
+            buf = io.BytesIO()
+            pil_image.save(buf, format="JPEG")
+            buf.seek(0)
+        return buf
+
+    def upload_crop(
+        self,
+        plate_img: np.ndarray,
+        plate_key: str,
+        metadata: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Encode a plate crop as JPEG and upload it to the plates bucket.
+
+        Args:
+            plate_img (np.ndarray): The cropped plate.
+            plate_key (str): The key of the cropped plate image.
+            metadata (Optional[Dict[str, str]]): S3 user metadata stored with the
+                crop; values must be ASCII.
+
+        Returns:
+            None
+        """
+        extra_args = {"ContentType": "image/jpeg"}
+        if metadata:
+            extra_args["Metadata"] = metadata
+
+        buf = self.encode_crop(plate_img)
+        with self.metrics.span("upload"):
+            self.s3_client.upload_fileobj(
+                buf, PLATE_BUCKET_NAME, plate_key, ExtraArgs=extra_args
+            )
+
+    def save_plate(
+        self,
+        image_key: str,
+        image_path: str,
+        plate_img: np.ndarray,
+        plate_key: str,
+        timestamp: str,
+    ) -> None:
+        """
+        Record a plate in DynamoDB and upload its crop.
+
+        The writes run in this order on purpose: the crop upload triggers the OCR
+        Lambda, which updates the DynamoDB item written just before it. The item
+        keys travel with the crop as S3 user metadata, so the OCR stage needs a
+        single ``get_object`` and no separate metadata object is written.
+
+        Args:
+            image_key (str): The key of the original image in the S3 bucket.
+            image_path (str): The URL of the original image in the S3 bucket.
+            plate_img (np.ndarray): The cropped plate.
+            plate_key (str): The key of the cropped plate image.
+            timestamp (str): The sort key of the DynamoDB item.
+
+        Returns:
+            None
+        """
+        self.save_image_data(image_key, image_path, plate_url(plate_key), 1, timestamp)
+        self.upload_crop(
+            plate_img,
+            plate_key,
+            {
+                CROP_METADATA_TIMESTAMP: timestamp,
+                # Metadados do S3 só aceitam ASCII; o lambda_ocr faz o unquote
+                CROP_METADATA_SOURCE_KEY: quote(image_key),
+            },
+        )
+
+    def save_detections(
+        self,
+        bucket_name: str,
+        image_key: str,
+        img: Optional[np.ndarray],
+        boxes: np.ndarray,
+    ) -> None:
+        """
+        Crop every detected plate and save the results to S3 and DynamoDB.
+
+        Each plate is written by its own task on the I/O thread pool, so images with
+        several vehicles take about as long as images with one. This method must
+        therefore not be called from a task of that same pool.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            image_key (str): The key of the image in the S3 bucket.
+            img (Optional[np.ndarray]): The decoded image the boxes refer to; may be
+                None when there are no boxes.
+            boxes (np.ndarray): The ``(N, 4)`` plate boxes returned by ``detect``.
+
+        Returns:
+            None
+        """
+        image_path = f"https://{bucket_name}.s3.amazonaws.com/{image_key}"
+
+        self.metrics.count("detections", len(boxes))
+        if len(boxes) == 0:
+            logger.info(f"Plate NOT detected in {image_key}")
+            self.save_image_data(image_key, image_path, "", 0)
+            return
+
+        logger.info(f"{len(boxes)} plate(s) detected in {image_key}")
+        # Cada placa vira um item próprio; o timestamp é a sort key do item
+        base_time = datetime.utcnow()
+        futures = [
+            self.io_pool.submit(
+                self.save_plate,
+                image_key,
+                image_path,
+                img[y_min:y_max, x_min:x_max],
+                plate_crop_key(image_key, index),
+                (base_time + timedelta(microseconds=index)).isoformat(),
+            )
+            for index, (x_min, y_min, x_max, y_max) in enumerate(boxes)
+        ]
+        for future in futures:
+            future.result()
+
+    def process_image(self, bucket_name: str, image_key: str) -> None:
+        """
+        Process the image to detect plates and save results.
+
+        Args:
+            bucket_name (str): The name of the S3 bucket.
+            image_key (str): The key of the image in the S3 bucket.
+
+        Returns:
+            None
+        """
+        image = self.load_image(bucket_name, image_key)
+        img, boxes = self.detect([image])[0]
+        self.save_detections(bucket_name, image_key, img, boxes)
+
+    def process_batch(
+        self,
+        objects: List[S3Object],
+        prefetched: Optional[Dict[S3Object, "Future[PrefetchedImage]"]] = None,
+    ) -> List[S3Object]:
+        """
+        Process several images with concurrent downloads and batched inference.
+
+        Images are downloaded and decoded on the I/O thread pool, then the ones not
+        found in the result cache are sent to the model in chunks of at most
+        ``MAX_BATCH_SIZE`` images per call. A failure in one image does not stop
+        the others.
+
+        Args:
+            objects (List[S3Object]): The images to process.
+            prefetched (Optional[Dict[S3Object, Future[PrefetchedImage]]]):
+                Downloads started by ``prefetch_image`` before this instance
+                existed; these objects are not fetched again.
+
+        Returns:
+            List[S3Object]: The objects that could not be processed.
+        """
+        failures = []
+        prefetched = prefetched or {}
+        futures = [
+            (
+                self.io_pool.submit(
+                    self.load_prefetched, prefetched[obj], obj.image_key
+                )
+                if obj in prefetched
+                else self.io_pool.submit(
+                    self.load_image, obj.bucket_name, obj.image_key
+                )
+            )
+            for obj in objects
+        ]
+
+        loaded = []
+        for obj, future in zip(objects, futures):
+            try:
+                loaded.append((obj, future.result()))
+            except Exception as e:
+                logger.error(
+                    f"Error loading {obj.bucket_name}/{obj.image_key}: {str(e)}"
+                )
+                self.metrics.count("load_failures")
+                failures.append(obj)
+
+        for start in range(0, len(loaded), MAX_BATCH_SIZE):
+            chunk = loaded[start : start + MAX_BATCH_SIZE]
+            try:
+                results = self.detect([image for _, image in chunk])
+            except Exception as e:
+                logger.error(f"Error during batched inference: {str(e)}")
+                self.metrics.count("inference_failures", len(chunk))
+                failures.extend(obj for obj, _ in chunk)
+                continue
+
+            for (obj, _), (img, boxes) in zip(chunk, results):
+                try:
+                    self.save_detections(obj.bucket_name, obj.image_key, img, boxes)
+                except Exception as e:
+                    logger.error(
+                        f"Error saving {obj.bucket_name}/{obj.image_key}: {str(e)}"
+                    )
+                    self.metrics.count("save_failures")
+                    failures.append(obj)
+
+        return failures
+
+
+def prefetch_image(s3_client: Any, obj: S3Object) -> PrefetchedImage:
+    """
+    Download and decode an image without needing a PlateDetection instance.
+
+    Used on cold starts to fetch the event's images while the model loads. The
+    result cache is not available yet, so the image is always decoded.
+
+    Args:
+        s3_client (Any): The S3 client.
+        obj (S3Object): The image to fetch.
+
+    Returns:
+        PrefetchedImage: The encoded and decoded image and how long it took.
+    """
+    start = time.perf_counter()
+    response = s3_client.get_object(Bucket=obj.bucket_name, Key=obj.image_key)
+    img_data = response["Body"].read()
+    detection_img = decode_for_detection(img_data)
+    return PrefetchedImage(
+        img_data, detection_img, (time.perf_counter() - start) * 1000
+    )
+
+
+def decode_for_detection(img_data: bytes) -> Optional[np.ndarray]:
+    """
+    Decode an image at the smallest scale that still covers the model input.
+
+    The dimensions are read from the image header, and the largest JPEG/PNG
+    reduction factor (8, 4 or 2) that keeps the long edge at or above
+    ``DETECTION_MIN_SIDE`` is used. The model letterboxes its input down to that
+    size anyway, so nothing it would see is lost.
+
+    Args:
+        img_data (bytes): The encoded image.
+
+    Returns:
+        Optional[np.ndarray]: The BGR image, or None if it could not be decoded.
+    """
+    flag = cv2.IMREAD_COLOR
+    try:
+        long_edge = max(Image.open(io.BytesIO(img_data)).size)
+        for factor, reduced_flag in REDUCED_DECODE_FLAGS:
+            if long_edge // factor >= DETECTION_MIN_SIDE:
+                flag = reduced_flag
+                break
+    except Exception as e:
+        logger.warning(f"Could not read image header, decoding at full size: {str(e)}")
+
+    return cv2.imdecode(np.frombuffer(img_data, np.uint8), flag)
+
+
+def scale_boxes(
+    boxes: np.ndarray, from_shape: Tuple[int, ...], to_shape: Tuple[int, ...]
+) -> np.ndarray:
+    """
+    Map boxes from one decode of an image to another decode of the same image.
+
+    Args:
+        boxes (np.ndarray): The ``(N, 4)`` boxes in ``from_shape`` coordinates.
+        from_shape (Tuple[int, ...]): The shape the boxes refer to.
+        to_shape (Tuple[int, ...]): The shape to map the boxes onto.
+
+    Returns:
+        np.ndarray: The boxes in ``to_shape`` coordinates, widened to whole pixels.
+    """
+    scale_y = to_shape[0] / from_shape[0]
+    scale_x = to_shape[1] / from_shape[1]
+    scaled = boxes * np.array([scale_x, scale_y, scale_x, scale_y])
+    scaled[:, :2] = np.floor(scaled[:, :2])
+    scaled[:, 2:] = np.ceil(scaled[:, 2:])
+    return clip_boxes(scaled, to_shape)
+
+
+def plate_url(plate_key: str) -> str:
+    """
+    Return the URL of a plate crop in the plates bucket.
+
+    Args:
+        plate_key (str): The key of the cropped plate image.
+
+    Returns:
+        str: The S3 URL of the crop.
+    """
+    return f"https://{PLATE_BUCKET_NAME}.s3.amazonaws.com/{plate_key}"
+
+
+def plate_crop_key(image_key: str, index: int, prefix: str = PLATE_OCR_PREFIX) -> str:
+    """
+    Build the key of the crop of the ``index``-th plate found in an image.
+
+    The first plate keeps the name of the original image; the others get a
+    numeric suffix. Crops under ``PLATE_OCR_PREFIX`` trigger the OCR Lambda,
+    crops under ``PLATE_ARCHIVE_PREFIX`` are only stored.
+
+    Args:
+        image_key (str): The key of the original image.
+        index (int): The position of the plate among the detections.
+        prefix (str): The key prefix, which decides whether the OCR runs.
+
+    Returns:
+        str: The key of the cropped plate image.
+    """
+    name = os.path.basename(image_key)
+    if index > 0:
+        root, ext = os.path.splitext(name)
+        name = f"{root}_{index}{ext}"
+    return prefix + name
+
+
+def _s3_object(s3_record: dict, item_id: Optional[str] = None) -> S3Object:
+    """
+    Build an S3Object from an S3 event notification record.
+
+    Args:
+        s3_record (dict): A record of an S3 event notification.
+        item_id (Optional[str]): The SQS message id the record came from, if any.
+
+    Returns:
+        S3Object: The referenced object, with the key URL-decoded.
+    """
+    return S3Object(
+        bucket_name=s3_record["s3"]["bucket"]["name"],
+        image_key=unquote_plus(s3_record["s3"]["object"]["key"]),
+        item_id=item_id,
+    )
+
+
+def parse_event(event: dict) -> Tuple[List[S3Object], List[str]]:
+    """
+    Extract every S3 object referenced by an S3 event or an SQS batch.
+
+    SQS records are expected to carry an S3 event notification in their body.
+    S3 test events, which have no ``Records``, are ignored.
+
+    Args:
+        event (dict): The event data.
+
+    Returns:
+        Tuple[List[S3Object], List[str]]: The objects found and the ids of the SQS
+        messages whose body could not be parsed.
+    """
+    objects = []
+    invalid_messages = []
+
+    for record in event.get("Records", []):
+        if "s3" in record:
+            objects.append(_s3_object(record))
+        elif record.get("eventSource") == "aws:sqs":
+            try:
+                body = json.loads(record["body"])
+                objects.extend(
+                    _s3_object(s3_record, record["messageId"])
+                    for s3_record in body.get("Records", [])
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"Invalid SQS message {record.get('messageId')}: {str(e)}")
+                invalid_messages.append(record["messageId"])
+
+    return objects, invalid_messages
+
+
+def batch_response(
+    event: dict, invalid_messages: List[str], failures: List[S3Object]
+) -> dict:
+    """
+    Build the handler response for the records that could not be processed.
+
+    S3 invokes the function asynchronously and only retries (or sends to the
+    on-failure destination) invocations that raise, so for S3 events any failure
+    is raised once the whole batch has been attempted.
+
+    Args:
+        event (dict): The event data.
+        invalid_messages (List[str]): The SQS messages whose body was invalid.
+        failures (List[S3Object]): The objects whose processing failed.
+
+    Returns:
+        dict: For SQS events, the ``batchItemFailures`` of the partial batch
+        response. For S3 events, an empty dict.
+
+    Raises:
+        RuntimeError: If any object of an S3 event could not be processed.
+    """
+    if any(
+        record.get("eventSource") == "aws:sqs" for record in event.get("Records", [])
+    ):
+        failed_ids = set(invalid_messages)
+        failed_ids.update(obj.item_id for obj in failures)
+        return {
+            "batchItemFailures": [
+                {"itemIdentifier": item_id} for item_id in sorted(failed_ids)
+            ]
+        }
+    if failures:
+        failed_keys = ", ".join(
+            f"{obj.bucket_name}/{obj.image_key}" for obj in failures
+        )
+        raise RuntimeError(f"Failed to process {len(failures)} image(s): {failed_keys}")
+    return {}
@@ -0,0 +1,107 @@
+"""Módulo para baixar os modelos do PaddleOCR e exportar o reconhecedor para ONNX."""
+
+import argparse
+import os
+import shutil
+import subprocess
+from typing import Any
+
+from recognizer_backend import REC_DICT_FILE, REC_MODEL_FILES
+
+
+def download_models(model_dir: str) -> Any:
+    """
+    Baixa os modelos det, cls e rec do PaddleOCR para o diretório informado.
+
+    Args:
+        model_dir (str): Diretório de saída, com um subdiretório por modelo.
+
+    Returns:
+        Any: Instância do ``PaddleOCR`` carregada com os modelos baixados.
+    """
+    from paddleocr import PaddleOCR
+
+    ocr = PaddleOCR(
+        lang="en",
+        det_model_dir=os.path.join(model_dir, "det"),
+        rec_model_dir=os.path.join(model_dir, "rec"),
+        cls_model_dir=os.path.join(model_dir, "cls"),
+    )
+    for root, _, names in os.walk(model_dir):
+        for name in names:
+            if name.endswith(".tar"):
+                os.remove(os.path.join(root, name))
+    print(f"Modelos do PaddleOCR baixados em {model_dir}")
+    return ocr
+
+
+def export_rec(ocr: Any, rec_model_dir: str) -> str:
+    """
+    Converta o modelo rec para ONNX e grave o dicionário ao lado dele.
+
+    O dicionário é o do decodificador do PaddleOCR, sem o branco e já com o
+    espaço, para que o backend ``onnx`` decodifique sem importar o Paddle.
+
+    Args:
+        ocr (Any): Instância do ``PaddleOCR`` que carregou o modelo rec.
+        rec_model_dir (str): Diretório do modelo rec.
+
+    Returns:
+        str: Caminho do modelo ONNX.
+    """
+    output_path = os.path.join(rec_model_dir, REC_MODEL_FILES["onnx"])
+    subprocess.run(
+        [
+            "paddle2onnx",
+            "--model_dir",
+            rec_model_dir,
+            "--model_filename",
+            "inference.pdmodel",
+            "--params_filename",
+            "inference.pdiparams",
+            "--save_file",
+            output_path,
+            "--opset_version",
+            "11",
+        ],
+        check=True,
+    )
+    characters = ocr.text_recognizer.postprocess_op.character[1:]
+    with open(
+        os.path.join(rec_model_dir, REC_DICT_FILE), "w", encoding="utf-8"
+    ) as file:
+        file.write("\n".join(characters))
+    print(f"Modelo rec exportado para {output_path} ({len(characters)} símbolos)")
+    return output_path
+
+
+def prune_paddle_models(model_dir: str) -> None:
+    """
+    Remove os pesos do Paddle, que a imagem do backend ``onnx`` não usa.
+
+    Args:
+        model_dir (str): Diretório dos modelos do PaddleOCR.
+    """
+    for name in ("det", "cls"):
+        shutil.rmtree(os.path.join(model_dir, name), ignore_errors=True)
+    rec_model_dir = os.path.join(model_dir, "rec")
+    for name in os.listdir(rec_model_dir):
+        if name.startswith("inference."):
+            os.remove(os.path.join(rec_model_dir, name))
+
+
+def main() -> None:
+    """Prepara os modelos do OCR embutidos na imagem do backend escolhido."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backend", choices=sorted(REC_MODEL_FILES), default="paddle")
+    parser.add_argument("--model-dir", default="/opt/paddleocr")
+    args = parser.parse_args()
+
+    ocr = download_models(args.model_dir)
+    if args.backend == "onnx":
+        export_rec(ocr, os.path.join(args.model_dir, "rec"))
+        prune_paddle_models(args.model_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,896 @@
+"""Módulo com o reconhecimento de placas de carro usando PaddleOCR."""
+
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote
+
+import boto3
+import cv2
+import numpy as np
+from metrics import Metrics, get_logger
+from recognizer_backend import (
+    REC_MODEL_FILES,
+    create_plate_recognizer,
+    create_recognizer,
+)
+from result_cache import ResultCache, create_result_cache
+
+logger = get_logger(__name__)
+
+# Pesos embutidos na imagem Docker (somente leitura); se não existirem, o PaddleOCR
+# baixa os modelos para o diretório gravável na primeira inicialização
+PADDLEOCR_MODEL_DIR = os.environ.get("PADDLEOCR_MODEL_DIR", "/opt/paddleocr")
+PADDLEOCR_FALLBACK_DIR = "/tmp/.paddleocr"
+PADDLEOCR_MODEL_FILE = "inference.pdiparams"
+SELF_CHECK_TEXT = "ABC1234"
+# rec: só o reconhecedor, com o pipeline completo como fallback; full: det+cls+rec
+OCR_MODE = os.environ.get("OCR_MODE", "rec")
+OCR_REC_MIN_CONFIDENCE = float(os.environ.get("OCR_REC_MIN_CONFIDENCE", "0.8"))
+OCR_REC_BATCH_SIZE = int(os.environ.get("OCR_REC_BATCH_SIZE", "6"))
+# paddle: predictor do PaddleOCR; onnx: modelo rec convertido, no ONNX Runtime,
+# e o PaddleOCR só é importado se um recorte cair no pipeline completo
+OCR_REC_BACKEND = os.environ.get("OCR_REC_BACKEND", "paddle")
+# Primeiro estágio da cascata: reconhecedor pequeno de placas; sem o arquivo,
+# todos os recortes vão direto para o PaddleOCR
+OCR_PLATE_MODEL_PATH = os.environ.get(
+    "OCR_PLATE_MODEL_PATH", "/opt/plate_rec/plate_rec.onnx"
+)
+OCR_PLATE_MIN_CONFIDENCE = float(os.environ.get("OCR_PLATE_MIN_CONFIDENCE", "0.9"))
+# Gramáticas das placas: tipo -> padrão do texto só alfanumérico
+PLATE_PATTERNS = {
+    "Mercosul": re.compile(r"^[A-Z]{3}\d{4}$"),
+    "Brazil": re.compile(r"^[A-Z]{3}\d{1}[A-Z]{1}\d{2}$"),
+}
+# Metadados de usuário gravados pelo detector em cada recorte (x-amz-meta-*)
+CROP_METADATA_TIMESTAMP = "timestamp"
+CROP_METADATA_SOURCE_KEY = "source-key"
+LEGACY_METADATA_PREFIX = "metadata/"
+# Prefixo dos recortes a reconhecer no bucket de placas, o mesmo do filtro do
+# gatilho; os recortes arquivados pelo lambda_pipeline e pela ingestão de vídeo
+# ficam em outro prefixo
+OCR_CROP_PREFIX = "ocr/"
+
+
+class PrefetchedCrop(NamedTuple):
+    """Recorte baixado enquanto o motor de OCR ainda carregava."""
+
+    data: bytes
+    metadata: Dict[str, str]
+    elapsed_ms: float
+
+
+class OCRPlateDetection:
+    """Classe para reconhecimento de placas de carro usando PaddleOCR."""
+
+    def __init__(
+        self,
+        s3_client: Optional[Any] = None,
+        dynamodb: Optional[Any] = None,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Inicializa a instância do OCRPlateDetection.
+
+        Args:
+            s3_client (Optional[Any]): Cliente S3 a usar no lugar do boto3, como um
+                substituto local.
+            dynamodb (Optional[Any]): Recurso DynamoDB a usar no lugar do boto3,
+                como um substituto local.
+            metrics (Optional[Metrics]): Onde os tempos e contadores são
+                registrados; por padrão, um novo acumulador ``ocr``.
+        """
+        self.s3_client = s3_client or boto3.client("s3")
+        self.dynamodb = dynamodb or boto3.resource("dynamodb")
+        self.table = self.dynamodb.Table("plate-detection-info-prod")
+        self.metrics = metrics or Metrics("ocr")
+        self.result_cache = create_result_cache("ocr", self.dynamodb, self.metrics)
+        self.model_dir = resolve_model_dir()
+        self.cls_model_dir = os.path.join(self.model_dir, "cls")
+        self.det_model_dir = os.path.join(self.model_dir, "det")
+        self.rec_model_dir = os.path.join(self.model_dir, "rec")
+        if self.model_dir == PADDLEOCR_FALLBACK_DIR:
+            for model_dir in (
+                self.cls_model_dir,
+                self.det_model_dir,
+                self.rec_model_dir,
+            ):
+                os.makedirs(model_dir, exist_ok=True)
+
+        # Pipeline completo (det, cls e rec); com o backend onnx, carregado só
+        # no primeiro fallback, por ``full_pipeline``
+        self.ocr: Optional[Any] = None
+        self.ocr_unavailable = False
+        if OCR_REC_BACKEND == "paddle" or OCR_MODE == "full":
+            self.ocr = self.load_paddleocr()
+
+        start = time.perf_counter()
+        self.recognizer = create_recognizer(
+            OCR_REC_BACKEND,
+            self.rec_model_dir,
+            self.ocr.text_recognizer if self.ocr is not None else None,
+        )
+        # Formato da entrada do reconhecedor, ex.: (3, 48, 320) no PP-OCRv4
+        self.rec_image_shape = self.recognizer.image_shape
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.timing("rec_load", elapsed)
+        logger.info(f"Reconhecedor {OCR_REC_BACKEND} carregado em {elapsed:.1f} ms")
+
+        start = time.perf_counter()
+        self.plate_recognizer = create_plate_recognizer(OCR_PLATE_MODEL_PATH)
+        elapsed = (time.perf_counter() - start) * 1000
+        if self.plate_recognizer is None:
+            logger.info(
+                f"Reconhecedor de placas não encontrado em {OCR_PLATE_MODEL_PATH}; "
+                "cascata desativada"
+            )
+        else:
+            self.metrics.timing("plate_rec_load", elapsed)
+            logger.info(f"Reconhecedor de placas carregado em {elapsed:.1f} ms")
+
+        self.self_check()
+
+    def load_paddleocr(self) -> Any:
+        """
+        Importa e carrega o pipeline completo do PaddleOCR.
+
+        Returns:
+            Any: Instância do ``PaddleOCR``.
+        """
+        # Importado aqui: a imagem do backend onnx não instala o Paddle
+        from paddleocr import PaddleOCR
+
+        start = time.perf_counter()
+        ocr = PaddleOCR(
+            lang="en",
+            det_model_dir=self.det_model_dir,
+            rec_model_dir=self.rec_model_dir,
+            cls_model_dir=self.cls_model_dir,
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.timing("ocr_load", elapsed)
+        logger.info(f"PaddleOCR carregado de {self.model_dir} em {elapsed:.1f} ms")
+        return ocr
+
+    def full_pipeline(self) -> Optional[Any]:
+        """
+        Retorna o pipeline completo do PaddleOCR, carregando-o no primeiro uso.
+
+        Se o PaddleOCR não puder ser carregado (a imagem do backend onnx não o
+        instala), o fallback fica desativado e vale o resultado do reconhecedor.
+
+        Returns:
+            Optional[Any]: Instância do ``PaddleOCR``, ou None se indisponível.
+        """
+        if self.ocr is None and not self.ocr_unavailable:
+            try:
+                self.ocr = self.load_paddleocr()
+            except Exception as e:
+                self.ocr_unavailable = True
+                logger.warning(
+                    f"PaddleOCR indisponível; fallback do pipeline completo "
+                    f"desativado: {str(e)}"
+                )
+        return self.ocr
+
+    def self_check(self) -> None:
+        """
+        Executa o OCR em uma placa sintética para validar e aquecer o motor.
+
+        A primeira inferência do PaddleOCR é bem mais lenta que as seguintes; com
+        esta verificação ela acontece na inicialização, e não na primeira placa.
+        São exercitados o reconhecedor isolado, o pipeline completo do fallback,
+        se já carregado, e, se houver, o reconhecedor de placas da cascata.
+
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: Se o motor de OCR falhar ao processar a imagem.
+        """
+        imagem = np.full((64, 256, 3), 255, dtype=np.uint8)
+        cv2.putText(
+            imagem,
+            SELF_CHECK_TEXT,
+            (10, 46),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.4,
+            (0, 0, 0),
+            3,
+        )
+
+        start = time.perf_counter()
+        try:
+            reconhecidos = self.recognize_text([imagem])
+            resultados = self.ocr.ocr(imagem) if self.ocr is not None else None
+            if self.plate_recognizer is not None:
+                # Só aquece: a fonte sintética não é a das placas do treino
+                self.plate_recognizer.recognize_images([imagem])
+        except Exception as e:
+            raise RuntimeError(f"Falha na verificação do PaddleOCR: {str(e)}") from e
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.timing("self_check", elapsed)
+
+        textos = [texto for texto, _ in reconhecidos] + [
+            item[1][0]
+            for linha in resultados or []
+            for item in linha or []
+            if isinstance(item, list) and len(item) > 1
+        ]
+        textos = [re.sub(r"[^a-zA-Z0-9]", "", texto) for texto in textos]
+        if textos and all(texto == SELF_CHECK_TEXT for texto in textos):
+            logger.info(f"Verificação do PaddleOCR concluída em {elapsed:.1f} ms")
+        else:
+            logger.warning(
+                f"Verificação do PaddleOCR em {elapsed:.1f} ms leu {textos}, "
+                f"esperado {SELF_CHECK_TEXT}"
+            )
+
+    def carregar_imagem_s3(self, bucket_name: str, key: str) -> np.ndarray:
+        """
+        Carrega uma imagem do S3 e a converte para um array numpy.
+
+        Args:
+            bucket_name (str): Nome do bucket S3.
+            key (str): Chave do objeto no S3.
+
+        Returns:
+            np.ndarray: Imagem carregada como array numpy.
+        """
+        response = self.s3_client.get_object(Bucket=bucket_name, Key=key)
+        imagem_dados = response["Body"].read()
+        imagem_np = np.frombuffer(imagem_dados, np.uint8)
+        imagem = cv2.imdecode(imagem_np, cv2.IMREAD_COLOR)
+        return imagem
+
+    def preprocess_image(self, image: np.ndarray) -> np.ndarray:
+        """
+        Pré-processa uma imagem para o reconhecedor.
+
+        Args:
+            image (np.ndarray): Imagem a ser pré-processada.
+
+        Returns:
+            np.ndarray: Imagem pré-processada, ``(C, H, W)``.
+        """
+        return self.preprocess_batch([image])
+
+    def preprocess_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Pré-processa vários recortes em um único tensor para o reconhecedor.
+
+        Reproduz o ``resize_norm_img`` do PaddleOCR: cada recorte é redimensionado
+        para a altura do modelo mantendo a proporção e alinhado à esquerda; a
+        largura do lote é a da imagem mais larga. A normalização para ``[-1, 1]``
+        é feita uma vez para o lote inteiro, e o preenchimento vira zero.
+
+        Args:
+            images (List[np.ndarray]): Recortes das placas.
+
+        Returns:
+            np.ndarray: Tensor ``(N, C, H, W)`` em float32, ou ``(C, H, W)`` quando
+            só uma imagem é informada.
+        """
+        channels, height, min_width = self.rec_image_shape
+        ratios = [image.shape[1] / max(image.shape[0], 1) for image in images]
+        width = max(min_width, int(np.ceil(height * max(ratios))))
+
+        # 127.5 normalizado é zero, o mesmo preenchimento do PaddleOCR
+        batch = np.full((len(images), height, width, channels), 127.5, np.float32)
+        for index, (image, ratio) in enumerate(zip(images, ratios)):
+            resized_width = min(width, max(1, int(np.ceil(height * ratio))))
+            batch[index, :, :resized_width] = cv2.resize(image, (resized_width, height))
+
+        batch = (batch / 127.5 - 1.0).transpose(0, 3, 1, 2)
+        logger.debug(f"Forma do lote normalizado: {batch.shape}")
+        return batch[0] if len(images) == 1 else batch
+
+    def save_image_data(
+        self, image_key: str, image_path: str, plate_key: str, detected: int
+    ) -> str:
+        """
+        Salva dados da imagem no DynamoDB.
+
+        Args:
+            image_key (str): Chave do objeto no S3.
+            image_path (str): URL da imagem no S3.
+            plate_key (str): Chave da imagem recortada da placa no S3.
+            detected (int): Indica se uma placa foi detectada (1) ou não (0).
+
+        Returns:
+            str: Timestamp quando os dados foram salvos.
+        """
+        timestamp = datetime.utcnow().isoformat()
+        with self.metrics.span("dynamodb_write"):
+            self.table.put_item(
+                Item={
+                    "PK": image_key,
+                    "timestamp": timestamp,
+                    "image_path": image_path,
+                    "cropped_image_path": plate_key,
+                    "detected": detected,
+                }
+            )
+        return timestamp
+
+    def process_image(
+        self,
+        bucket_name: str,
+        object_key: str,
+        prefetched: Optional["Future[PrefetchedCrop]"] = None,
+    ) -> None:
+        """
+        Processa o recorte de uma placa e salva o resultado.
+
+        O gatilho é o próprio recorte, que traz nos metadados de usuário do S3 o
+        timestamp e a chave da imagem original, então basta um ``get_object``.
+        Objetos ``metadata/*.metadata.json`` do formato anterior ainda são
+        aceitos durante a transição.
+
+        Args:
+            bucket_name (str): Nome do bucket S3.
+            object_key (str): Chave do recorte (ou do objeto de metadados) no S3.
+            prefetched (Optional[Future[PrefetchedCrop]]): Download do recorte
+                iniciado por ``prefetch_crop`` antes desta instância existir.
+
+        Returns:
+            None
+        """
+        if object_key.startswith(LEGACY_METADATA_PREFIX):
+            self.process_metadata(bucket_name, object_key)
+            return
+
+        if prefetched is not None:
+            start = time.perf_counter()
+            crop = prefetched.result()
+            waited = (time.perf_counter() - start) * 1000
+            self.metrics.timing("prefetch", crop.elapsed_ms)
+            self.metrics.timing("prefetch_wait", waited)
+            logger.info(
+                f"Prefetch de {object_key} levou {crop.elapsed_ms:.1f} ms, "
+                f"espera de {waited:.1f} ms após a inicialização"
+            )
+            plate_img, metadata = crop.data, crop.metadata
+        else:
+            with self.metrics.span("s3_get"):
+                response = self.s3_client.get_object(Bucket=bucket_name, Key=object_key)
+                plate_img = response["Body"].read()
+            metadata = response.get("Metadata", {})
+
+        uuid = metadata.get(CROP_METADATA_TIMESTAMP)
+        if not uuid:
+            # Recortes gravados sem os metadados (ex.: por uma versão antiga do
+            # detector, fora do fluxo de OCR) não têm item a atualizar
+            logger.info(f"Recorte sem metadados de OCR ignorado: {object_key}")
+            self.metrics.count("skipped_crops")
+            return
+
+        source_key = unquote(
+            metadata.get(CROP_METADATA_SOURCE_KEY, os.path.basename(object_key))
+        )
+        self.process_crop(plate_img, source_key, uuid)
+
+    def process_metadata(self, bucket_name: str, metadata_key: str) -> None:
+        """
+        Processa uma placa a partir de um objeto de metadados (formato anterior).
+
+        Args:
+            bucket_name (str): Nome do bucket S3.
+            metadata_key (str): Chave do objeto de metadados no S3.
+
+        Returns:
+            None
+        """
+        with self.metrics.span("s3_get"):
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=metadata_key)
+            metadata_content = response["Body"].read().decode("utf-8")
+        metadata = json.loads(metadata_content)
+
+        uuid = metadata.get("timestamp")
+        image_name = metadata.get("image_name")
+        # Imagens com várias placas geram recortes com nomes próprios; o item no
+        # DynamoDB continua indexado pela chave da imagem original
+        source_key = metadata.get("source_key", image_name)
+
+        if not uuid or not image_name:
+            logger.warning("Invalid metadata format. Missing 'uuid' or 'image_name'.")
+            self.metrics.count("invalid_metadata")
+            return
+
+        logger.debug(f"UUID: {uuid}, Image Name: {image_name}")
+
+        with self.metrics.span("s3_get"):
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=image_name)
+            plate_img = response["Body"].read()
+        self.process_crop(plate_img, source_key, uuid)
+
+    def process_crop(self, plate_img: bytes, source_key: str, uuid: str) -> None:
+        """
+        Reconhece um recorte já baixado e atualiza o item da placa no DynamoDB.
+
+        Args:
+            plate_img (bytes): Recorte da placa em JPEG.
+            source_key (str): Chave de partição do item (chave da imagem original).
+            uuid (str): Sort key (timestamp) do item.
+
+        Returns:
+            None
+        """
+        resultado = self.recognize_cached(
+            ResultCache.content_hash(plate_img), lambda: decode_crop(plate_img)
+        )
+        if resultado:
+            self.save_ocr_result(source_key, uuid, resultado)
+        else:
+            logger.info("Nenhum texto ou acurácia para salvar no DynamoDB.")
+
+    def recognize(self, imagem: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Reconhece os caracteres de uma placa já recortada.
+
+        Args:
+            imagem (np.ndarray): Recorte da placa em BGR.
+
+        Returns:
+            Optional[Dict[str, Any]]: Atributos do resultado do OCR, prontos para o
+            DynamoDB, ou None se nenhum texto foi reconhecido.
+        """
+        return self.recognize_batch([imagem])[0]
+
+    def recognize_batch(
+        self, imagens: List[np.ndarray]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Reconhece várias placas já recortadas em cascata, do estágio mais barato.
+
+        Se houver o reconhecedor de placas, ele roda primeiro e só os recortes
+        rejeitados seguem para o PaddleOCR. Como as imagens já são recortes de
+        placas, o detector de texto (DB) e o classificador de ângulo do PaddleOCR
+        são pulados; o pipeline completo, que pode separar linhas ou descartar
+        bordas, fica para os recortes com baixa confiança. Com ``OCR_MODE=full``
+        todos os recortes usam o pipeline completo.
+
+        Os recortes chegam em BGR, a ordem do ``cv2.imdecode`` e a esperada pelos
+        modelos do PaddleOCR, de todos os chamadores (lambda_ocr, lambda_pipeline
+        e ingestão de vídeo); conversões de canal ficam dentro dos estágios.
+
+        Args:
+            imagens (List[np.ndarray]): Recortes das placas em BGR.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: Um resultado de ``recognize`` por
+            recorte, na mesma ordem.
+        """
+        if not imagens:
+            return []
+        if OCR_MODE == "full":
+            return [self.recognize_full(imagem) for imagem in imagens]
+
+        resultados: List[Optional[Dict[str, Any]]] = [None] * len(imagens)
+        escalados = list(range(len(imagens)))
+        if self.plate_recognizer is not None:
+            escalados = self.recognize_plates(imagens, resultados)
+
+        if escalados:
+            for index, resultado in zip(
+                escalados, self.recognize_paddle([imagens[i] for i in escalados])
+            ):
+                resultados[index] = resultado
+        return resultados
+
+    def recognize_plates(
+        self, imagens: List[np.ndarray], resultados: List[Optional[Dict[str, Any]]]
+    ) -> List[int]:
+        """
+        Primeiro estágio da cascata: o reconhecedor pequeno de placas.
+
+        Um texto é aceito quando segue uma das gramáticas de ``PLATE_PATTERNS``
+        com confiança de pelo menos ``OCR_PLATE_MIN_CONFIDENCE``; os demais
+        recortes são escalados para o PaddleOCR. A taxa de escalonamento é
+        ``ocr_escalations / ocr_plate_images``.
+
+        Args:
+            imagens (List[np.ndarray]): Recortes das placas.
+            resultados (List[Optional[Dict[str, Any]]]): Resultados por recorte,
+                preenchidos nos índices aceitos.
+
+        Returns:
+            List[int]: Índices dos recortes a escalar.
+        """
+        try:
+            with self.metrics.span("ocr_plate"):
+                reconhecidos = self.plate_recognizer.recognize_images(imagens)
+        except Exception as e:
+            logger.error(f"Error during plate recognition: {str(e)}")
+            self.metrics.count("ocr_failures")
+            self.metrics.count("ocr_escalations", len(imagens))
+            return list(range(len(imagens)))
+        self.metrics.count("ocr_plate_images", len(imagens))
+
+        escalados = []
+        for index, (texto, acuracia) in enumerate(reconhecidos):
+            logger.debug(f"Reconhecedor de placas: {texto} ({acuracia})")
+            if plate_type(texto) and acuracia >= OCR_PLATE_MIN_CONFIDENCE:
+                resultados[index] = self.build_result([texto], [Decimal(str(acuracia))])
+            else:
+                escalados.append(index)
+
+        self.metrics.count("ocr_plate_accepted", len(imagens) - len(escalados))
+        self.metrics.count("ocr_escalations", len(escalados))
+        return escalados
+
+    def recognize_paddle(
+        self, imagens: List[np.ndarray]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Reconhece recortes com o PaddleOCR: só o reconhecedor, depois o pipeline.
+
+        Os recortes com confiança abaixo de ``OCR_REC_MIN_CONFIDENCE`` (ou sem
+        texto) no reconhecedor passam pelo pipeline completo. O resultado do
+        reconhecedor é mantido se o pipeline completo não reconhecer nada ou
+        reconhecer com confiança menor.
+
+        Args:
+            imagens (List[np.ndarray]): Recortes das placas.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: Um resultado por recorte.
+        """
+        try:
+            with self.metrics.span("ocr_rec"):
+                reconhecidos = self.recognize_text(imagens)
+            self.metrics.count("ocr_rec_images", len(imagens))
+        except Exception as e:
+            logger.error(f"Error during batched recognition: {str(e)}")
+            self.metrics.count("ocr_failures")
+            return [self.recognize_full(imagem) for imagem in imagens]
+
+        resultados = []
+        for imagem, (texto, acuracia) in zip(imagens, reconhecidos):
+            texto_limpo = re.sub(r"[^a-zA-Z0-9]", "", texto)
+            logger.debug(f"Reconhecimento: {texto} ({acuracia})")
+            confianca = Decimal(str(acuracia))
+            resultado = (
+                self.build_result([texto_limpo], [confianca]) if texto_limpo else None
+            )
+            if resultado is None or acuracia < OCR_REC_MIN_CONFIDENCE:
+                self.metrics.count("ocr_fallbacks")
+                completo = self.recognize_full(imagem)
+                if completo is not None and (
+                    resultado is None or max(completo["plate_accuracy"]) > confianca
+                ):
+                    resultado = completo
+            resultados.append(resultado)
+        return resultados
+
+    def recognize_text(self, imagens: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Executa só o reconhecedor em um lote de recortes.
+
+        O modelo roda no backend escolhido por ``OCR_REC_BACKEND``.
+
+        Args:
+            imagens (List[np.ndarray]): Recortes das placas.
+
+        Returns:
+            List[Tuple[str, float]]: Texto e confiança de cada recorte.
+        """
+        resultados: List[Tuple[str, float]] = []
+        for start in range(0, len(imagens), OCR_REC_BATCH_SIZE):
+            batch = self.preprocess_batch(imagens[start : start + OCR_REC_BATCH_SIZE])
+            if batch.ndim == 3:
+                batch = batch[np.newaxis]
+            batch = np.ascontiguousarray(batch, dtype=np.float32)
+            resultados.extend(self.recognizer.recognize(batch))
+        return resultados
+
+    def recognize_full(self, imagem: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Reconhece uma placa com o pipeline completo do PaddleOCR (det, cls e rec).
+
+        Args:
+            imagem (np.ndarray): Recorte da placa em BGR.
+
+        Returns:
+            Optional[Dict[str, Any]]: Mesmo retorno de ``recognize``; None
+            também quando o pipeline completo está indisponível.
+        """
+        ocr = self.full_pipeline()
+        if ocr is None:
+            return None
+        try:
+            with self.metrics.span("ocr"):
+                resultados = ocr.ocr(imagem)
+            # Formatação preguiçosa: a estrutura completa só é convertida em debug
+            logger.debug("Resultados do OCR: %s", resultados)
+        except Exception as e:
+            logger.error(f"Error during OCR: {str(e)}")
+            self.metrics.count("ocr_failures")
+            return None
+
+        textos_detectados = []
+        acuracias_detectadas = []
+        if resultados:
+            for linha in resultados:
+                for item in linha or []:
+                    if isinstance(item, list) and len(item) > 1:
+                        box, (texto, acuracia) = item
+                        texto_limpo = re.sub(r"[^a-zA-Z0-9]", "", texto)
+                        textos_detectados.append(texto_limpo)
+                        acuracias_detectadas.append(Decimal(str(acuracia)))
+                    else:
+                        logger.debug(f"Item inválido encontrado: {item}")
+
+        return self.build_result(textos_detectados, acuracias_detectadas)
+
+    def build_result(
+        self, textos_detectados: List[str], acuracias_detectadas: List[Decimal]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Classifica o texto reconhecido e monta os atributos do DynamoDB.
+
+        Args:
+            textos_detectados (List[str]): Textos reconhecidos, só alfanuméricos.
+            acuracias_detectadas (List[Decimal]): Confiança de cada texto.
+
+        Returns:
+            Optional[Dict[str, Any]]: Mesmo retorno de ``recognize``.
+        """
+        type_plate = "type_plate_not_detect"
+        error_type_plate = 0
+        amount_characters = 0
+        num_letters = 0
+        num_numbers = 0
+
+        if textos_detectados:
+            for texto in textos_detectados:
+                tipo = plate_type(texto)
+                if tipo:
+                    type_plate = tipo
+                    error_type_plate = 1
+                    break
+                else:
+                    num_letters = sum(c.isalpha() for c in texto)
+                    num_numbers = sum(c.isdigit() for c in texto)
+                    amount_characters = len(texto)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Type_Plate: {type_plate}")
+                logger.debug(f"Error Type Plate: {error_type_plate}")
+                logger.debug(f"Number of Letters: {num_letters}")
+                logger.debug(f"Number of Numbers: {num_numbers}")
+                logger.debug(f"Amount of Characters: {amount_characters}")
+                logger.debug("Textos detectados com confiança:")
+                for texto, acuracia in zip(textos_detectados, acuracias_detectadas):
+                    logger.debug(f"Texto: {texto}, Acurácia: {acuracia}")
+        else:
+            logger.debug("Nenhum texto detectado.")
+            self.metrics.count("ocr_empty")
+
+        if not (textos_detectados and acuracias_detectadas):
+            return None
+
+        resultado = {
+            "detected_text": textos_detectados,
+            "plate_accuracy": acuracias_detectadas,
+            "type_plate": type_plate,
+            "error_type_plate": error_type_plate,
+            "num_letters": num_letters,
+            "num_numbers": num_numbers,
+            "amount_characters": amount_characters,
+        }
+        texto_busca = normalize_plate_text(textos_detectados)
+        if texto_busca:
+            resultado["plate_text"] = texto_busca
+        return resultado
+
+    def recognize_cached(
+        self, content_hash: str, carregar_imagem: Callable[[], np.ndarray]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reconhece uma placa consultando antes o cache de resultados.
+
+        Args:
+            content_hash (str): Chave de conteúdo do recorte da placa.
+            carregar_imagem (Callable[[], np.ndarray]): Função que decodifica o
+                recorte; só é chamada em caso de cache miss.
+
+        Returns:
+            Optional[Dict[str, Any]]: Mesmo retorno de ``recognize``.
+        """
+        return self.recognize_cached_batch([(content_hash, carregar_imagem)])[0]
+
+    def recognize_cached_batch(
+        self, itens: List[Tuple[str, Callable[[], np.ndarray]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Reconhece várias placas, enviando ao reconhecedor só as ausentes do cache.
+
+        Args:
+            itens (List[Tuple[str, Callable[[], np.ndarray]]]): Chave de conteúdo e
+                função que decodifica cada recorte.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: Um resultado por item, na mesma ordem.
+        """
+        resultados: List[Optional[Dict[str, Any]]] = [None] * len(itens)
+        pendentes = []
+        for index, (content_hash, _) in enumerate(itens):
+            resultado = self.result_cache.get(content_hash)
+            if resultado is None:
+                pendentes.append(index)
+            else:
+                logger.debug(f"Result cache hit: {content_hash}")
+                resultados[index] = resultado or None
+
+        novos = self.recognize_batch([itens[index][1]() for index in pendentes])
+        for index, resultado in zip(pendentes, novos):
+            # Recortes sem texto também vão para o cache, como dicionário vazio
+            self.result_cache.put(itens[index][0], resultado or {})
+            resultados[index] = resultado
+        return resultados
+
+    def save_ocr_result(
+        self, image_name: str, uuid: str, resultado: Dict[str, Any]
+    ) -> None:
+        """
+        Atualiza o item da imagem no DynamoDB com o resultado do OCR.
+
+        Também grava ``plate_text``, o texto normalizado que é a chave de
+        partição do índice de busca por placa; sem texto, o atributo fica de fora
+        e o item não entra no índice.
+
+        Args:
+            image_name (str): Chave de partição do item (chave da imagem original).
+            uuid (str): Sort key (timestamp) do item.
+            resultado (Dict[str, Any]): Atributos retornados por ``recognize``.
+
+        Returns:
+            None
+        """
+        update_expression = "SET detected_text = :text, plate_accuracy = :accuracy, type_plate = :type_plate, error_type_plate = :error_type_plate, num_letters = :num_letters, num_numbers = :num_numbers, amount_characters = :amount_characters"
+        expression_values = {
+            ":text": resultado["detected_text"],
+            ":accuracy": resultado["plate_accuracy"],
+            ":type_plate": resultado["type_plate"],
+            ":error_type_plate": resultado["error_type_plate"],
+            ":num_letters": resultado["num_letters"],
+            ":num_numbers": resultado["num_numbers"],
+            ":amount_characters": resultado["amount_characters"],
+        }
+        # Resultados antigos do cache não trazem o plate_text
+        texto_busca = normalize_plate_text(resultado["detected_text"])
+        if texto_busca:
+            update_expression += ", plate_text = :plate_text"
+            expression_values[":plate_text"] = texto_busca
+
+        with self.metrics.span("dynamodb_write"):
+            self.table.update_item(
+                Key={"PK": image_name, "timestamp": uuid},
+                UpdateExpression=update_expression,
+                ExpressionAttributeValues=expression_values,
+            )
+        logger.info(f"OCR plate SAVED {image_name} {uuid} {resultado['detected_text']}")
+
+
+def normalize_plate_text(textos: List[str]) -> Optional[str]:
+    """
+    Normaliza o texto reconhecido para a busca por placa.
+
+    Usa o primeiro texto que segue uma das gramáticas de ``PLATE_PATTERNS`` ou,
+    se nenhum seguir, o primeiro texto, em maiúsculas e só com letras e dígitos.
+
+    Args:
+        textos (List[str]): Textos reconhecidos.
+
+    Returns:
+        Optional[str]: Texto normalizado, ou None se não houver texto.
+    """
+    normalizados = [re.sub(r"[^0-9A-Z]", "", texto.upper()) for texto in textos]
+    normalizados = [texto for texto in normalizados if texto]
+    if not normalizados:
+        return None
+    return next((texto for texto in normalizados if plate_type(texto)), normalizados[0])
+
+
+def plate_type(texto: str) -> Optional[str]:
+    """
+    Identifica a gramática de placa seguida por um texto.
+
+    Args:
+        texto (str): Texto reconhecido, só alfanumérico.
+
+    Returns:
+        Optional[str]: Tipo da placa em ``PLATE_PATTERNS``, ou None.
+    """
+    for tipo, padrao in PLATE_PATTERNS.items():
+        if padrao.match(texto):
+            return tipo
+    return None
+
+
+def is_ocr_object(object_key: str) -> bool:
+    """
+    Indica se um objeto do bucket de placas deve passar pelo OCR.
+
+    Args:
+        object_key (str): Chave do objeto, já decodificada.
+
+    Returns:
+        bool: Se é um recorte a reconhecer ou um objeto de metadados antigo.
+    """
+    return object_key.startswith((OCR_CROP_PREFIX, LEGACY_METADATA_PREFIX))
+
+
+def decode_crop(data: bytes) -> np.ndarray:
+    """
+    Decodifica um recorte JPEG gravado pelo detector.
+
+    Args:
+        data (bytes): Recorte da placa em JPEG.
+
+    Returns:
+        np.ndarray: Recorte em BGR, a ordem recebida por ``recognize_batch``.
+    """
+    imagem = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    logger.debug(f"Shape of the image: {imagem.shape}, dtype: {imagem.dtype}")
+    return imagem
+
+
+def prefetch_crop(s3_client: Any, bucket_name: str, object_key: str) -> PrefetchedCrop:
+    """
+    Baixa um recorte e seus metadados sem depender de um OCRPlateDetection.
+
+    Usado no cold start para buscar os recortes do evento enquanto o PaddleOCR
+    carrega.
+
+    Args:
+        s3_client (Any): Cliente S3.
+        bucket_name (str): Nome do bucket S3.
+        object_key (str): Chave do recorte no S3.
+
+    Returns:
+        PrefetchedCrop: Bytes, metadados de usuário e duração do download.
+    """
+    start = time.perf_counter()
+    response = s3_client.get_object(Bucket=bucket_name, Key=object_key)
+    data = response["Body"].read()
+    return PrefetchedCrop(
+        data, response.get("Metadata", {}), (time.perf_counter() - start) * 1000
+    )
+
+
+def resolve_model_dir(backend: str = OCR_REC_BACKEND) -> str:
+    """
+    Escolhe o diretório dos modelos do PaddleOCR.
+
+    Args:
+        backend (str): Backend do reconhecedor; com ``onnx`` basta o modelo rec
+            convertido, pois a imagem desse backend não traz os pesos do Paddle.
+
+    Returns:
+        str: ``PADDLEOCR_MODEL_DIR`` se os modelos estiverem nele, ou o
+        diretório gravável em ``/tmp``, onde o PaddleOCR baixa os modelos.
+    """
+    if backend == "onnx":
+        required = [os.path.join("rec", REC_MODEL_FILES["onnx"])]
+    else:
+        required = [
+            os.path.join(name, PADDLEOCR_MODEL_FILE) for name in ("cls", "det", "rec")
+        ]
+    if all(
+        os.path.exists(os.path.join(PADDLEOCR_MODEL_DIR, path)) for path in required
+    ):
+        return PADDLEOCR_MODEL_DIR
+
+    logger.warning(
+        f"Modelos do PaddleOCR não encontrados em {PADDLEOCR_MODEL_DIR}; "
+        f"baixando para {PADDLEOCR_FALLBACK_DIR}"
+    )
+    return PADDLEOCR_FALLBACK_DIR
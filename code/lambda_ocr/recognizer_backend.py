@@ -0,0 +1,371 @@
+"""Módulo com os backends do reconhecedor de texto do OCR (Paddle e ONNX Runtime)."""
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Nome do backend -> modelo dentro do diretório do reconhecedor
+REC_MODEL_FILES = {
+    "paddle": "inference.pdmodel",
+    "onnx": "model.onnx",
+}
+# Dicionário gravado ao lado do model.onnx no build: todos os símbolos do
+# decodificador do PaddleOCR, sem o branco e já com o espaço, um por linha
+REC_DICT_FILE = "rec_dict.txt"
+# Entrada (C, H, largura mínima) do reconhecedor do PP-OCRv4, usada quando o
+# modelo ONNX não fixa essas dimensões
+REC_IMAGE_SHAPE = (3, 48, 320)
+# Índice do símbolo "branco" do CTC no dicionário do PaddleOCR
+CTC_BLANK_INDEX = 0
+# Alfabeto das placas brasileiras, usado se o modelo não trouxer o próprio
+PLATE_CHARACTERS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def ctc_decode(preds: np.ndarray, characters: Sequence[str]) -> List[Tuple[str, float]]:
+    """
+    Decodifica a saída CTC de um lote sem laços sobre os passos de tempo.
+
+    Equivale ao ``CTCLabelDecode`` do PaddleOCR: em cada passo fica o símbolo
+    mais provável, repetições consecutivas são colapsadas e o branco é removido;
+    a confiança é a média das probabilidades dos símbolos mantidos.
+
+    Args:
+        preds (np.ndarray): Probabilidades ``(N, T, C)`` já com softmax.
+        characters (Sequence[str]): Dicionário do modelo, com o branco no
+            índice 0.
+
+    Returns:
+        List[Tuple[str, float]]: Texto e confiança de cada item do lote.
+    """
+    indices = preds.argmax(axis=2)
+    probs = preds.max(axis=2)
+
+    keep = indices != CTC_BLANK_INDEX
+    keep[:, 1:] &= indices[:, 1:] != indices[:, :-1]
+    counts = keep.sum(axis=1)
+    confidences = np.where(
+        counts > 0, (probs * keep).sum(axis=1) / np.maximum(counts, 1), 0.0
+    )
+
+    symbols = np.asarray(characters, dtype=object)[indices]
+    return [
+        ("".join(row[mask]), float(confidence))
+        for row, mask, confidence in zip(symbols, keep, confidences)
+    ]
+
+
+class RecognizerBackend:
+    """Interface comum dos backends do reconhecedor."""
+
+    def __init__(
+        self,
+        characters: Sequence[str],
+        image_shape: Tuple[int, int, int] = REC_IMAGE_SHAPE,
+    ):
+        """
+        Inicializa o backend.
+
+        Args:
+            characters (Sequence[str]): Dicionário do modelo, com o branco no
+                índice 0.
+            image_shape (Tuple[int, int, int]): Canais, altura e largura mínima
+                da entrada do modelo.
+        """
+        self.characters = list(characters)
+        self.image_shape = tuple(image_shape)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o modelo de reconhecimento.
+
+        Args:
+            batch (np.ndarray): Tensor ``(N, C, H, W)`` normalizado, em float32.
+
+        Returns:
+            np.ndarray: Probabilidades ``(N, T, C)`` por passo de tempo.
+        """
+        raise NotImplementedError
+
+    def recognize(self, batch: np.ndarray) -> List[Tuple[str, float]]:
+        """
+        Reconhece o texto de um lote de recortes já pré-processados.
+
+        Args:
+            batch (np.ndarray): Tensor ``(N, C, H, W)`` normalizado, em float32.
+
+        Returns:
+            List[Tuple[str, float]]: Texto e confiança de cada recorte.
+        """
+        return ctc_decode(self.predict(batch), self.characters)
+
+
+class PaddleRecognizer(RecognizerBackend):
+    """Backend original, com o predictor do Paddle criado pelo PaddleOCR."""
+
+    def __init__(self, text_recognizer: Any):
+        """
+        Reaproveita o reconhecedor já carregado pelo PaddleOCR.
+
+        Args:
+            text_recognizer (Any): ``PaddleOCR.text_recognizer``.
+        """
+        super().__init__(
+            text_recognizer.postprocess_op.character,
+            tuple(text_recognizer.rec_image_shape),
+        )
+        self.recognizer = text_recognizer
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o modelo de reconhecimento.
+
+        Args:
+            batch (np.ndarray): Tensor ``(N, C, H, W)`` normalizado, em float32.
+
+        Returns:
+            np.ndarray: Probabilidades ``(N, T, C)`` por passo de tempo.
+        """
+        recognizer = self.recognizer
+        if recognizer.use_onnx:
+            return recognizer.predictor.run(
+                recognizer.output_tensors, {recognizer.input_tensor.name: batch}
+            )[0]
+        recognizer.input_tensor.copy_from_cpu(batch)
+        recognizer.predictor.run()
+        return recognizer.output_tensors[0].copy_to_cpu()
+
+
+class OnnxRecognizer(RecognizerBackend):
+    """
+    Modelo de reconhecimento do PaddleOCR convertido para ONNX (paddle2onnx).
+
+    Não depende do Paddle: o dicionário vem do próprio modelo (metadados ou
+    ``REC_DICT_FILE``) e o formato da entrada, da sessão do ONNX Runtime.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        characters: Optional[Sequence[str]] = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0,
+    ):
+        """
+        Cria a sessão do ONNX Runtime.
+
+        Args:
+            model_path (str): Caminho do ``.onnx``.
+            characters (Optional[Sequence[str]]): Dicionário do modelo, com o
+                branco no índice 0; por padrão, lido por ``load_characters``.
+            intra_op_threads (int): Threads dentro de cada operador; 0 deixa o
+                ONNX Runtime escolher.
+            inter_op_threads (int): Threads entre operadores independentes; acima
+                de 1 ativa a execução paralela do grafo.
+
+        Raises:
+            ValueError: Se o dicionário não tiver um símbolo por classe do modelo.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = inter_op_threads
+        if inter_op_threads > 1:
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+
+        if characters is None:
+            characters = load_characters(
+                model_path, self.session.get_modelmeta().custom_metadata_map
+            )
+        # Dimensões dinâmicas (nomes ou None) ficam com o padrão do PP-OCRv4
+        image_shape = tuple(
+            dim if isinstance(dim, int) else default
+            for dim, default in zip(model_input.shape[1:], REC_IMAGE_SHAPE)
+        )
+        super().__init__(characters, image_shape)
+
+        classes = self.session.get_outputs()[0].shape[-1]
+        if isinstance(classes, int) and classes != len(self.characters):
+            raise ValueError(
+                f"O modelo {model_path} tem {classes} classes, mas o dicionário "
+                f"tem {len(self.characters)} símbolos"
+            )
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o modelo de reconhecimento.
+
+        Args:
+            batch (np.ndarray): Tensor ``(N, C, H, W)`` normalizado, em float32.
+
+        Returns:
+            np.ndarray: Probabilidades ``(N, T, C)`` por passo de tempo.
+        """
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class PlateRecognizer(RecognizerBackend):
+    """
+    Reconhecedor pequeno e específico para placas (CRNN/CTC em ONNX).
+
+    A entrada tem tamanho fixo, lido do próprio modelo, e cada recorte é
+    redimensionado para ela sem preservar a proporção e convertido para RGB,
+    como no treino. O alfabeto vem dos metadados ``characters`` do ONNX, sem o
+    branco.
+    """
+
+    def __init__(self, model_path: str, num_threads: int = 0):
+        """
+        Cria a sessão do ONNX Runtime.
+
+        Args:
+            model_path (str): Caminho do ``.onnx``.
+            num_threads (int): Threads dentro de cada operador; 0 deixa o ONNX
+                Runtime escolher.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.channels, self.height, self.width = model_input.shape[1:]
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        super().__init__(["blank"] + list(metadata.get("characters", PLATE_CHARACTERS)))
+
+    def preprocess(self, images: List[np.ndarray]) -> np.ndarray:
+        """
+        Redimensiona e normaliza os recortes para a entrada do modelo.
+
+        Args:
+            images (List[np.ndarray]): Recortes das placas em BGR.
+
+        Returns:
+            np.ndarray: Tensor ``(N, C, H, W)`` em float32, em ``[-1, 1]``.
+        """
+        batch = np.empty((len(images), self.height, self.width, 3), np.uint8)
+        for index, image in enumerate(images):
+            batch[index] = cv2.resize(image, (self.width, self.height))
+        # Troca de canais depois do resize, já no tamanho pequeno da entrada
+        batch = batch[..., ::-1]
+        if self.channels == 1:
+            batch = batch.mean(axis=3, keepdims=True)
+        return (batch.transpose(0, 3, 1, 2) / 127.5 - 1.0).astype(np.float32)
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Executa o modelo de reconhecimento.
+
+        Args:
+            batch (np.ndarray): Tensor ``(N, C, H, W)`` normalizado, em float32.
+
+        Returns:
+            np.ndarray: Probabilidades ``(N, T, C)`` por passo de tempo.
+        """
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def recognize_images(self, images: List[np.ndarray]) -> List[Tuple[str, float]]:
+        """
+        Reconhece o texto de recortes ainda não pré-processados.
+
+        Args:
+            images (List[np.ndarray]): Recortes das placas em BGR.
+
+        Returns:
+            List[Tuple[str, float]]: Texto e confiança de cada recorte.
+        """
+        return self.recognize(self.preprocess(images))
+
+
+def load_characters(model_path: str, metadata: Dict[str, str]) -> List[str]:
+    """
+    Lê o dicionário de um reconhecedor em ONNX, como o ``PlateRecognizer``.
+
+    O alfabeto vem dos metadados ``characters`` do ONNX ou, sem eles, do
+    ``REC_DICT_FILE`` ao lado do modelo. O branco do CTC é incluído no índice 0.
+
+    Args:
+        model_path (str): Caminho do ``.onnx``.
+        metadata (Dict[str, str]): Metadados personalizados do modelo.
+
+    Returns:
+        List[str]: Dicionário do modelo, com o branco no índice 0.
+
+    Raises:
+        FileNotFoundError: Se o modelo não tiver metadados nem dicionário.
+    """
+    if "characters" in metadata:
+        return ["blank"] + list(metadata["characters"])
+    dict_path = os.path.join(os.path.dirname(model_path), REC_DICT_FILE)
+    with open(dict_path, encoding="utf-8") as file:
+        return ["blank"] + file.read().splitlines()
+
+
+def create_plate_recognizer(model_path: str) -> Optional[PlateRecognizer]:
+    """
+    Carrega o reconhecedor de placas, se o modelo existir.
+
+    Args:
+        model_path (str): Caminho do ``.onnx``.
+
+    Returns:
+        Optional[PlateRecognizer]: Reconhecedor carregado, ou None se não houver
+        modelo no caminho.
+    """
+    if not os.path.isfile(model_path):
+        return None
+    return PlateRecognizer(
+        model_path, num_threads=int(os.environ.get("OCR_ONNX_INTRA_THREADS", "0"))
+    )
+
+
+def create_recognizer(
+    name: str, rec_model_dir: str, text_recognizer: Optional[Any] = None
+) -> RecognizerBackend:
+    """
+    Cria o backend do reconhecedor escolhido pelo nome.
+
+    O backend ``onnx`` lê o dicionário do próprio modelo e não precisa do
+    PaddleOCR; o ``paddle`` reaproveita o reconhecedor já carregado por ele.
+
+    Args:
+        name (str): ``paddle`` ou ``onnx``.
+        rec_model_dir (str): Diretório do modelo de reconhecimento.
+        text_recognizer (Optional[Any]): ``PaddleOCR.text_recognizer``,
+            obrigatório para o backend ``paddle``.
+
+    Returns:
+        RecognizerBackend: Backend carregado.
+
+    Raises:
+        ValueError: Se o nome do backend for desconhecido, ou se o backend
+            ``paddle`` for pedido sem o reconhecedor do PaddleOCR.
+    """
+    if name not in REC_MODEL_FILES:
+        raise ValueError(
+            f"Backend de reconhecimento '{name}' desconhecido. "
+            f"Use um de {sorted(REC_MODEL_FILES)}."
+        )
+
+    if name == "paddle":
+        if text_recognizer is None:
+            raise ValueError("O backend paddle precisa do PaddleOCR carregado.")
+        return PaddleRecognizer(text_recognizer)
+    return OnnxRecognizer(
+        os.path.join(rec_model_dir, REC_MODEL_FILES[name]),
+        intra_op_threads=int(os.environ.get("OCR_ONNX_INTRA_THREADS", "0")),
+        inter_op_threads=int(os.environ.get("OCR_ONNX_INTER_THREADS", "0")),
+    )
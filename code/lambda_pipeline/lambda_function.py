@@ -0,0 +1,208 @@
+"""Módulo para a função Lambda que detecta e reconhece placas em um só processo."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+import boto3
+import numpy as np
+from metrics import Metrics, get_logger
+from ocr_plate_detection import OCRPlateDetection
+from plate_detection import (
+    IO_WORKERS,
+    PLATE_ARCHIVE_PREFIX,
+    PlateDetection,
+    batch_response,
+    parse_event,
+    plate_crop_key,
+    plate_url,
+    prefetch_image,
+)
+from result_cache import ResultCache
+
+logger = get_logger(__name__)
+
+# Instância reaproveitada entre invocações no mesmo container (warm start)
+_pipeline: Optional["FusedPlatePipeline"] = None
+
+
+class FusedPlatePipeline(PlateDetection):
+    """
+    Detecção e OCR de placas no mesmo processo, sem passar o recorte pelo S3.
+
+    O recorte segue em memória do detector para o OCR e cada placa gera um único
+    item no DynamoDB, já com o texto reconhecido. O recorte ainda é arquivado no
+    bucket de placas, sob ``PLATE_ARCHIVE_PREFIX``, fora do prefixo que aciona o
+    lambda_ocr.
+    """
+
+    def __init__(self, s3_client: Optional[Any] = None):
+        """
+        Inicializa o detector e o motor de OCR.
+
+        Args:
+            s3_client (Optional[Any]): Cliente S3 a usar no lugar de um novo.
+        """
+        super().__init__(s3_client=s3_client, metrics=Metrics("pipeline"))
+        start = time.perf_counter()
+        # As duas etapas publicam no mesmo acumulador, uma vez por invocação
+        self.ocr_detection = OCRPlateDetection(
+            self.s3_client, self.dynamodb, self.metrics
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        self.metrics.timing("ocr_load", elapsed)
+        logger.info(f"OCR engine ready in {elapsed:.1f} ms")
+
+    def save_detections(
+        self,
+        bucket_name: str,
+        image_key: str,
+        img: Optional[np.ndarray],
+        boxes: np.ndarray,
+    ) -> None:
+        """
+        Reconhece cada placa detectada e grava um item por placa no DynamoDB.
+
+        Os uploads dos recortes rodam no pool de I/O enquanto as placas são
+        reconhecidas em um único lote; todas as gravações terminam antes do retorno.
+
+        Args:
+            bucket_name (str): Nome do bucket S3.
+            image_key (str): Chave da imagem no bucket S3.
+            img (Optional[np.ndarray]): Imagem a que as caixas se referem; pode ser
+                None quando não há caixas.
+            boxes (np.ndarray): Caixas ``(N, 4)`` das placas retornadas pelo backend.
+
+        Returns:
+            None
+        """
+        image_path = f"https://{bucket_name}.s3.amazonaws.com/{image_key}"
+
+        self.metrics.count("detections", len(boxes))
+        if len(boxes) == 0:
+            logger.info(f"Plate NOT detected in {image_key}")
+            self.save_image_data(image_key, image_path, "", 0)
+            return
+
+        logger.info(f"{len(boxes)} plate(s) detected in {image_key}")
+        base_time = datetime.utcnow()
+        plate_imgs = [
+            img[y_min:y_max, x_min:x_max] for x_min, y_min, x_max, y_max in boxes
+        ]
+        plate_keys = [
+            plate_crop_key(image_key, index, PLATE_ARCHIVE_PREFIX)
+            for index in range(len(boxes))
+        ]
+        futures = [
+            self.io_pool.submit(self.upload_crop, plate_img, plate_key)
+            for plate_img, plate_key in zip(plate_imgs, plate_keys)
+        ]
+
+        # O recorte já está em BGR, a ordem recebida pelo recognize_batch. Todas
+        # as placas da imagem vão ao reconhecedor em um único lote
+        resultados = self.ocr_detection.recognize_cached_batch(
+            [
+                (
+                    ResultCache.content_hash(
+                        str(plate_img.shape).encode()
+                        + np.ascontiguousarray(plate_img).tobytes()
+                    ),
+                    lambda plate_img=plate_img: plate_img,
+                )
+                for plate_img in plate_imgs
+            ]
+        )
+        futures.extend(
+            self.io_pool.submit(
+                self.save_image_data,
+                image_key,
+                image_path,
+                plate_url(plate_key),
+                1,
+                (base_time + timedelta(microseconds=index)).isoformat(),
+                resultado,
+            )
+            for index, (plate_key, resultado) in enumerate(zip(plate_keys, resultados))
+        )
+
+        for future in futures:
+            future.result()
+
+
+def get_pipeline(s3_client: Optional[Any] = None) -> FusedPlatePipeline:
+    """
+    Retorna o pipeline compartilhado por todas as invocações deste processo.
+
+    Args:
+        s3_client (Optional[Any]): Cliente S3 do pipeline, se ele for criado.
+
+    Returns:
+        FusedPlatePipeline: Instância compartilhada.
+    """
+    global _pipeline
+    if _pipeline is None:
+        start = time.perf_counter()
+        _pipeline = FusedPlatePipeline(s3_client)
+        elapsed = (time.perf_counter() - start) * 1000
+        _pipeline.metrics.timing("cold_start_init", elapsed)
+        logger.info(f"Cold start: FusedPlatePipeline ready in {elapsed:.1f} ms")
+    return _pipeline
+
+
+def lambda_handler(event: dict, context: Optional[object]) -> dict:
+    """
+    AWS Lambda handler function.
+
+    Recebe os mesmos eventos que o lambda_detect_plate (S3 ou lote SQS de
+    notificações do S3) e grava o resultado final de cada imagem.
+
+    Args:
+        event (dict): The event data.
+        context (Optional[object]): The context object.
+
+    Returns:
+        dict: Para eventos SQS, os ``batchItemFailures``; para eventos S3, um
+        dicionário vazio.
+
+    Raises:
+        RuntimeError: Se alguma imagem de um evento S3 falhar, para que a Lambda
+            repita a invocação.
+    """
+    objects, invalid_messages = parse_event(event)
+    for obj in objects:
+        logger.info(f"fusedPipeline {obj.bucket_name} {obj.image_key}")
+
+    cold_start = _pipeline is None
+    with ThreadPoolExecutor(max_workers=IO_WORKERS) as prefetch_pool:
+        prefetched = {}
+        if cold_start:
+            # As imagens são baixadas e decodificadas enquanto YOLO e PaddleOCR
+            # carregam
+            s3_client = boto3.client("s3")
+            prefetched = {
+                obj: prefetch_pool.submit(prefetch_image, s3_client, obj)
+                for obj in objects
+            }
+            pipeline = get_pipeline(s3_client)
+        else:
+            pipeline = get_pipeline()
+        metrics = pipeline.metrics
+
+        start = time.perf_counter()
+        failures = pipeline.process_batch(objects, prefetched)
+        elapsed = (time.perf_counter() - start) * 1000
+    logger.info(
+        f"{len(objects)} image(s) processed in {elapsed:.1f} ms "
+        f"({'cold' if cold_start else 'warm'} start), {len(failures)} failure(s)"
+    )
+    logger.debug(f"Result cache: {pipeline.result_cache.stats()}")
+    logger.debug(f"OCR result cache: {pipeline.ocr_detection.result_cache.stats()}")
+
+    metrics.timing("invocation", elapsed)
+    metrics.count("images", len(objects))
+    metrics.count("failures", len(failures) + len(invalid_messages))
+    metrics.count("cold_starts", int(cold_start))
+    metrics.flush(RequestId=getattr(context, "aws_request_id", None))
+
+    return batch_response(event, invalid_messages, failures)
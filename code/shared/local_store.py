@@ -0,0 +1,475 @@
+"""Módulo com substitutos locais do S3 e do DynamoDB, gravados em disco."""
+
+import io
+import json
+import os
+import re
+import threading
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Chaves das tabelas conhecidas; as demais usam PK + timestamp
+KEY_SCHEMAS = {"plate-detection-cache-prod": ("content_hash",)}
+DEFAULT_KEY_SCHEMA = ("PK", "timestamp")
+# Índices secundários conhecidos: nome -> (chave de partição, sort key)
+INDEX_SCHEMAS = {"plate_text-timestamp-index": ("plate_text", "timestamp")}
+
+# Operadores das condições do boto3 (boto3.dynamodb.conditions) aceitos em query
+KEY_CONDITION_OPERATORS: Dict[str, Callable[..., bool]] = {
+    "=": lambda value, other: value == other,
+    "<": lambda value, other: value < other,
+    "<=": lambda value, other: value <= other,
+    ">": lambda value, other: value > other,
+    ">=": lambda value, other: value >= other,
+    "BETWEEN": lambda value, low, high: low <= value <= high,
+    "begins_with": lambda value, prefix: str(value).startswith(prefix),
+}
+
+
+def _matches(condition: Any, item: Dict[str, Any]) -> bool:
+    """Avalia uma condição de chave do boto3 (``Key("PK").eq(...)``) em um item."""
+    expression = condition.get_expression()
+    operator, values = expression["operator"], expression["values"]
+    if operator == "AND":
+        return all(_matches(value, item) for value in values)
+    name = values[0].name
+    return name in item and KEY_CONDITION_OPERATORS[operator](item[name], *values[1:])
+
+
+def _json_default(value: Any) -> Any:
+    """Serializa os Decimal do DynamoDB como números JSON."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+class LocalS3Client:
+    """
+    Substituto do cliente S3 do boto3 que grava os objetos em um diretório.
+
+    Cada objeto fica em ``<root>/<bucket>/<key>`` e seus metadados de usuário, se
+    houver, em ``<root>/.metadata/<bucket>/<key>.json``. Só as operações usadas
+    pelo projeto são implementadas.
+    """
+
+    def __init__(self, root: str):
+        """
+        Inicializa o cliente local.
+
+        Args:
+            root (str): Diretório raiz dos buckets.
+        """
+        self.root = root
+
+    def _path(self, bucket: str, key: str) -> str:
+        """Retorna o caminho do arquivo de um objeto."""
+        return os.path.join(self.root, bucket, key)
+
+    def _metadata_path(self, bucket: str, key: str) -> str:
+        """Retorna o caminho do arquivo com os metadados de usuário de um objeto."""
+        return os.path.join(self.root, ".metadata", bucket, f"{key}.json")
+
+    def put_object(
+        self,
+        Bucket: str,
+        Key: str,
+        Body: Any,
+        Metadata: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Grava um objeto.
+
+        Args:
+            Bucket (str): Nome do bucket.
+            Key (str): Chave do objeto.
+            Body (Any): Conteúdo em bytes, str ou arquivo.
+            Metadata (Optional[Dict[str, str]]): Metadados de usuário do objeto.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta vazia, como a do boto3.
+        """
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        elif hasattr(Body, "read"):
+            Body = Body.read()
+
+        path = self._path(Bucket, Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(Body)
+
+        metadata_path = self._metadata_path(Bucket, Key)
+        if Metadata:
+            os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
+            with open(metadata_path, "w") as file:
+                json.dump(Metadata, file)
+        elif os.path.exists(metadata_path):
+            os.remove(metadata_path)
+        return {}
+
+    def upload_fileobj(
+        self, Fileobj: Any, Bucket: str, Key: str, ExtraArgs: Optional[dict] = None
+    ) -> None:
+        """
+        Grava o conteúdo de um arquivo aberto.
+
+        Args:
+            Fileobj (Any): Arquivo aberto em modo binário.
+            Bucket (str): Nome do bucket.
+            Key (str): Chave do objeto.
+            ExtraArgs (Optional[dict]): Argumentos extras do boto3; só ``Metadata``
+                é usado.
+
+        Returns:
+            None
+        """
+        self.put_object(
+            Bucket=Bucket,
+            Key=Key,
+            Body=Fileobj.read(),
+            Metadata=(ExtraArgs or {}).get("Metadata"),
+        )
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        """
+        Lê um objeto.
+
+        Args:
+            Bucket (str): Nome do bucket.
+            Key (str): Chave do objeto.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta com o conteúdo em ``Body`` e os metadados de usuário em
+            ``Metadata``.
+
+        Raises:
+            FileNotFoundError: Se o objeto não existir.
+        """
+        with open(self._path(Bucket, Key), "rb") as file:
+            data = file.read()
+
+        metadata = {}
+        metadata_path = self._metadata_path(Bucket, Key)
+        if os.path.exists(metadata_path):
+            with open(metadata_path, "r") as file:
+                metadata = json.load(file)
+        return {
+            "Body": io.BytesIO(data),
+            "ContentLength": len(data),
+            "Metadata": metadata,
+        }
+
+    def generate_presigned_url(
+        self, ClientMethod: str, Params: Dict[str, str], ExpiresIn: int = 3600
+    ) -> str:
+        """
+        Monta o equivalente local de uma URL assinada: o ``file://`` do objeto.
+
+        Args:
+            ClientMethod (str): Operação assinada; só ``get_object`` é aceita.
+            Params (Dict[str, str]): ``Bucket`` e ``Key`` do objeto.
+            ExpiresIn (int): Validade em segundos, registrada na URL.
+
+        Returns:
+            str: URL do arquivo do objeto.
+
+        Raises:
+            ValueError: Se a operação não for ``get_object``.
+        """
+        if ClientMethod != "get_object":
+            raise ValueError(f"Operação '{ClientMethod}' não suportada")
+        path = os.path.abspath(self._path(Params["Bucket"], Params["Key"]))
+        return f"file://{path}?X-Amz-Expires={ExpiresIn}"
+
+
+class LocalTable:
+    """
+    Substituto de uma tabela DynamoDB do boto3, mantido em memória.
+
+    Quando um caminho é informado, a tabela é lida dele na criação e gravada nele
+    (JSON) a cada alteração.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key_schema: Tuple[str, ...] = DEFAULT_KEY_SCHEMA,
+        path: Optional[str] = None,
+    ):
+        """
+        Inicializa a tabela local.
+
+        Args:
+            name (str): Nome da tabela.
+            key_schema (Tuple[str, ...]): Atributos que formam a chave primária.
+            path (Optional[str]): Arquivo JSON de persistência, ou None.
+        """
+        self.name = name
+        self.key_schema = key_schema
+        self.path = path
+        self._items: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path, "r") as file:
+                for item in json.load(file, parse_float=Decimal, parse_int=Decimal):
+                    self._items[self._key(item)] = item
+
+    def load(self) -> None:
+        """Mantém a interface do recurso boto3; a tabela local sempre existe."""
+
+    def _key(self, item: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Extrai a chave primária de um item."""
+        return tuple(item[name] for name in self.key_schema)
+
+    def _save(self) -> None:
+        """Grava a tabela no arquivo de persistência, se houver."""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w") as file:
+            json.dump(list(self._items.values()), file, default=_json_default)
+
+    def put_item(self, Item: Dict[str, Any], **kwargs) -> dict:
+        """
+        Grava um item, substituindo o que tiver a mesma chave.
+
+        Args:
+            Item (Dict[str, Any]): Item a ser gravado.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta vazia, como a do boto3.
+        """
+        with self._lock:
+            self._items[self._key(Item)] = dict(Item)
+            self._save()
+        return {}
+
+    def get_item(self, Key: Dict[str, Any], **kwargs) -> dict:
+        """
+        Lê um item pela chave primária.
+
+        Args:
+            Key (Dict[str, Any]): Chave primária.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta com o item em ``Item``, se existir.
+        """
+        with self._lock:
+            item = self._items.get(self._key(Key))
+        return {"Item": dict(item)} if item else {}
+
+    def update_item(
+        self,
+        Key: Dict[str, Any],
+        UpdateExpression: str,
+        ExpressionAttributeValues: Dict[str, Any],
+        **kwargs,
+    ) -> dict:
+        """
+        Atualiza (ou cria) um item com uma expressão ``SET``.
+
+        Args:
+            Key (Dict[str, Any]): Chave primária.
+            UpdateExpression (str): Expressão no formato ``SET a = :a, b = :b``.
+            ExpressionAttributeValues (Dict[str, Any]): Valores da expressão.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta vazia, como a do boto3.
+        """
+        assignments = re.sub(r"^\s*SET\s+", "", UpdateExpression, flags=re.IGNORECASE)
+        with self._lock:
+            item = self._items.setdefault(self._key(Key), dict(Key))
+            for assignment in assignments.split(","):
+                name, placeholder = (part.strip() for part in assignment.split("="))
+                item[name] = ExpressionAttributeValues[placeholder]
+            self._save()
+        return {}
+
+    def query(
+        self,
+        KeyConditionExpression: Any,
+        IndexName: Optional[str] = None,
+        ScanIndexForward: bool = True,
+        Limit: Optional[int] = None,
+        ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+        ProjectionExpression: Optional[str] = None,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Consulta os itens de uma partição da tabela ou de um índice em ``INDEX_SCHEMAS``.
+
+        Como no DynamoDB, os itens sem a chave do índice ficam de fora dele, a
+        ordem é a da sort key e a paginação usa ``Limit``, ``ExclusiveStartKey``
+        e ``LastEvaluatedKey``.
+
+        Args:
+            KeyConditionExpression (Any): Condição montada com
+                ``boto3.dynamodb.conditions.Key``.
+            IndexName (Optional[str]): Índice consultado, ou None para a tabela.
+            ScanIndexForward (bool): Ordem crescente (True) ou decrescente da
+                sort key.
+            Limit (Optional[int]): Máximo de itens na página.
+            ExclusiveStartKey (Optional[Dict[str, Any]]): ``LastEvaluatedKey`` da
+                página anterior.
+            ProjectionExpression (Optional[str]): Atributos retornados, separados
+                por vírgula.
+            ExpressionAttributeNames (Optional[Dict[str, str]]): Nomes
+                substituídos em ``ProjectionExpression``.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta com ``Items``, ``Count`` e, se houver mais itens,
+            ``LastEvaluatedKey``.
+        """
+        key_names = list(self.key_schema)
+        sort_key = self.key_schema[-1]
+        if IndexName:
+            index_schema = INDEX_SCHEMAS[IndexName]
+            key_names += [name for name in index_schema if name not in key_names]
+            sort_key = index_schema[-1]
+
+        with self._lock:
+            items = [
+                dict(item)
+                for item in self._items.values()
+                if _matches(KeyConditionExpression, item)
+            ]
+        items.sort(
+            key=lambda item: item.get(sort_key, ""), reverse=not ScanIndexForward
+        )
+
+        return self._page(
+            items,
+            key_names,
+            Limit,
+            ExclusiveStartKey,
+            ProjectionExpression,
+            ExpressionAttributeNames,
+        )
+
+    def scan(
+        self,
+        Limit: Optional[int] = None,
+        ExclusiveStartKey: Optional[Dict[str, Any]] = None,
+        ProjectionExpression: Optional[str] = None,
+        ExpressionAttributeNames: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Lê os itens da tabela em páginas, na ordem de inserção.
+
+        Args:
+            Limit (Optional[int]): Máximo de itens na página.
+            ExclusiveStartKey (Optional[Dict[str, Any]]): ``LastEvaluatedKey`` da
+                página anterior.
+            ProjectionExpression (Optional[str]): Atributos retornados, separados
+                por vírgula.
+            ExpressionAttributeNames (Optional[Dict[str, str]]): Nomes
+                substituídos em ``ProjectionExpression``.
+            **kwargs: Demais argumentos do boto3, ignorados.
+
+        Returns:
+            dict: Resposta com ``Items``, ``Count`` e, se houver mais itens,
+            ``LastEvaluatedKey``.
+        """
+        with self._lock:
+            items = [dict(item) for item in self._items.values()]
+        return self._page(
+            items,
+            list(self.key_schema),
+            Limit,
+            ExclusiveStartKey,
+            ProjectionExpression,
+            ExpressionAttributeNames,
+        )
+
+    @staticmethod
+    def _page(
+        items: List[Dict[str, Any]],
+        key_names: List[str],
+        limit: Optional[int],
+        start_key: Optional[Dict[str, Any]],
+        projection: Optional[str],
+        attribute_names: Optional[Dict[str, str]],
+    ) -> dict:
+        """Aplica o cursor, o limite e a projeção de ``query`` e ``scan``."""
+        if start_key:
+            start = next(
+                (
+                    position + 1
+                    for position, item in enumerate(items)
+                    if all(item.get(name) == start_key.get(name) for name in key_names)
+                ),
+                0,
+            )
+            items = items[start:]
+
+        response: Dict[str, Any] = {}
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            response["LastEvaluatedKey"] = {name: items[-1][name] for name in key_names}
+
+        if projection:
+            names = attribute_names or {}
+            projected = [
+                names.get(name.strip(), name.strip()) for name in projection.split(",")
+            ]
+            items = [
+                {name: item[name] for name in projected if name in item}
+                for item in items
+            ]
+
+        response.update({"Items": items, "Count": len(items)})
+        return response
+
+    def items(self) -> list:
+        """
+        Retorna uma cópia de todos os itens, útil em testes.
+
+        Returns:
+            list: Itens da tabela.
+        """
+        with self._lock:
+            return [dict(item) for item in self._items.values()]
+
+
+class LocalDynamoDB:
+    """Substituto do recurso DynamoDB do boto3, com tabelas ``LocalTable``."""
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Inicializa o recurso local.
+
+        Args:
+            root (Optional[str]): Diretório dos arquivos das tabelas, ou None para
+                mantê-las só em memória.
+        """
+        self.root = root
+        self._tables: Dict[str, LocalTable] = {}
+        self._lock = threading.Lock()
+
+    def Table(self, name: str) -> LocalTable:
+        """
+        Retorna a tabela com o nome informado, criando-a se necessário.
+
+        Args:
+            name (str): Nome da tabela.
+
+        Returns:
+            LocalTable: Tabela local.
+        """
+        with self._lock:
+            if name not in self._tables:
+                path = os.path.join(self.root, f"{name}.json") if self.root else None
+                self._tables[name] = LocalTable(
+                    name, KEY_SCHEMAS.get(name, DEFAULT_KEY_SCHEMA), path
+                )
+            return self._tables[name]
@@ -0,0 +1,192 @@
+"""Módulo com a instrumentação de tempos, contadores e logs das Lambdas."""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "PlateDetection")
+# emf: JSON no stdout, lido pelo CloudWatch; file: JSON em METRICS_FILE; none
+METRICS_SINK = os.environ.get("METRICS_SINK", "emf")
+METRICS_FILE = os.environ.get("METRICS_FILE", "/tmp/metrics.jsonl")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+# Limite de valores por métrica em um documento EMF
+EMF_MAX_VALUES = 100
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Retorna um logger com o nível definido por ``LOG_LEVEL``.
+
+    Na Lambda o runtime já configura o logger raiz; fora dela, uma configuração
+    mínima é criada para que as mensagens apareçam no stderr.
+
+    Args:
+        name (str): Nome do logger, normalmente ``__name__``.
+
+    Returns:
+        logging.Logger: Logger configurado.
+    """
+    if not logging.getLogger().handlers:
+        logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    logger = logging.getLogger(name)
+    logger.setLevel(LOG_LEVEL)
+    return logger
+
+
+class Metrics:
+    """
+    Acumula tempos por etapa e contadores e os publica em lote.
+
+    Os valores ficam em memória até ``flush``, chamado uma vez por invocação,
+    que gera documentos no CloudWatch Embedded Metric Format (EMF). Com o sink
+    ``emf`` eles vão para o stdout, de onde o CloudWatch Logs extrai as métricas
+    sem chamadas à API; com ``file`` são gravados em um arquivo JSON lines. É
+    seguro registrar valores de várias threads.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        sink: str = METRICS_SINK,
+        namespace: str = METRICS_NAMESPACE,
+        path: str = METRICS_FILE,
+    ):
+        """
+        Inicializa o acumulador.
+
+        Args:
+            service (str): Valor da dimensão ``Service`` (ex.: ``detect``, ``ocr``).
+            sink (str): Destino dos documentos: ``emf``, ``file`` ou ``none``.
+            namespace (str): Namespace das métricas no CloudWatch.
+            path (str): Arquivo usado pelo sink ``file``.
+        """
+        self.service = service
+        self.sink = sink
+        self.namespace = namespace
+        self.path = path
+        self._timings: Dict[str, List[float]] = defaultdict(list)
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """
+        Mede a duração de um bloco e a registra como ``name``, em milissegundos.
+
+        Args:
+            name (str): Nome da etapa.
+
+        Yields:
+            None
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timing(name, (time.perf_counter() - start) * 1000)
+
+    def timing(self, name: str, milliseconds: float) -> None:
+        """
+        Registra uma duração já medida.
+
+        Args:
+            name (str): Nome da etapa.
+            milliseconds (float): Duração em milissegundos.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._timings[name].append(round(milliseconds, 3))
+
+    def count(self, name: str, value: float = 1) -> None:
+        """
+        Incrementa um contador.
+
+        Args:
+            name (str): Nome do contador.
+            value (float): Valor somado ao contador.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._counters[name] += value
+
+    def flush(self, **properties: Any) -> List[Dict[str, Any]]:
+        """
+        Publica e descarta os valores acumulados.
+
+        Args:
+            **properties: Campos extras incluídos nos documentos, como o id da
+                requisição; não viram dimensões.
+
+        Returns:
+            List[Dict[str, Any]]: Documentos EMF gerados (vazio se não havia
+            valores).
+        """
+        with self._lock:
+            timings, self._timings = self._timings, defaultdict(list)
+            counters, self._counters = self._counters, defaultdict(float)
+
+        documents = self._documents(timings, counters, properties)
+        if self.sink == "emf":
+            for document in documents:
+                # O CloudWatch só reconhece o EMF em linhas JSON sem prefixo
+                sys.stdout.write(json.dumps(document) + "\n")
+            sys.stdout.flush()
+        elif self.sink == "file":
+            with open(self.path, "a") as file:
+                for document in documents:
+                    file.write(json.dumps(document) + "\n")
+        return documents
+
+    def _documents(
+        self,
+        timings: Dict[str, List[float]],
+        counters: Dict[str, float],
+        properties: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        """Monta os documentos EMF, respeitando o limite de valores por métrica."""
+        if not timings and not counters:
+            return []
+
+        documents = []
+        chunks = max([len(values) for values in timings.values()] + [1])
+        for offset in range(0, chunks, EMF_MAX_VALUES):
+            values: Dict[str, Any] = {}
+            definitions = []
+            for name, samples in timings.items():
+                chunk = samples[offset : offset + EMF_MAX_VALUES]
+                if chunk:
+                    values[name] = chunk
+                    definitions.append({"Name": name, "Unit": "Milliseconds"})
+            if offset == 0:
+                for name, total in counters.items():
+                    values[name] = total
+                    definitions.append({"Name": name, "Unit": "Count"})
+
+            documents.append(
+                {
+                    "_aws": {
+                        "Timestamp": int(time.time() * 1000),
+                        "CloudWatchMetrics": [
+                            {
+                                "Namespace": self.namespace,
+                                "Dimensions": [["Service"]],
+                                "Metrics": definitions,
+                            }
+                        ],
+                    },
+                    "Service": self.service,
+                    **properties,
+                    **values,
+                }
+            )
+        return documents
@@ -0,0 +1,214 @@
+"""Módulo com o cache de resultados endereçado pelo conteúdo da imagem."""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import Metrics, get_logger
+
+logger = get_logger(__name__)
+
+# Tabela do nível persistente; vazia (padrão) mantém o cache só em memória
+RESULT_CACHE_TABLE = os.environ.get("RESULT_CACHE_TABLE", "")
+RESULT_CACHE_TTL_SECONDS = int(
+    os.environ.get("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+)
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_MAX_ENTRIES", "1024"))
+
+
+class ResultCache:
+    """
+    Cache em dois níveis: LRU em memória do processo e tabela DynamoDB com TTL.
+
+    As chaves são o SHA-256 do conteúdo da imagem, prefixado por um namespace
+    (``detect`` ou ``ocr``) para que as duas etapas possam dividir a mesma tabela.
+    A tabela usa ``content_hash`` como chave de partição e ``expires_at`` como
+    atributo de TTL. Falhas no DynamoDB nunca interrompem o processamento: são
+    registradas e tratadas como cache miss.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        table: Optional[Any] = None,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = RESULT_CACHE_TTL_SECONDS,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Inicializa o cache.
+
+        Args:
+            namespace (str): Prefixo das chaves desta etapa.
+            table (Optional[Any]): Tabela DynamoDB do nível persistente, ou None
+                para usar só o nível em memória.
+            max_entries (int): Quantidade máxima de entradas em memória.
+            ttl_seconds (int): Tempo de vida das entradas, em segundos.
+            metrics (Optional[Metrics]): Onde os acertos e misses também são
+                contados (``<namespace>_cache_*``), ou None.
+        """
+        self.namespace = namespace
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.metrics = metrics
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """
+        Calcula a chave de conteúdo de uma imagem.
+
+        Args:
+            data (bytes): Bytes da imagem.
+
+        Returns:
+            str: SHA-256 em hexadecimal.
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca um resultado, primeiro em memória e depois no DynamoDB.
+
+        Args:
+            content_hash (str): Chave de conteúdo da imagem.
+
+        Returns:
+            Optional[Dict[str, Any]]: Resultado armazenado ou None em caso de miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(content_hash)
+                self.memory_hits += 1
+                self._count("memory_hits")
+                return entry[1]
+
+        value = self._get_persistent(content_hash, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.persistent_hits += 1
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("persistent_hits")
+        self._remember(content_hash, value, now + self.ttl_seconds)
+        return value
+
+    def put(self, content_hash: str, value: Dict[str, Any]) -> None:
+        """
+        Armazena um resultado nos dois níveis.
+
+        Args:
+            content_hash (str): Chave de conteúdo da imagem.
+            value (Dict[str, Any]): Resultado serializável pelo DynamoDB.
+
+        Returns:
+            None
+        """
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(content_hash, value, expires_at)
+
+        if self.table is None:
+            return
+        try:
+            self.table.put_item(
+                Item={
+                    "content_hash": f"{self.namespace}#{content_hash}",
+                    "result": value,
+                    "expires_at": int(expires_at),
+                }
+            )
+        except Exception as e:
+            logger.warning(f"Erro ao gravar no cache persistente: {str(e)}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna os contadores de acertos e falhas do cache.
+
+        Returns:
+            Dict[str, int]: Acertos em memória, acertos no DynamoDB e misses.
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+            }
+
+    def _count(self, name: str) -> None:
+        """Conta um acerto ou miss nas métricas, se houver."""
+        if self.metrics is not None:
+            self.metrics.count(f"{self.namespace}_cache_{name}")
+
+    def _remember(
+        self, content_hash: str, value: Dict[str, Any], expires_at: float
+    ) -> None:
+        """Guarda uma entrada em memória, descartando a menos usada se necessário."""
+        with self._lock:
+            self._entries[content_hash] = (expires_at, value)
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_persistent(self, content_hash: str, now: float) -> Optional[dict]:
+        """Busca uma entrada no DynamoDB, ignorando as já expiradas."""
+        if self.table is None:
+            return None
+        try:
+            response = self.table.get_item(
+                Key={"content_hash": f"{self.namespace}#{content_hash}"}
+            )
+        except Exception as e:
+            logger.warning(f"Erro ao consultar o cache persistente: {str(e)}")
+            return None
+
+        item = response.get("Item")
+        # O TTL do DynamoDB pode levar horas para remover itens expirados
+        if not item or int(item.get("expires_at", 0)) <= now:
+            return None
+        return item["result"]
+
+
+def create_result_cache(
+    namespace: str, dynamodb: Any, metrics: Optional[Metrics] = None
+) -> ResultCache:
+    """
+    Cria o cache com o nível persistente configurado por ``RESULT_CACHE_TABLE``.
+
+    A tabela é verificada uma única vez, aqui: se ela não existir ou não puder
+    ser lida, o erro é registrado e o cache fica só em memória, em vez de falhar
+    em cada consulta.
+
+    Args:
+        namespace (str): Prefixo das chaves desta etapa.
+        dynamodb (Any): Recurso boto3 do DynamoDB.
+        metrics (Optional[Metrics]): Onde os acertos e misses são contados.
+
+    Returns:
+        ResultCache: Cache pronto para uso; só em memória se a variável for vazia
+        ou se a tabela não estiver acessível.
+    """
+    table = None
+    if RESULT_CACHE_TABLE:
+        table = dynamodb.Table(RESULT_CACHE_TABLE)
+        try:
+            table.load()
+        except Exception as e:
+            logger.error(
+                f"Cache persistente desativado, tabela {RESULT_CACHE_TABLE} "
+                f"inacessível: {str(e)}"
+            )
+            table = None
+    return ResultCache(namespace, table, metrics=metrics)
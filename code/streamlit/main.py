@@ -1,6 +1,35 @@
 """Módulo principal para a aplicação de reconhecimento de placas de carro."""
 
-from src import Any, BytesIO, Dict, DynamoDBInteraction, Image, S3Interaction, st, time
+from src import (
+    Any,
+    BinaryIO,
+    CropCache,
+    Dict,
+    DynamoDBInteraction,
+    Image,
+    List,
+    LocalNotifier,
+    Optional,
+    PreparedImage,
+    S3Interaction,
+    ThreadPoolExecutor,
+    Tuple,
+    as_completed,
+    get_crop_cache,
+    get_dynamodb_interaction,
+    get_notifier,
+    get_s3_interaction,
+    nullcontext,
+    os,
+    prepare_image,
+    st,
+    time,
+)
+
+# Espera pela notificação antes de recorrer às consultas na tabela
+RESULT_NOTIFY_TIMEOUT = float(os.environ.get("RESULT_NOTIFY_TIMEOUT", "30"))
+# Imagens enviadas e aguardadas ao mesmo tempo
+UPLOAD_WORKERS = int(os.environ.get("UPLOAD_WORKERS", "8"))
 
 # Configurações de tema e estilo
 st.set_page_config(
@@ -10,13 +39,65 @@ st.set_page_config(
 )
 
 
-def display_results(original_image_buffer: BytesIO, plate_data: Dict[str, Any]) -> None:
+def process_upload(
+    s3_interaction: S3Interaction,
+    dynamodb_interaction: DynamoDBInteraction,
+    notifier: Optional[LocalNotifier],
+    bucket_name: str,
+    table_name: str,
+    uploaded_image: BinaryIO,
+    name: str,
+) -> Tuple[PreparedImage, str, Optional[List[Dict[str, Any]]]]:
+    """
+    Prepara e envia uma imagem e aguarda o seu resultado, sem chamar o Streamlit.
+
+    Executada nas threads do upload; a tela é atualizada pela thread principal.
+
+    Args:
+        s3_interaction (S3Interaction): Cliente do S3.
+        dynamodb_interaction (DynamoDBInteraction): Acesso ao DynamoDB.
+        notifier (Optional[LocalNotifier]): Notificador dos resultados, se houver.
+        bucket_name (str): Bucket de upload.
+        table_name (str): Tabela das placas.
+        uploaded_image (BinaryIO): Arquivo carregado pelo usuário.
+        name (str): Nome do arquivo carregado.
+
+    Returns:
+        Tuple[PreparedImage, str, Optional[List[Dict[str, Any]]]]: Imagem enviada,
+        mensagem do upload e um item por placa (None se não encontrados).
+    """
+    prepared = prepare_image(uploaded_image, name)
+    # Criar um nome único para o objeto no S3
+    object_name = f"{time.time_ns()}_{prepared.name}"
+    # A inscrição vem antes do upload para não perder o resultado
+    with notifier.subscribe(object_name) if notifier else nullcontext() as subscription:
+        result_message = s3_interaction.upload_image(
+            prepared.buffer, bucket_name, object_name, prepared.content_type
+        )
+        plate_data = subscription.wait(RESULT_NOTIFY_TIMEOUT) if subscription else None
+
+    # Sem placa, a notificação já é o resultado. Com placas, ela só avisa que um
+    # recorte foi reconhecido, e as demais placas da imagem vêm da tabela; sem
+    # notificação a tempo, a busca também espera o OCR
+    if plate_data is not None and plate_data.get("detected") == 0:
+        return prepared, result_message, [plate_data]
+    plates = dynamodb_interaction.fetch_plate_data(table_name, object_name)
+    return prepared, result_message, plates
+
+
+def display_results(
+    original_image_buffer: BinaryIO,
+    plates: Optional[List[Dict[str, Any]]],
+    crop_cache: CropCache,
+) -> None:
     """
     Exibe os resultados da detecção na interface do usuário.
 
     Args:
-        original_image_buffer (BytesIO): Buffer de imagem original.
-        plate_data (Dict[str, Any]): Dados da placa encontrados no DynamoDB.
+        original_image_buffer (BinaryIO): Buffer de imagem original.
+        plates (Optional[List[Dict[str, Any]]]): Itens da imagem no DynamoDB, um
+            por placa.
+        crop_cache (CropCache): Cache dos recortes das placas.
     """
     col1, col2 = st.columns(2)
 
@@ -30,21 +111,26 @@ def display_results(original_image_buffer: BytesIO, plate_data: Dict[str, Any])
 
     # Exibe os resultados do DynamoDB
     with col2:
-        if plate_data:
-            if plate_data.get("detected") == 0:
+        if plates:
+            if plates[0].get("detected") == 0:
                 st.warning("Nenhuma placa detectada na imagem.")
                 return
-            st.success("Dados encontrados no DynamoDB:")
-            st.write("**Cropped Image Path:** ", plate_data.get("cropped_image_path"))
-            st.write("**Detected:** ", plate_data.get("detected"))
-            st.write("**Detected Text:** ", plate_data.get("detected_text"))
-            st.write("**Image Path:** ", plate_data.get("image_path"))
-            # Exibe a imagem recortada da placa, se disponível
-            cropped_image_path = plate_data.get("cropped_image_path")
-            if cropped_image_path:
-                st.image(
-                    cropped_image_path, caption="Placa Detectada", use_column_width=True
+            st.success(f"Dados encontrados no DynamoDB ({len(plates)} placa(s)):")
+            for plate_data in plates:
+                st.write(
+                    "**Cropped Image Path:** ", plate_data.get("cropped_image_path")
                 )
+                st.write("**Detected:** ", plate_data.get("detected"))
+                st.write("**Detected Text:** ", plate_data.get("detected_text"))
+                st.write("**Image Path:** ", plate_data.get("image_path"))
+                # Exibe a imagem recortada da placa, se disponível
+                cropped_image_path = plate_data.get("cropped_image_path")
+                if cropped_image_path:
+                    st.image(
+                        crop_cache.image(cropped_image_path),
+                        caption="Placa Detectada",
+                        use_column_width=True,
+                    )
         else:
             st.error("Não foi possível encontrar informações relacionadas à placa.")
 
@@ -96,51 +182,72 @@ def main() -> None:
 
             # Botão para realizar o upload
             if st.button("Fazer Upload"):
-                s3_interaction = S3Interaction()
-                dynamodb_interaction = DynamoDBInteraction()
+                s3_interaction = get_s3_interaction()
+                dynamodb_interaction = get_dynamodb_interaction()
+                notifier = get_notifier(dynamodb_table_name)
+                crop_cache = get_crop_cache()
 
+                # Um espaço por imagem, preenchido quando o resultado chegar
+                placeholders = []
                 for uploaded_image in uploaded_images:
-                    # Mantém os dados da imagem em um buffer
-                    uploaded_image_buffer = BytesIO(uploaded_image.read())
-                    uploaded_image_buffer.seek(0)
-
-                    # Cria uma cópia do buffer para evitar fechamento prematuro
-                    image_buffer_copy = BytesIO(uploaded_image_buffer.getvalue())
-
-                    # Exibe a imagem original carregada
                     st.subheader(f"Imagem carregada: {uploaded_image.name}")
-                    st.image(
-                        image_buffer_copy,
-                        caption="Imagem Original",
-                        use_column_width=True,
-                    )
-
-                    # Criar um nome único para o objeto no S3
-                    object_name = f"{time.time_ns()}_{uploaded_image.name}"
-                    result_message = s3_interaction.upload_image(
-                        uploaded_image_buffer, bucket_name, object_name
-                    )
-                    st.success(result_message)
-
-                    # Busca no DynamoDB
-                    st.info(
-                        f"Aguardando informações no DynamoDB para {uploaded_image.name}..."
-                    )
-                    plate_data = dynamodb_interaction.fetch_plate_data(
-                        dynamodb_table_name, object_name
-                    )
-
-                    # Verifica se a placa foi detectada
-                    if plate_data and plate_data.get("detected") == 0:
-                        st.warning(
-                            f"Nenhuma placa detectada na imagem {uploaded_image.name}. Pulando para a próxima imagem."
+                    placeholder = st.empty()
+                    with placeholder.container():
+                        st.image(
+                            uploaded_image,
+                            caption="Imagem Original",
+                            use_column_width=True,
                         )
-                        continue
-
-                    # Reposiciona o buffer da imagem antes de reutilizá-lo
-                    image_buffer_copy.seek(0)
-                    # Exibe resultados
-                    display_results(image_buffer_copy, plate_data)
+                        st.info(
+                            f"Aguardando informações no DynamoDB para {uploaded_image.name}..."
+                        )
+                    placeholders.append(placeholder)
+
+                # As threads só fazem E/S; toda chamada ao st fica nesta thread
+                with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+                    futures = {
+                        executor.submit(
+                            process_upload,
+                            s3_interaction,
+                            dynamodb_interaction,
+                            notifier,
+                            bucket_name,
+                            dynamodb_table_name,
+                            uploaded_image,
+                            uploaded_image.name,
+                        ): index
+                        for index, uploaded_image in enumerate(uploaded_images)
+                    }
+                    for future in as_completed(futures):
+                        index = futures[future]
+                        name = uploaded_images[index].name
+                        try:
+                            prepared, result_message, plates = future.result()
+                        except Exception as e:
+                            # A falha fica no espaço da imagem; as demais seguem
+                            placeholders[index].error(
+                                f"Erro ao processar a imagem {name}: {str(e)}"
+                            )
+                            continue
+                        with placeholders[index].container():
+                            st.success(result_message)
+                            st.caption(
+                                f"Enviados {prepared.uploaded_size / 1024:.0f} KB de "
+                                f"{prepared.original_size / 1024:.0f} KB originais "
+                                f"(preparo em {prepared.encode_ms:.0f} ms)"
+                            )
+                            # Verifica se a placa foi detectada
+                            if plates and plates[0].get("detected") == 0:
+                                prepared.buffer.seek(0)
+                                st.image(
+                                    prepared.buffer.read(),
+                                    caption="Imagem Original",
+                                    use_column_width=True,
+                                )
+                                st.warning(f"Nenhuma placa detectada na imagem {name}.")
+                                continue
+                            # Exibe resultados
+                            display_results(prepared.buffer, plates, crop_cache)
 
 
 if __name__ == "__main__":
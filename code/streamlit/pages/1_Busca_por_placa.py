@@ -0,0 +1,68 @@
+"""Página de busca das detecções pelo texto da placa."""
+
+from src import (
+    PLATE_TEXT_INDEX,
+    display_detection,
+    get_crop_cache,
+    get_dynamodb_interaction,
+    normalize_plate_text,
+    st,
+)
+
+DYNAMODB_TABLE_NAME = "plate-detection-info-prod"
+PAGE_SIZE = 20
+
+
+def main() -> None:
+    """Busca uma placa no índice por texto e exibe as detecções, paginadas."""
+    st.title("Busca por placa")
+    texto = st.text_input("Placa", placeholder="ABC1D23")
+    plate_text = normalize_plate_text(texto)
+    if not plate_text:
+        return
+
+    state = st.session_state
+    # Pilha de cursores: o último é o início da página atual
+    if state.get("search_plate_text") != plate_text:
+        state.search_plate_text = plate_text
+        state.search_cursors = [None]
+
+    try:
+        items, next_key = get_dynamodb_interaction().search_plate(
+            DYNAMODB_TABLE_NAME, plate_text, PAGE_SIZE, state.search_cursors[-1]
+        )
+    except Exception as e:
+        st.error(
+            f"Erro ao buscar a placa no índice {PLATE_TEXT_INDEX} do DynamoDB: "
+            f"{str(e)}"
+        )
+        return
+
+    page = len(state.search_cursors)
+    if not items:
+        st.info(f"Nenhuma detecção da placa {plate_text}.")
+    else:
+        st.caption(f"Página {page} das detecções de {plate_text}")
+        crop_cache = get_crop_cache()
+        for item in items:
+            display_detection(item, crop_cache)
+            st.divider()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(
+            "Anterior",
+            disabled=page == 1,
+            on_click=state.search_cursors.pop,
+        )
+    with col2:
+        st.button(
+            "Próxima",
+            disabled=next_key is None,
+            on_click=state.search_cursors.append,
+            args=(next_key,),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Página com o histórico de detecções, lido em páginas."""
+
+from src import display_detection, get_crop_cache, get_history_pages, st
+
+DYNAMODB_TABLE_NAME = "plate-detection-info-prod"
+
+
+def main() -> None:
+    """Exibe o histórico de detecções, uma página por vez."""
+    st.title("Histórico de detecções")
+    st.caption(
+        "As páginas seguem a ordem de leitura da tabela (scan), não a ordem "
+        "cronológica: a página 1 não traz necessariamente as detecções mais "
+        "recentes. Dentro de cada página, a mais recente vem primeiro."
+    )
+
+    state = st.session_state
+    # Pilha de cursores: o último é o início da página atual
+    if "history_cursors" not in state:
+        state.history_cursors = [None]
+
+    try:
+        items, next_key = get_history_pages(DYNAMODB_TABLE_NAME).page(
+            state.history_cursors[-1]
+        )
+    except Exception as e:
+        st.error(f"Erro ao buscar dados no DynamoDB: {str(e)}")
+        return
+
+    page = len(state.history_cursors)
+    if not items:
+        st.info("Nenhuma detecção nesta página.")
+    else:
+        st.caption(f"Página {page} do histórico")
+        crop_cache = get_crop_cache()
+        # A ordem do scan é a das chaves; dentro da página, a mais recente primeiro
+        for item in sorted(items, key=lambda item: item["timestamp"], reverse=True):
+            display_detection(item, crop_cache)
+            st.divider()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(
+            "Anterior",
+            disabled=page == 1,
+            on_click=state.history_cursors.pop,
+        )
+    with col2:
+        st.button(
+            "Próxima",
+            disabled=next_key is None,
+            on_click=state.history_cursors.append,
+            args=(next_key,),
+        )
+
+
+if __name__ == "__main__":
+    main()
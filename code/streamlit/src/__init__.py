@@ -1,24 +1,87 @@
 """Modulo init."""
 
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
 import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
 from io import BytesIO
-from typing import Any, Dict, Optional
+from typing import Any, BinaryIO, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlparse
 
 import boto3
 import streamlit as st
-from PIL import Image
-from src.dynamo_db import DynamoDBInteraction
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.config import Config
+from PIL import Image, ImageOps
+from src.crop_cache import CropCache
+from src.detection_view import display_detection
+from src.dynamo_db import PLATE_TEXT_INDEX, DynamoDBInteraction, normalize_plate_text
+from src.history import HistoryPages
+from src.image_encoder import PreparedImage, prepare_image
+from src.notifier import LocalNotifier, create_notifier
 from src.s3 import S3Interaction
+from src.shared_resources import (
+    get_crop_cache,
+    get_dynamodb_interaction,
+    get_history_pages,
+    get_notifier,
+    get_s3_interaction,
+)
 
 __all__ = [
+    "json",
+    "logging",
+    "os",
+    "queue",
+    "random",
+    "re",
+    "threading",
     "time",
+    "OrderedDict",
+    "defaultdict",
+    "Future",
+    "ThreadPoolExecutor",
+    "as_completed",
+    "nullcontext",
     "BytesIO",
+    "unquote",
+    "urlparse",
     "boto3",
+    "Key",
+    "TypeDeserializer",
+    "Config",
     "Image",
+    "ImageOps",
     "st",
     "Optional",
+    "BinaryIO",
+    "NamedTuple",
     "Dict",
+    "List",
+    "Tuple",
     "Any",
     "S3Interaction",
+    "CropCache",
     "DynamoDBInteraction",
+    "PLATE_TEXT_INDEX",
+    "normalize_plate_text",
+    "display_detection",
+    "HistoryPages",
+    "PreparedImage",
+    "prepare_image",
+    "LocalNotifier",
+    "create_notifier",
+    "get_crop_cache",
+    "get_dynamodb_interaction",
+    "get_history_pages",
+    "get_notifier",
+    "get_s3_interaction",
 ]
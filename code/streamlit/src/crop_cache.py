@@ -0,0 +1,206 @@
+"""Módulo com o cache local dos recortes das placas exibidos na interface."""
+
+from src import (
+    Any,
+    BytesIO,
+    Dict,
+    Image,
+    Optional,
+    OrderedDict,
+    Tuple,
+    logging,
+    os,
+    threading,
+    time,
+    unquote,
+    urlparse,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entrega dos recortes: cache (miniaturas em memória), presigned ou public (URL
+# pública do bucket, que precisa ser público)
+CROP_DELIVERY = os.environ.get("CROP_DELIVERY", "cache")
+CROP_CACHE_MAX_MB = float(os.environ.get("CROP_CACHE_MAX_MB", "64"))
+CROP_THUMBNAIL_EDGE = int(os.environ.get("CROP_THUMBNAIL_EDGE", "320"))
+CROP_PRESIGNED_EXPIRES = int(os.environ.get("CROP_PRESIGNED_EXPIRES", "3600"))
+
+
+def parse_s3_url(url: str) -> Optional[Tuple[str, str]]:
+    """
+    Extrai o bucket e a chave de uma URL do S3.
+
+    Aceita o formato gravado pelas Lambdas (``https://<bucket>.s3.amazonaws.com/
+    <chave>``), com ou sem região, e ``s3://<bucket>/<chave>``.
+
+    Args:
+        url (str): URL do objeto.
+
+    Returns:
+        Optional[Tuple[str, str]]: Bucket e chave, ou None se não for do S3.
+    """
+    parsed = urlparse(url)
+    key = unquote(parsed.path.lstrip("/"))
+    if parsed.scheme == "s3":
+        bucket = parsed.netloc
+    elif ".s3." in parsed.netloc and parsed.netloc.endswith(".amazonaws.com"):
+        bucket = parsed.netloc.split(".s3.", 1)[0]
+    else:
+        return None
+    if not bucket or not key:
+        return None
+    return bucket, key
+
+
+class CropCache:
+    """
+    Cache LRU, limitado em bytes, das miniaturas dos recortes das placas.
+
+    Cada recorte é baixado uma vez pelo cliente do S3 compartilhado, reduzido
+    para ``thumbnail_edge`` pixels no maior lado e guardado em JPEG; as
+    reexecuções do script e as páginas de histórico passam a ler da memória.
+    No modo ``presigned`` guarda URLs assinadas, reaproveitadas até perto de
+    expirarem para que o navegador também use o próprio cache.
+    """
+
+    def __init__(
+        self,
+        s3_client: Any,
+        delivery: str = CROP_DELIVERY,
+        max_bytes: int = int(CROP_CACHE_MAX_MB * 1024 * 1024),
+        thumbnail_edge: int = CROP_THUMBNAIL_EDGE,
+        presigned_expires: int = CROP_PRESIGNED_EXPIRES,
+    ):
+        """
+        Inicializa o cache vazio.
+
+        Args:
+            s3_client (Any): Cliente do S3, compartilhado com o upload.
+            delivery (str): ``cache``, ``presigned`` ou ``public``.
+            max_bytes (int): Tamanho máximo das miniaturas em memória.
+            thumbnail_edge (int): Maior lado das miniaturas, em pixels.
+            presigned_expires (int): Validade das URLs assinadas (em segundos).
+
+        Raises:
+            ValueError: Se o modo de entrega for desconhecido.
+        """
+        if delivery not in ("cache", "presigned", "public"):
+            raise ValueError(
+                f"Entrega '{delivery}' desconhecida. Use cache, presigned ou public."
+            )
+        self.s3_client = s3_client
+        self.delivery = delivery
+        self.max_bytes = max_bytes
+        self.thumbnail_edge = thumbnail_edge
+        self.presigned_expires = presigned_expires
+        self._lock = threading.Lock()
+        self._thumbnails: "OrderedDict[str, bytes]" = OrderedDict()
+        self._presigned: Dict[str, Tuple[str, float]] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def image(self, url: str) -> Any:
+        """
+        Retorna o que o ``st.image`` deve exibir para um recorte.
+
+        Args:
+            url (str): URL do recorte gravada no DynamoDB.
+
+        Returns:
+            Any: Bytes da miniatura, URL assinada ou a própria URL, conforme o
+            modo de entrega; a URL original se o recorte não puder ser lido.
+        """
+        location = parse_s3_url(url)
+        if self.delivery == "public" or location is None:
+            return url
+        if self.delivery == "presigned":
+            return self.presigned_url(url, *location)
+        return self.thumbnail(url, *location) or url
+
+    def thumbnail(self, url: str, bucket: str, key: str) -> Optional[bytes]:
+        """
+        Retorna a miniatura do recorte, baixando-a só na primeira vez.
+
+        Args:
+            url (str): URL do recorte, usada como chave do cache.
+            bucket (str): Bucket do recorte.
+            key (str): Chave do recorte.
+
+        Returns:
+            Optional[bytes]: JPEG da miniatura, ou None se o download falhar.
+        """
+        with self._lock:
+            data = self._thumbnails.get(url)
+            if data is not None:
+                self._thumbnails.move_to_end(url)
+                self.hits += 1
+                return data
+            self.misses += 1
+
+        try:
+            body = self.s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+            with Image.open(BytesIO(body)) as image:
+                image.thumbnail((self.thumbnail_edge, self.thumbnail_edge))
+                buffer = BytesIO()
+                image.convert("RGB").save(buffer, "JPEG", quality=85)
+        except Exception as e:
+            logger.warning(f"Não foi possível ler o recorte {url}: {e}")
+            return None
+
+        data = buffer.getvalue()
+        with self._lock:
+            if url not in self._thumbnails:
+                self._thumbnails[url] = data
+                self._size += len(data)
+            while self._size > self.max_bytes and len(self._thumbnails) > 1:
+                _, evicted = self._thumbnails.popitem(last=False)
+                self._size -= len(evicted)
+        return data
+
+    def presigned_url(self, url: str, bucket: str, key: str) -> str:
+        """
+        Retorna uma URL assinada do recorte, reaproveitando a anterior se válida.
+
+        Args:
+            url (str): URL do recorte, usada como chave do cache.
+            bucket (str): Bucket do recorte.
+            key (str): Chave do recorte.
+
+        Returns:
+            str: URL assinada.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._presigned.get(url)
+            # Renova na metade da validade, para não entregar uma URL prestes a vencer
+            if cached and cached[1] > now:
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+            if len(self._presigned) > 10000:
+                self._presigned.clear()
+
+        signed = self.s3_client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": bucket, "Key": key},
+            ExpiresIn=self.presigned_expires,
+        )
+        with self._lock:
+            self._presigned[url] = (signed, now + self.presigned_expires / 2)
+        return signed
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            Dict[str, int]: Acertos, faltas, itens e bytes das miniaturas.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "items": len(self._thumbnails),
+                "bytes": self._size,
+            }
@@ -0,0 +1,27 @@
+"""Módulo com a exibição de uma detecção nas páginas de busca e de histórico."""
+
+from src import Any, CropCache, Dict, st
+
+
+def display_detection(item: Dict[str, Any], crop_cache: CropCache) -> None:
+    """
+    Exibe uma detecção em uma linha: miniatura do recorte e atributos.
+
+    Args:
+        item (Dict[str, Any]): Item da detecção no DynamoDB.
+        crop_cache (CropCache): Cache dos recortes das placas.
+    """
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        cropped_image_path = item.get("cropped_image_path")
+        if cropped_image_path:
+            st.image(crop_cache.image(cropped_image_path), use_column_width=True)
+    with col2:
+        st.write("**Quando:** ", item.get("timestamp"))
+        st.write("**Origem:** ", item.get("PK"))
+        if item.get("detected") == 0:
+            st.write("Nenhuma placa detectada na imagem.")
+            return
+        st.write("**Detected Text:** ", item.get("detected_text"))
+        st.write("**Plate Accuracy:** ", item.get("plate_accuracy"))
+        st.write("**Image Path:** ", item.get("image_path"))
@@ -1,58 +1,231 @@
 """Módulo para interação com o DynamoDB."""
 
-from src import Any, Dict, Optional, boto3, st, time
+from src import (
+    Any,
+    Dict,
+    Key,
+    List,
+    Optional,
+    Tuple,
+    boto3,
+    logging,
+    os,
+    random,
+    re,
+    threading,
+    time,
+)
+
+logger = logging.getLogger(__name__)
+
+# Endpoint alternativo do DynamoDB (ex.: DynamoDB Local, nos testes)
+DYNAMODB_ENDPOINT_URL = os.environ.get("DYNAMODB_ENDPOINT_URL") or None
+# Índice secundário global: partição plate_text, sort key timestamp
+PLATE_TEXT_INDEX = os.environ.get("PLATE_TEXT_INDEX", "plate_text-timestamp-index")
+
+
+def normalize_plate_text(texto: str) -> str:
+    """
+    Normaliza um texto de placa como o lambda_ocr grava em ``plate_text``.
+
+    Args:
+        texto (str): Texto digitado ou reconhecido.
+
+    Returns:
+        str: Texto em maiúsculas, só com letras e dígitos.
+    """
+    return re.sub(r"[^0-9A-Z]", "", texto.upper())
 
 
 class DynamoDBInteraction:
-    """Classe para interação com o DynamoDB."""
+    """
+    Classe para interação com o DynamoDB.
+
+    Os resources do boto3 não são seguros entre threads, então cada thread usa
+    o seu, criado na primeira chamada; a instância pode ser compartilhada pelas
+    threads do upload.
+    """
+
+    def __init__(self, dynamodb: Optional[Any] = None):
+        """
+        Inicializa a instância do DynamoDBInteraction.
+
+        Args:
+            dynamodb (Optional[Any]): Resource usado por todas as threads, como o
+                ``LocalDynamoDB`` nos testes; por padrão, um resource do boto3 por
+                thread, no endpoint ``DYNAMODB_ENDPOINT_URL`` se definido.
+        """
+        self._shared = dynamodb
+        self._local = threading.local()
 
-    def __init__(self):
-        """Inicializa a instância do DynamoDBInteraction."""
-        self.dynamodb = boto3.resource("dynamodb")
+    @property
+    def dynamodb(self) -> Any:
+        """Resource do DynamoDB da thread atual."""
+        if self._shared is not None:
+            return self._shared
+        if not hasattr(self._local, "dynamodb"):
+            self._local.dynamodb = boto3.session.Session().resource(
+                "dynamodb", endpoint_url=DYNAMODB_ENDPOINT_URL
+            )
+        return self._local.dynamodb
 
     def fetch_plate_data(
-        self, table_name: str, object_name: str, max_retries: int = 9, delay: int = 10
-    ) -> Optional[Dict[str, Any]]:
+        self,
+        table_name: str,
+        object_name: str,
+        max_retries: int = 12,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+    ) -> Optional[List[Dict[str, Any]]]:
         """
-        Busca informações da placa no DynamoDB com base no nome do objeto.
+        Busca as placas de uma imagem no DynamoDB com base no nome do objeto.
+
+        O detector grava um item por placa, todos na partição ``PK = object_name``;
+        cada tentativa lê a partição inteira com leitura consistente e termina
+        quando todos os itens estão completos. Entre as tentativas, a espera
+        cresce exponencialmente a partir de ``base_delay`` até ``max_delay``, com
+        jitter para que vários usuários não consultem a tabela ao mesmo tempo.
 
         Args:
             table_name (str): Nome da tabela no DynamoDB.
             object_name (str): Nome do objeto correspondente no S3.
             max_retries (int): Número máximo de tentativas de busca.
-            delay (int): Tempo de espera entre as tentativas (em segundos).
+            base_delay (float): Espera antes da segunda tentativa (em segundos).
+            max_delay (float): Espera máxima entre as tentativas (em segundos).
 
         Returns:
-            Optional[Dict[str, Any]]: Dados da placa ou None, se não encontrado.
+            Optional[List[Dict[str, Any]]]: Itens da imagem, um por placa e na
+            ordem da detecção, ou None se não encontrados a tempo.
         """
         table = self.dynamodb.Table(table_name)
 
         for attempt in range(max_retries):
             try:
-                response = table.scan()
-                items = response.get("Items", [])
-
-                # Busca o registro mais recente com o nome do objeto
-                matching_items = [
-                    item for item in items if item.get("PK") == object_name
-                ]
-                if matching_items:
-                    plate_data = max(
-                        matching_items, key=lambda x: x.get("timestamp", 0)
-                    )
-                    if plate_data.get("detected") == 0:
-                        return plate_data
-                    if (
-                        plate_data.get("detected") == 1
-                        and plate_data.get("detected_text") is not None
-                    ):
-                        return plate_data
-                time.sleep(delay)  # Aguarda antes de tentar novamente
+                plates = self.fetch_items(table, object_name)
             except Exception as e:
-                st.error(f"Erro ao buscar dados no DynamoDB: {str(e)}")
+                logger.error(f"Erro ao buscar dados no DynamoDB: {str(e)}")
                 return None
 
-        st.error(
-            "Tempo de espera esgotado. Não foi possível encontrar informações relacionadas à placa."
+            if plates and all(self.is_complete(plate) for plate in plates):
+                return plates
+            if attempt < max_retries - 1:
+                # Full jitter: espera aleatória até o limite exponencial
+                time.sleep(random.uniform(0, min(max_delay, base_delay * 2**attempt)))
+
+        logger.warning(
+            f"Tempo de espera esgotado. Não foi possível encontrar informações de {object_name}."
         )
         return None
+
+    @staticmethod
+    def fetch_items(table: Any, object_name: str) -> List[Dict[str, Any]]:
+        """
+        Lê todos os itens de uma imagem, do mais antigo para o mais recente.
+
+        Args:
+            table (Any): Tabela do DynamoDB.
+            object_name (str): Nome do objeto correspondente no S3 (chave ``PK``).
+
+        Returns:
+            List[Dict[str, Any]]: Itens da partição, um por placa detectada (ou
+            um só, sem placa).
+        """
+        kwargs: Dict[str, Any] = {
+            "KeyConditionExpression": Key("PK").eq(object_name),
+            "ConsistentRead": True,
+        }
+        items: List[Dict[str, Any]] = []
+        while True:
+            response = table.query(**kwargs)
+            items.extend(response.get("Items", []))
+            if "LastEvaluatedKey" not in response:
+                return items
+            kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    @staticmethod
+    def is_complete(plate_data: Dict[str, Any]) -> bool:
+        """
+        Indica se o item já tem o resultado final da imagem.
+
+        Args:
+            plate_data (Dict[str, Any]): Item da placa no DynamoDB.
+
+        Returns:
+            bool: True se nenhuma placa foi detectada ou se o OCR já gravou o texto.
+        """
+        if plate_data.get("detected") == 0:
+            return True
+        return (
+            plate_data.get("detected") == 1
+            and plate_data.get("detected_text") is not None
+        )
+
+    def search_plate(
+        self,
+        table_name: str,
+        plate_text: str,
+        limit: int = 20,
+        start_key: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Busca as detecções de uma placa, da mais recente para a mais antiga.
+
+        Consulta o índice ``PLATE_TEXT_INDEX``, uma página por chamada.
+
+        Args:
+            table_name (str): Nome da tabela no DynamoDB.
+            plate_text (str): Texto da placa, já normalizado.
+            limit (int): Máximo de itens na página.
+            start_key (Optional[Dict[str, Any]]): Cursor devolvido pela página
+                anterior, ou None para a primeira.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]: Itens da página
+            e o cursor da próxima, ou None se for a última.
+        """
+        kwargs: Dict[str, Any] = {
+            "IndexName": PLATE_TEXT_INDEX,
+            "KeyConditionExpression": Key("plate_text").eq(plate_text),
+            "ScanIndexForward": False,
+            "Limit": limit,
+        }
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = self.dynamodb.Table(table_name).query(**kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
+
+    def scan_page(
+        self,
+        table_name: str,
+        attributes: List[str],
+        limit: int = 20,
+        start_key: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Lê uma página da tabela, só com os atributos informados.
+
+        Cada chamada lê no máximo ``limit`` itens, então a memória e a capacidade
+        de leitura por página não crescem com a tabela.
+
+        Args:
+            table_name (str): Nome da tabela no DynamoDB.
+            attributes (List[str]): Atributos projetados.
+            limit (int): Máximo de itens na página.
+            start_key (Optional[Dict[str, Any]]): Cursor devolvido pela página
+                anterior, ou None para a primeira.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]: Itens da página
+            e o cursor da próxima, ou None se for a última.
+        """
+        # Nomes substituídos, pois "timestamp" é palavra reservada do DynamoDB
+        names = {f"#a{index}": name for index, name in enumerate(attributes)}
+        kwargs: Dict[str, Any] = {
+            "Limit": limit,
+            "ProjectionExpression": ", ".join(names),
+            "ExpressionAttributeNames": names,
+        }
+        if start_key:
+            kwargs["ExclusiveStartKey"] = start_key
+        response = self.dynamodb.Table(table_name).scan(**kwargs)
+        return response.get("Items", []), response.get("LastEvaluatedKey")
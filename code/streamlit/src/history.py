@@ -0,0 +1,117 @@
+"""Módulo com a leitura paginada do histórico de detecções."""
+
+from src import (
+    Any,
+    Dict,
+    DynamoDBInteraction,
+    Future,
+    List,
+    Optional,
+    OrderedDict,
+    ThreadPoolExecutor,
+    Tuple,
+    json,
+    os,
+    threading,
+    time,
+)
+
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE", "20"))
+# Validade de uma página em cache (em segundos) e páginas mantidas em memória
+HISTORY_CACHE_TTL = float(os.environ.get("HISTORY_CACHE_TTL", "60"))
+HISTORY_MAX_PAGES = int(os.environ.get("HISTORY_MAX_PAGES", "50"))
+# Atributos exibidos no histórico; os demais não são lidos
+HISTORY_ATTRIBUTES = [
+    "PK",
+    "timestamp",
+    "detected",
+    "detected_text",
+    "plate_accuracy",
+    "image_path",
+    "cropped_image_path",
+]
+
+Page = Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class HistoryPages:
+    """
+    Páginas do histórico, lidas por cursor, com cache TTL e pré-carregamento.
+
+    Cada página é um ``scan`` com ``Limit`` e projeção, que começa no
+    ``LastEvaluatedKey`` da anterior. As páginas ficam em um cache LRU com
+    validade, compartilhado pelas sessões, e a página seguinte à exibida é lida
+    em segundo plano, para que o "Próxima" não espere o DynamoDB.
+    """
+
+    def __init__(
+        self,
+        dynamodb: DynamoDBInteraction,
+        table_name: str,
+        page_size: int = HISTORY_PAGE_SIZE,
+        ttl: float = HISTORY_CACHE_TTL,
+        max_pages: int = HISTORY_MAX_PAGES,
+    ):
+        """
+        Inicializa o histórico sem páginas em cache.
+
+        Args:
+            dynamodb (DynamoDBInteraction): Acesso ao DynamoDB.
+            table_name (str): Nome da tabela no DynamoDB.
+            page_size (int): Itens por página.
+            ttl (float): Validade de uma página em cache (em segundos).
+            max_pages (int): Páginas mantidas no cache.
+        """
+        self.dynamodb = dynamodb
+        self.table_name = table_name
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_pages = max_pages
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="history-prefetch"
+        )
+        self._lock = threading.Lock()
+        # Cursor serializado -> (expiração, leitura da página)
+        self._pages: "OrderedDict[str, Tuple[float, Future]]" = OrderedDict()
+
+    def page(self, start_key: Optional[Dict[str, Any]] = None) -> Page:
+        """
+        Retorna uma página e começa a ler a seguinte em segundo plano.
+
+        Args:
+            start_key (Optional[Dict[str, Any]]): Cursor da página, ou None para
+                a primeira.
+
+        Returns:
+            Page: Itens da página e o cursor da próxima, ou None se for a última.
+        """
+        items, next_key = self._load(start_key).result()
+        if next_key:
+            self._load(next_key)
+        return items, next_key
+
+    def _load(self, start_key: Optional[Dict[str, Any]]) -> Future:
+        """Retorna a leitura da página em cache ou agenda uma nova."""
+        cache_key = json.dumps(start_key, sort_keys=True, default=str)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pages.get(cache_key)
+            if entry is not None:
+                expires_at, future = entry
+                failed = future.done() and future.exception() is not None
+                if expires_at > now and not failed:
+                    self._pages.move_to_end(cache_key)
+                    return future
+
+            future = self._executor.submit(
+                self.dynamodb.scan_page,
+                self.table_name,
+                HISTORY_ATTRIBUTES,
+                self.page_size,
+                start_key,
+            )
+            self._pages[cache_key] = (now + self.ttl, future)
+            self._pages.move_to_end(cache_key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+            return future
@@ -0,0 +1,103 @@
+"""Módulo com a preparação das imagens antes do upload para o S3."""
+
+from src import BinaryIO, BytesIO, Image, ImageOps, NamedTuple, Optional, os, time
+
+# Formato enviado ao S3: jpeg, webp ou original (envia o arquivo sem alterações)
+UPLOAD_FORMAT = os.environ.get("UPLOAD_FORMAT", "jpeg")
+# Maior lado da imagem enviada; o YOLO trabalha em 640 e o OCR usa o recorte da
+# imagem enviada, então a margem preserva os detalhes das placas
+UPLOAD_MAX_EDGE = int(os.environ.get("UPLOAD_MAX_EDGE", "1920"))
+UPLOAD_QUALITY = int(os.environ.get("UPLOAD_QUALITY", "90"))
+# Tag de orientação do EXIF; 1 é a orientação normal
+EXIF_ORIENTATION = 0x0112
+
+# Formato -> (formato do Pillow, extensão, content type)
+ENCODINGS = {
+    "jpeg": ("JPEG", ".jpg", "image/jpeg"),
+    "webp": ("WEBP", ".webp", "image/webp"),
+}
+
+
+class PreparedImage(NamedTuple):
+    """Imagem pronta para o upload e os números da preparação."""
+
+    buffer: BinaryIO
+    name: str
+    content_type: Optional[str]
+    original_size: int
+    uploaded_size: int
+    encode_ms: float
+
+
+def prepare_image(
+    image_file: BinaryIO,
+    name: str,
+    image_format: str = UPLOAD_FORMAT,
+    max_edge: int = UPLOAD_MAX_EDGE,
+    quality: int = UPLOAD_QUALITY,
+) -> PreparedImage:
+    """
+    Aplica a orientação do EXIF, reduz e recodifica uma imagem para o upload.
+
+    A imagem só é reduzida se o maior lado passar de ``max_edge``. Se nada
+    mudou na orientação nem no tamanho e a recodificação não diminuir o arquivo,
+    o original é enviado como está.
+
+    Args:
+        image_file (BinaryIO): Arquivo carregado pelo usuário.
+        name (str): Nome do arquivo.
+        image_format (str): ``jpeg``, ``webp`` ou ``original``.
+        max_edge (int): Maior lado da imagem enviada, em pixels.
+        quality (int): Qualidade da codificação (1 a 100).
+
+    Returns:
+        PreparedImage: Buffer a enviar, com o nome e o content type ajustados ao
+        formato, e os tamanhos antes e depois.
+
+    Raises:
+        ValueError: Se o formato for desconhecido.
+    """
+    if image_format != "original" and image_format not in ENCODINGS:
+        raise ValueError(
+            f"Formato '{image_format}' desconhecido. Use jpeg, webp ou original."
+        )
+
+    image_file.seek(0, os.SEEK_END)
+    original_size = image_file.tell()
+    image_file.seek(0)
+    original = PreparedImage(
+        image_file, name, None, original_size, original_size, encode_ms=0.0
+    )
+    if image_format == "original":
+        return original
+
+    start = time.perf_counter()
+    with Image.open(image_file) as image:
+        # No JPEG, decodifica já reduzido (1/2, 1/4 ou 1/8) quando possível
+        image.draft("RGB", (max_edge, max_edge))
+        changed = image.getexif().get(EXIF_ORIENTATION, 1) != 1
+        transposed = ImageOps.exif_transpose(image)
+        if max(transposed.size) > max_edge:
+            transposed.thumbnail((max_edge, max_edge), Image.LANCZOS)
+            changed = True
+
+        pil_format, extension, content_type = ENCODINGS[image_format]
+        buffer = BytesIO()
+        transposed.convert("RGB").save(
+            buffer, pil_format, quality=quality, optimize=True
+        )
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    if not changed and buffer.tell() >= original_size:
+        image_file.seek(0)
+        return original._replace(encode_ms=encode_ms)
+
+    buffer.seek(0)
+    return PreparedImage(
+        buffer,
+        os.path.splitext(name)[0] + extension,
+        content_type,
+        original_size,
+        buffer.getbuffer().nbytes,
+        encode_ms,
+    )
@@ -0,0 +1,297 @@
+"""Módulo com a entrega dos resultados das placas por notificação."""
+
+from src import (
+    Any,
+    Dict,
+    DynamoDBInteraction,
+    List,
+    Optional,
+    TypeDeserializer,
+    boto3,
+    defaultdict,
+    logging,
+    queue,
+    threading,
+    time,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """Inscrição nos resultados de um objeto, usada como gerenciador de contexto."""
+
+    def __init__(self, notifier: "LocalNotifier", object_name: str):
+        """
+        Inicializa a inscrição.
+
+        Args:
+            notifier (LocalNotifier): Notificador que entrega os resultados.
+            object_name (str): Nome do objeto no S3 (chave ``PK`` do item).
+        """
+        self.notifier = notifier
+        self.object_name = object_name
+        self.results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def __enter__(self) -> "Subscription":
+        """Retorna a própria inscrição."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Cancela a inscrição no notificador."""
+        self.notifier.unsubscribe(self)
+
+    def wait(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Aguarda o resultado do objeto.
+
+        Args:
+            timeout (float): Tempo máximo de espera (em segundos).
+
+        Returns:
+            Optional[Dict[str, Any]]: Item da placa ou None, se não chegar a tempo.
+        """
+        try:
+            return self.results.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalNotifier:
+    """
+    Pub/sub em processo dos resultados, indexado pelo nome do objeto.
+
+    Serve de substituto local nos testes (o teste chama ``publish``) e de base
+    para os notificadores que recebem os resultados de fora do processo. A
+    inscrição deve ser feita antes do upload, para que nenhum resultado se perca.
+    """
+
+    def __init__(self):
+        """Inicializa o notificador sem inscrições."""
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[str, List[Subscription]] = defaultdict(list)
+
+    def subscribe(self, object_name: str) -> Subscription:
+        """
+        Inscreve-se nos resultados de um objeto.
+
+        Args:
+            object_name (str): Nome do objeto no S3 (chave ``PK`` do item).
+
+        Returns:
+            Subscription: Inscrição que recebe os resultados.
+        """
+        subscription = Subscription(self, object_name)
+        with self._lock:
+            self._subscriptions[object_name].append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Cancela uma inscrição.
+
+        Args:
+            subscription (Subscription): Inscrição criada por ``subscribe``.
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.object_name, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.object_name, None)
+
+    def publish(self, object_name: str, plate_data: Dict[str, Any]) -> int:
+        """
+        Entrega um resultado aos inscritos no objeto.
+
+        Args:
+            object_name (str): Nome do objeto no S3 (chave ``PK`` do item).
+            plate_data (Dict[str, Any]): Item da placa.
+
+        Returns:
+            int: Quantidade de inscrições que receberam o resultado.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(object_name, []))
+        for subscription in subscriptions:
+            subscription.results.put(plate_data)
+        return len(subscriptions)
+
+    def close(self) -> None:
+        """Libera os recursos do notificador."""
+
+
+class DynamoDBStreamNotifier(LocalNotifier):
+    """
+    Notificador alimentado pelo DynamoDB Streams da tabela de placas.
+
+    Uma thread lê os registros novos de todos os shards do stream (a tabela
+    precisa do stream com ``NEW_IMAGE`` ou ``NEW_AND_OLD_IMAGES``) e publica os
+    itens já completos, como definido em ``DynamoDBInteraction.is_complete``.
+    """
+
+    def __init__(
+        self,
+        stream_arn: str,
+        poll_interval: float = 0.5,
+        shard_refresh_interval: float = 30.0,
+    ):
+        """
+        Inicia a leitura do stream em segundo plano.
+
+        Args:
+            stream_arn (str): ARN do stream da tabela.
+            poll_interval (float): Espera entre leituras sem registros novos (em
+                segundos).
+            shard_refresh_interval (float): Intervalo para procurar shards novos
+                (em segundos).
+        """
+        super().__init__()
+        self.stream_arn = stream_arn
+        self.poll_interval = poll_interval
+        self.shard_refresh_interval = shard_refresh_interval
+        self.streams_client = boto3.client("dynamodbstreams")
+        self.deserializer = TypeDeserializer()
+        # Shard -> iterador atual; None marca um shard já encerrado
+        self._iterators: Dict[str, Optional[str]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="plate-results-stream", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """Interrompe a leitura do stream."""
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        """Lê o stream até ``close``, recomeçando do fim em caso de erro."""
+        first_refresh = True
+        next_refresh = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_refresh:
+                    self._refresh_shards(first_refresh)
+                    first_refresh = False
+                    next_refresh = time.monotonic() + self.shard_refresh_interval
+                if not self._read_shards():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                logger.warning(f"Erro ao ler o stream de resultados: {e}")
+                # Iteradores expirados ou dados já removidos: volta ao fim do stream
+                self._iterators.clear()
+                first_refresh = True
+                next_refresh = 0.0
+                self._stop.wait(self.shard_refresh_interval / 10)
+
+    def _refresh_shards(self, from_latest: bool) -> None:
+        """
+        Abre um iterador para cada shard ainda não acompanhado.
+
+        Na primeira leitura os shards começam do fim do stream; os que surgem
+        depois (divisões de shard) são lidos desde o início, pois só contêm
+        registros posteriores à divisão.
+
+        Args:
+            from_latest (bool): Se os shards novos começam do fim do stream.
+        """
+        kwargs: Dict[str, Any] = {"StreamArn": self.stream_arn}
+        while True:
+            description = self.streams_client.describe_stream(**kwargs)[
+                "StreamDescription"
+            ]
+            for shard in description["Shards"]:
+                shard_id = shard["ShardId"]
+                if shard_id in self._iterators:
+                    continue
+                if from_latest and "EndingSequenceNumber" in shard.get(
+                    "SequenceNumberRange", {}
+                ):
+                    # Shard encerrado antes do início da leitura
+                    self._iterators[shard_id] = None
+                    continue
+                self._iterators[shard_id] = self.streams_client.get_shard_iterator(
+                    StreamArn=self.stream_arn,
+                    ShardId=shard_id,
+                    ShardIteratorType="LATEST" if from_latest else "TRIM_HORIZON",
+                )["ShardIterator"]
+            last_shard = description.get("LastEvaluatedShardId")
+            if not last_shard:
+                return
+            kwargs["ExclusiveStartShardId"] = last_shard
+
+    def _read_shards(self) -> bool:
+        """
+        Lê os registros novos de todos os shards abertos.
+
+        Returns:
+            bool: Se algum registro foi lido.
+        """
+        read_any = False
+        for shard_id, iterator in list(self._iterators.items()):
+            if iterator is None:
+                continue
+            response = self.streams_client.get_records(ShardIterator=iterator)
+            self._iterators[shard_id] = response.get("NextShardIterator")
+            for record in response.get("Records", []):
+                read_any = True
+                self._handle_record(record)
+        return read_any
+
+    def _handle_record(self, record: Dict[str, Any]) -> None:
+        """Publica o item do registro, se ele já tiver o resultado final."""
+        if record.get("eventName") not in ("INSERT", "MODIFY"):
+            return
+        image = record.get("dynamodb", {}).get("NewImage")
+        if not image:
+            return
+        plate_data = {
+            name: self.deserializer.deserialize(value) for name, value in image.items()
+        }
+        if DynamoDBInteraction.is_complete(plate_data):
+            self.publish(plate_data["PK"], plate_data)
+
+
+def create_notifier(kind: str, table_name: str) -> Optional[LocalNotifier]:
+    """
+    Cria o notificador de resultados escolhido.
+
+    Args:
+        kind (str): ``stream`` (DynamoDB Streams da tabela), ``local`` (só em
+            processo, para testes) ou ``none``.
+        table_name (str): Tabela das placas, de onde vem o ARN do stream.
+
+    Returns:
+        Optional[LocalNotifier]: Notificador, ou None se desativado ou se a tabela
+        não tiver stream; nesse caso, os resultados são buscados por consulta.
+
+    Raises:
+        ValueError: Se o tipo de notificador for desconhecido.
+    """
+    if kind == "none":
+        return None
+    if kind == "local":
+        return LocalNotifier()
+    if kind != "stream":
+        raise ValueError(
+            f"Notificador '{kind}' desconhecido. Use stream, local ou none."
+        )
+
+    try:
+        description = boto3.client("dynamodb").describe_table(TableName=table_name)
+    except Exception as e:
+        logger.warning(f"Não foi possível ler a tabela {table_name}: {e}")
+        return None
+    stream = description["Table"].get("StreamSpecification", {})
+    stream_arn = description["Table"].get("LatestStreamArn")
+    if (
+        not stream_arn
+        or not stream.get("StreamEnabled")
+        or stream.get("StreamViewType") not in ("NEW_IMAGE", "NEW_AND_OLD_IMAGES")
+    ):
+        logger.warning(
+            f"A tabela {table_name} não tem DynamoDB Streams; usando consultas."
+        )
+        return None
+    return DynamoDBStreamNotifier(stream_arn)
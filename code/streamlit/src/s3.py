@@ -1,32 +1,52 @@
 """Módulo para interação com o S3."""
 
-from src import BytesIO, boto3
+from src import BinaryIO, Config, Optional, boto3
 
 
 class S3Interaction:
     """Classe para interação."""
 
-    def __init__(self):
-        """Inicializa a instância do S3Interaction."""
-        self.s3_client = boto3.client("s3")
+    def __init__(self, max_pool_connections: int = 32):
+        """
+        Inicializa a instância do S3Interaction.
+
+        O cliente é seguro entre threads e compartilhado pelo upload e pelo cache
+        dos recortes, então o pool de conexões é maior que o padrão (10).
+
+        Args:
+            max_pool_connections (int): Conexões HTTP mantidas abertas com o S3.
+        """
+        self.s3_client = boto3.client(
+            "s3", config=Config(max_pool_connections=max_pool_connections)
+        )
 
     def upload_image(
-        self, image_buffer: BytesIO, bucket_name: str, object_name: str
+        self,
+        image_buffer: BinaryIO,
+        bucket_name: str,
+        object_name: str,
+        content_type: Optional[str] = None,
     ) -> str:
         """
         Faz upload da imagem para o bucket S3.
 
         Args:
-            image_buffer (BytesIO): Buffer da imagem a ser enviada.
+            image_buffer (BinaryIO): Buffer da imagem a ser enviada.
             bucket_name (str): Nome do bucket S3.
             object_name (str): Nome do objeto no S3.
+            content_type (Optional[str]): Content type do objeto, se conhecido.
 
         Returns:
             str: Mensagem de sucesso com o nome do objeto.
         """
         try:
             image_buffer.seek(0)
-            self.s3_client.upload_fileobj(image_buffer, bucket_name, object_name)
+            extra_args = {"ContentType": content_type} if content_type else {}
+            # put_object, ao contrário do upload_fileobj, não fecha o buffer, que
+            # continua em uso para exibir a imagem
+            self.s3_client.put_object(
+                Body=image_buffer, Bucket=bucket_name, Key=object_name, **extra_args
+            )
             return f"Upload realizado com sucesso: {object_name}"
         except Exception as e:
             return f"Erro ao fazer upload: {str(e)}"
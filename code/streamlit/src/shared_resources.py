@@ -0,0 +1,80 @@
+"""Módulo com os recursos criados uma vez por processo do Streamlit."""
+
+from src import (
+    CropCache,
+    DynamoDBInteraction,
+    HistoryPages,
+    LocalNotifier,
+    Optional,
+    S3Interaction,
+    create_notifier,
+    os,
+    st,
+)
+
+# Entrega dos resultados: stream (DynamoDB Streams), local ou none (só consultas)
+RESULT_NOTIFIER = os.environ.get("RESULT_NOTIFIER", "stream")
+
+
+@st.cache_resource
+def get_notifier(table_name: str) -> Optional[LocalNotifier]:
+    """
+    Cria o notificador de resultados uma vez por processo do Streamlit.
+
+    Args:
+        table_name (str): Nome da tabela no DynamoDB.
+
+    Returns:
+        Optional[LocalNotifier]: Notificador, ou None se os resultados forem
+        buscados só por consulta.
+    """
+    return create_notifier(RESULT_NOTIFIER, table_name)
+
+
+@st.cache_resource
+def get_s3_interaction() -> S3Interaction:
+    """
+    Cria o cliente do S3 uma vez por processo do Streamlit.
+
+    Returns:
+        S3Interaction: Cliente compartilhado pelas sessões e threads.
+    """
+    return S3Interaction()
+
+
+@st.cache_resource
+def get_dynamodb_interaction() -> DynamoDBInteraction:
+    """
+    Cria o acesso ao DynamoDB uma vez por processo do Streamlit.
+
+    Returns:
+        DynamoDBInteraction: Instância compartilhada pelas sessões e threads.
+    """
+    return DynamoDBInteraction()
+
+
+@st.cache_resource
+def get_crop_cache() -> CropCache:
+    """
+    Cria o cache dos recortes uma vez por processo do Streamlit.
+
+    Usa o mesmo cliente do S3 do upload, com o seu pool de conexões.
+
+    Returns:
+        CropCache: Cache compartilhado pelas sessões e páginas.
+    """
+    return CropCache(get_s3_interaction().s3_client)
+
+
+@st.cache_resource
+def get_history_pages(table_name: str) -> HistoryPages:
+    """
+    Cria o histórico paginado uma vez por processo do Streamlit.
+
+    Args:
+        table_name (str): Nome da tabela no DynamoDB.
+
+    Returns:
+        HistoryPages: Histórico com o cache de páginas compartilhado pelas sessões.
+    """
+    return HistoryPages(get_dynamodb_interaction(), table_name)
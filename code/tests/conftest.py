@@ -0,0 +1,20 @@
+"""Configuração dos testes: coloca os diretórios dos componentes no caminho."""
+
+import os
+import sys
+
+CODE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cada componente é implantado com o próprio diretório na raiz, como no PYTHONPATH
+# usado pelo Makefile
+for component in (
+    "shared",
+    "inference_server",
+    "lambda_detect_plate",
+    "lambda_ocr",
+    "video_ingestion",
+    "streamlit",
+):
+    path = os.path.join(CODE_DIR, component)
+    if path not in sys.path:
+        sys.path.insert(0, path)
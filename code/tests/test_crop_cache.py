@@ -0,0 +1,133 @@
+"""Testes dos modos de entrega do cache de recortes sobre o S3 local."""
+
+from io import BytesIO
+
+import pytest
+from local_store import LocalS3Client
+from PIL import Image
+from src import CropCache
+from src.crop_cache import parse_s3_url
+
+BUCKET = "upload-image-second-stage-prod"
+KEY = "ocr/carro_placa_1.jpg"
+URL = f"https://{BUCKET}.s3.amazonaws.com/{KEY}"
+
+
+class CountingS3Client(LocalS3Client):
+    """``LocalS3Client`` que conta os downloads e as assinaturas."""
+
+    def __init__(self, root: str):
+        """Inicializa os contadores zerados."""
+        super().__init__(root)
+        self.gets = 0
+        self.signed = 0
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        """Conta e lê o objeto."""
+        self.gets += 1
+        return super().get_object(Bucket=Bucket, Key=Key, **kwargs)
+
+    def generate_presigned_url(self, ClientMethod: str, **kwargs) -> str:
+        """Conta e assina o objeto."""
+        self.signed += 1
+        return super().generate_presigned_url(ClientMethod, **kwargs)
+
+
+def jpeg_bytes(size=(400, 100)) -> bytes:
+    """JPEG de um recorte de placa sintético."""
+    buffer = BytesIO()
+    Image.new("RGB", size, (200, 40, 40)).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def s3_client(tmp_path):
+    """S3 local com um recorte de placa gravado."""
+    client = CountingS3Client(str(tmp_path))
+    client.put_object(Bucket=BUCKET, Key=KEY, Body=jpeg_bytes())
+    return client
+
+
+def test_parse_s3_url():
+    """As URLs gravadas pelas Lambdas e as ``s3://`` viram bucket e chave."""
+    assert parse_s3_url(URL) == (BUCKET, KEY)
+    assert parse_s3_url(f"https://{BUCKET}.s3.us-east-1.amazonaws.com/{KEY}") == (
+        BUCKET,
+        KEY,
+    )
+    assert parse_s3_url(f"s3://{BUCKET}/{KEY}") == (BUCKET, KEY)
+    assert parse_s3_url("https://example.com/placa.jpg") is None
+
+
+def test_cache_mode_downloads_each_crop_once(s3_client):
+    """O modo ``cache`` reduz o recorte e responde as reexecuções da memória."""
+    cache = CropCache(s3_client, delivery="cache", thumbnail_edge=100)
+
+    first = cache.image(URL)
+    second = cache.image(URL)
+
+    assert first == second
+    assert s3_client.gets == 1
+    with Image.open(BytesIO(first)) as thumbnail:
+        assert thumbnail.format == "JPEG"
+        assert thumbnail.size == (100, 25)
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "items": 1,
+        "bytes": len(first),
+    }
+
+
+def test_cache_mode_evicts_by_size(s3_client):
+    """Acima de ``max_bytes``, sai a miniatura usada há mais tempo."""
+    other_key = "ocr/carro_placa_2.jpg"
+    s3_client.put_object(Bucket=BUCKET, Key=other_key, Body=jpeg_bytes())
+    other_url = f"https://{BUCKET}.s3.amazonaws.com/{other_key}"
+    cache = CropCache(s3_client, delivery="cache", max_bytes=1)
+
+    cache.image(URL)
+    cache.image(other_url)
+    cache.image(URL)
+
+    assert s3_client.gets == 3
+    assert cache.stats()["items"] == 1
+
+
+def test_cache_mode_falls_back_to_url_when_missing(s3_client):
+    """Um recorte que não pode ser lido é exibido pela URL original."""
+    cache = CropCache(s3_client, delivery="cache")
+    missing = f"https://{BUCKET}.s3.amazonaws.com/ocr/inexistente.jpg"
+
+    assert cache.image(missing) == missing
+    assert cache.stats()["items"] == 0
+
+
+def test_presigned_mode_reuses_signed_url(s3_client, monkeypatch):
+    """O modo ``presigned`` reaproveita a URL até a metade da validade."""
+    clock = iter([0.0, 10.0, 60.0])
+    monkeypatch.setattr("src.crop_cache.time.time", lambda: next(clock))
+    cache = CropCache(s3_client, delivery="presigned", presigned_expires=100)
+
+    first = cache.image(URL)
+    assert first.startswith("file://") and first.endswith("X-Amz-Expires=100")
+    assert cache.image(URL) == first
+    assert s3_client.signed == 1
+
+    cache.image(URL)
+    assert s3_client.signed == 2
+    assert s3_client.gets == 0
+
+
+def test_public_mode_returns_the_url(s3_client):
+    """O modo ``public`` entrega a URL gravada, sem acessar o S3."""
+    cache = CropCache(s3_client, delivery="public")
+
+    assert cache.image(URL) == URL
+    assert s3_client.gets == 0 and s3_client.signed == 0
+
+
+def test_unknown_delivery_is_rejected(s3_client):
+    """Um modo de entrega desconhecido é recusado na criação."""
+    with pytest.raises(ValueError):
+        CropCache(s3_client, delivery="cdn")
@@ -0,0 +1,41 @@
+"""Testes da ordem dos canais dos recortes entre o detector e o OCR."""
+
+import io
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from metrics import Metrics
+from ocr_plate_detection import decode_crop
+from PIL import Image
+from plate_detection import PlateDetection
+
+# Recorte de cor sólida em BGR, com os três canais bem distintos
+CROP_BGR = (200, 120, 20)
+
+
+def encode_crop(crop: np.ndarray) -> bytes:
+    """Codifica um recorte com o ``encode_crop`` do detector, sem carregar o modelo."""
+    detection = SimpleNamespace(metrics=Metrics("test", sink="none"))
+    return PlateDetection.encode_crop(detection, crop).read()
+
+
+@pytest.fixture
+def crop() -> np.ndarray:
+    """Recorte sintético em BGR, como sai do quadro decodificado."""
+    return np.full((40, 120, 3), CROP_BGR, dtype=np.uint8)
+
+
+def test_crop_jpeg_is_stored_in_true_colors(crop):
+    """O JPEG gravado pelo detector tem as cores reais do recorte."""
+    pixel = np.asarray(Image.open(io.BytesIO(encode_crop(crop))))[20, 60]
+
+    np.testing.assert_allclose(pixel, CROP_BGR[::-1], atol=4)
+
+
+def test_decoded_crop_keeps_the_detector_channel_order(crop):
+    """O lambda_ocr entrega ao recognize_batch o recorte na ordem do detector."""
+    decoded = decode_crop(encode_crop(crop))
+
+    assert decoded.shape == crop.shape
+    np.testing.assert_allclose(decoded[20, 60], CROP_BGR, atol=4)
@@ -0,0 +1,60 @@
+"""Testes das chaves dos recortes em relação ao filtro do gatilho do lambda_ocr."""
+
+import pytest
+from ocr_plate_detection import OCR_CROP_PREFIX, is_ocr_object
+from plate_detection import (
+    PLATE_ARCHIVE_PREFIX,
+    PLATE_BUCKET_NAME,
+    PLATE_OCR_PREFIX,
+    plate_crop_key,
+    plate_url,
+)
+from video_ingestion import track_crop_key
+
+IMAGE_KEY = "uploads/1700000000_carro.jpg"
+# Bucket com o gatilho do lambda_ocr, filtrado por OCR_CROP_PREFIX (ver README)
+OCR_TRIGGER_BUCKET = "upload-image-second-stage-prod"
+
+
+def test_detector_and_ocr_share_the_trigger_prefix():
+    """O prefixo gravado pelo detector é o mesmo aceito pelo lambda_ocr."""
+    assert PLATE_OCR_PREFIX == OCR_CROP_PREFIX
+    assert not PLATE_ARCHIVE_PREFIX.startswith(OCR_CROP_PREFIX)
+
+
+@pytest.mark.parametrize("index", [0, 1, 2])
+def test_detector_crops_trigger_the_ocr(index):
+    """Os recortes do detector de duas etapas caem no prefixo do gatilho."""
+    key = plate_crop_key(IMAGE_KEY, index)
+
+    assert key.startswith(OCR_CROP_PREFIX)
+    assert is_ocr_object(key)
+
+
+@pytest.mark.parametrize(
+    "key",
+    [
+        plate_crop_key(IMAGE_KEY, 0, PLATE_ARCHIVE_PREFIX),
+        plate_crop_key(IMAGE_KEY, 3, PLATE_ARCHIVE_PREFIX),
+        track_crop_key("videos/portaria.mp4", 7),
+    ],
+)
+def test_archived_crops_stay_outside_the_trigger(key):
+    """Os recortes arquivados pelo pipeline e pelo vídeo não acionam o OCR."""
+    assert key.startswith(PLATE_ARCHIVE_PREFIX)
+    assert not key.startswith(OCR_CROP_PREFIX)
+    assert not is_ocr_object(key)
+    # O recorte vai para o bucket do gatilho: só o prefixo o deixa de fora
+    assert plate_url(key).startswith(f"https://{OCR_TRIGGER_BUCKET}.")
+    assert PLATE_BUCKET_NAME == OCR_TRIGGER_BUCKET
+
+
+def test_crop_keys_keep_distinct_names_per_plate():
+    """Cada placa de uma imagem tem a sua chave, com o nome da imagem original."""
+    keys = [plate_crop_key(IMAGE_KEY, index) for index in range(3)]
+
+    assert keys == [
+        "ocr/1700000000_carro.jpg",
+        "ocr/1700000000_carro_1.jpg",
+        "ocr/1700000000_carro_2.jpg",
+    ]
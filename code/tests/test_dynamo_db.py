@@ -0,0 +1,180 @@
+"""Testes das consultas do Streamlit sobre a tabela local do DynamoDB."""
+
+import pytest
+from local_store import LocalDynamoDB
+from src import PLATE_TEXT_INDEX, DynamoDBInteraction
+
+TABLE_NAME = "plate-detection-info-prod"
+PLATE = "ABC1D23"
+
+
+@pytest.fixture
+def interaction():
+    """Tabela local com cinco detecções da placa, outra placa e itens sem texto."""
+    dynamodb = LocalDynamoDB()
+    table = dynamodb.Table(TABLE_NAME)
+    # Inseridas fora de ordem, para a ordem vir do índice e não da inserção
+    for index in (3, 0, 4, 1, 2):
+        table.put_item(
+            Item={
+                "PK": f"carro_{index}.jpg",
+                "timestamp": f"2026-01-01T00:00:0{index}",
+                "detected": 1,
+                "detected_text": [PLATE],
+                "plate_text": PLATE,
+            }
+        )
+    table.put_item(
+        Item={
+            "PK": "outro.jpg",
+            "timestamp": "2026-01-01T00:00:09",
+            "detected": 1,
+            "detected_text": ["XYZ9876"],
+            "plate_text": "XYZ9876",
+        }
+    )
+    # Sem plate_text (sem placa, ou OCR ainda pendente): fora do índice
+    table.put_item(
+        Item={"PK": "vazio.jpg", "timestamp": "2026-01-01T00:00:08", "detected": 0}
+    )
+    table.put_item(
+        Item={
+            "PK": "pendente.jpg",
+            "timestamp": "2026-01-01T00:00:07",
+            "detected": 1,
+            "detected_text": [PLATE],
+        }
+    )
+    return DynamoDBInteraction(dynamodb)
+
+
+def test_search_plate_returns_newest_first(interaction):
+    """As detecções da placa vêm da mais recente para a mais antiga."""
+    items, cursor = interaction.search_plate(TABLE_NAME, PLATE, limit=10)
+
+    assert [item["timestamp"] for item in items] == [
+        f"2026-01-01T00:00:0{index}" for index in (4, 3, 2, 1, 0)
+    ]
+    assert cursor is None
+
+
+def test_search_plate_pages_with_last_evaluated_key(interaction):
+    """Os cursores encadeiam as páginas até a última, sem repetir itens."""
+    pages, cursor = [], None
+    while True:
+        items, cursor = interaction.search_plate(
+            TABLE_NAME, PLATE, limit=2, start_key=cursor
+        )
+        pages.append([item["PK"] for item in items])
+        if cursor is None:
+            break
+        assert cursor["plate_text"] == PLATE
+        assert cursor["timestamp"] == items[-1]["timestamp"]
+
+    assert pages == [
+        ["carro_4.jpg", "carro_3.jpg"],
+        ["carro_2.jpg", "carro_1.jpg"],
+        ["carro_0.jpg"],
+    ]
+
+
+def test_search_plate_skips_items_without_plate_text(interaction):
+    """Itens sem ``plate_text`` e de outras placas ficam fora da busca."""
+    items, _ = interaction.search_plate(TABLE_NAME, PLATE, limit=10)
+
+    keys = {item["PK"] for item in items}
+    assert keys.isdisjoint({"vazio.jpg", "pendente.jpg", "outro.jpg"})
+    assert len(items) == 5
+    assert PLATE_TEXT_INDEX == "plate_text-timestamp-index"
+
+
+def plate_item(index: int, detected_text=None) -> dict:
+    """Item de uma placa da imagem ``upload.jpg``, com ou sem o OCR."""
+    item = {
+        "PK": "upload.jpg",
+        "timestamp": f"2026-01-02T00:00:00.00000{index}",
+        "detected": 1,
+        "cropped_image_path": f"ocr/upload_{index}.jpg",
+    }
+    if detected_text:
+        item["detected_text"] = [detected_text]
+    return item
+
+
+def counted_queries(interaction, on_query=None) -> list:
+    """Conta as consultas à tabela, chamando ``on_query`` antes de cada uma."""
+    table = interaction.dynamodb.Table(TABLE_NAME)
+    calls = []
+    query = table.query
+
+    def counted_query(**kwargs):
+        calls.append(kwargs)
+        if on_query:
+            on_query(table, len(calls))
+        return query(**kwargs)
+
+    table.query = counted_query
+    return calls
+
+
+def test_fetch_plate_data_retries_until_the_ocr_finishes(interaction):
+    """A busca repete até o item ter o texto do OCR."""
+
+    def ocr_on_third_query(table, call):
+        if call == 1:
+            table.put_item(Item=plate_item(0))
+        if call == 3:
+            table.put_item(Item=plate_item(0, "ABC1D23"))
+
+    calls = counted_queries(interaction, ocr_on_third_query)
+
+    plates = interaction.fetch_plate_data(TABLE_NAME, "upload.jpg", base_delay=0)
+
+    assert [plate["detected_text"] for plate in plates] == [["ABC1D23"]]
+    assert len(calls) == 3
+    assert all(call["ConsistentRead"] for call in calls)
+
+
+def test_fetch_plate_data_gives_up_after_max_retries(interaction):
+    """Sem resultado completo, a busca para depois de ``max_retries`` consultas."""
+    interaction.dynamodb.Table(TABLE_NAME).put_item(Item=plate_item(0))
+    calls = counted_queries(interaction)
+
+    plates = interaction.fetch_plate_data(
+        TABLE_NAME, "upload.jpg", max_retries=4, base_delay=0
+    )
+
+    assert plates is None
+    assert len(calls) == 4
+
+
+def test_fetch_plate_data_returns_every_plate_of_the_image(interaction):
+    """Uma imagem com várias placas espera o OCR de todas e devolve todas."""
+    table = interaction.dynamodb.Table(TABLE_NAME)
+    table.put_item(Item=plate_item(0, "ABC1D23"))
+    table.put_item(Item=plate_item(1))
+
+    def ocr_second_plate(table, call):
+        if call == 2:
+            table.put_item(Item=plate_item(1, "XYZ9876"))
+
+    calls = counted_queries(interaction, ocr_second_plate)
+
+    plates = interaction.fetch_plate_data(TABLE_NAME, "upload.jpg", base_delay=0)
+
+    assert [plate["detected_text"] for plate in plates] == [["ABC1D23"], ["XYZ9876"]]
+    assert len(calls) == 2
+    assert "Limit" not in calls[0]
+
+
+def test_fetch_plate_data_returns_image_without_plates(interaction):
+    """Uma imagem sem placa tem um único item, já completo."""
+    interaction.dynamodb.Table(TABLE_NAME).put_item(
+        Item={"PK": "upload.jpg", "timestamp": "2026-01-02T00:00:00", "detected": 0}
+    )
+
+    plates = interaction.fetch_plate_data(TABLE_NAME, "upload.jpg", base_delay=0)
+
+    assert plates == [
+        {"PK": "upload.jpg", "timestamp": "2026-01-02T00:00:00", "detected": 0}
+    ]
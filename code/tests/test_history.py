@@ -0,0 +1,131 @@
+"""Testes das páginas do histórico sobre a tabela local do DynamoDB."""
+
+from collections import Counter
+
+import pytest
+import src.history as history
+from local_store import LocalDynamoDB
+from src import DynamoDBInteraction
+from src.history import HISTORY_ATTRIBUTES, HistoryPages
+
+TABLE_NAME = "plate-detection-info-prod"
+
+
+class FakeClock:
+    """Relógio controlado pelo teste, no lugar do módulo ``time``."""
+
+    def __init__(self):
+        """Começa no instante zero."""
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        """Retorna o instante atual."""
+        return self.now
+
+
+@pytest.fixture
+def table():
+    """Tabela local com cinco detecções e um atributo fora da projeção."""
+    dynamodb = LocalDynamoDB()
+    table = dynamodb.Table(TABLE_NAME)
+    for index in range(5):
+        table.put_item(
+            Item={
+                "PK": f"carro_{index}.jpg",
+                "timestamp": f"2026-01-01T00:00:0{index}",
+                "detected": 1,
+                "detected_text": ["ABC1D23"],
+                "raw_ocr": "não exibido",
+            }
+        )
+    table.scans = Counter()
+    scan = table.scan
+
+    def counted_scan(**kwargs):
+        table.scans[str(kwargs.get("ExclusiveStartKey"))] += 1
+        return scan(**kwargs)
+
+    table.scan = counted_scan
+    table.dynamodb = dynamodb
+    return table
+
+
+def wait_prefetch(pages: HistoryPages) -> None:
+    """Espera as leituras agendadas em segundo plano."""
+    for _, future in list(pages._pages.values()):
+        future.result()
+
+
+def test_pages_follow_last_evaluated_key(table):
+    """Os cursores encadeiam as páginas até a última, sem repetir itens."""
+    pages = HistoryPages(DynamoDBInteraction(table.dynamodb), TABLE_NAME, page_size=2)
+
+    seen, sizes, start_key = [], [], None
+    while True:
+        items, start_key = pages.page(start_key)
+        seen.extend(item["PK"] for item in items)
+        sizes.append(len(items))
+        if start_key is None:
+            break
+
+    assert sizes == [2, 2, 1]
+    assert seen == [f"carro_{index}.jpg" for index in range(5)]
+
+
+def test_pages_read_only_the_projected_attributes(table):
+    """Os itens trazem só os atributos exibidos no histórico."""
+    pages = HistoryPages(DynamoDBInteraction(table.dynamodb), TABLE_NAME, page_size=5)
+
+    items, next_key = pages.page()
+
+    assert next_key is None
+    assert all(set(item) <= set(HISTORY_ATTRIBUTES) for item in items)
+    assert all("raw_ocr" not in item for item in items)
+
+
+def test_next_page_is_prefetched_and_cached(table):
+    """A página seguinte é lida em segundo plano e reaproveitada no "Próxima"."""
+    pages = HistoryPages(DynamoDBInteraction(table.dynamodb), TABLE_NAME, page_size=2)
+
+    _, next_key = pages.page()
+    wait_prefetch(pages)
+    pages.page()
+    pages.page(next_key)
+    wait_prefetch(pages)
+
+    assert table.scans[str(None)] == 1
+    assert table.scans[str(next_key)] == 1
+
+
+def test_cached_pages_expire_after_ttl(table, monkeypatch):
+    """Depois da validade, a página é lida de novo do DynamoDB."""
+    clock = FakeClock()
+    monkeypatch.setattr(history, "time", clock)
+    pages = HistoryPages(
+        DynamoDBInteraction(table.dynamodb), TABLE_NAME, page_size=5, ttl=60
+    )
+
+    pages.page()
+    clock.now = 59.0
+    pages.page()
+    assert table.scans[str(None)] == 1
+
+    clock.now = 61.0
+    pages.page()
+    assert table.scans[str(None)] == 2
+
+
+def test_cache_keeps_at_most_max_pages(table):
+    """As páginas menos usadas saem do cache além de ``max_pages``."""
+    pages = HistoryPages(
+        DynamoDBInteraction(table.dynamodb), TABLE_NAME, page_size=1, max_pages=2
+    )
+
+    start_key = None
+    for _ in range(3):
+        _, start_key = pages.page(start_key)
+        wait_prefetch(pages)
+
+    assert len(pages._pages) == 2
+    pages.page()
+    assert table.scans[str(None)] == 2
@@ -0,0 +1,86 @@
+"""Testes da preparação das imagens antes do upload."""
+
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from src import prepare_image
+from src.image_encoder import EXIF_ORIENTATION
+
+
+def image_file(size, image_format="PNG", orientation=None) -> BytesIO:
+    """Arquivo de imagem com ruído, como o enviado pelo usuário."""
+    image = Image.effect_noise(size, 64).convert("RGB")
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[EXIF_ORIENTATION] = orientation
+    buffer = BytesIO()
+    image.save(buffer, image_format, exif=exif)
+    buffer.seek(0)
+    return buffer
+
+
+def test_large_image_is_downscaled_and_reencoded():
+    """O maior lado é reduzido a ``max_edge`` e o PNG vira um JPEG menor."""
+    uploaded = image_file((800, 400))
+
+    prepared = prepare_image(uploaded, "carro.png", max_edge=200)
+
+    assert prepared.name == "carro.jpg"
+    assert prepared.content_type == "image/jpeg"
+    assert prepared.uploaded_size < prepared.original_size
+    assert prepared.uploaded_size == len(prepared.buffer.getvalue())
+    with Image.open(prepared.buffer) as image:
+        assert image.format == "JPEG"
+        assert image.size == (200, 100)
+
+
+def test_webp_encoding():
+    """Com ``webp``, a extensão e o content type acompanham o formato."""
+    prepared = prepare_image(image_file((800, 400)), "carro.png", "webp", 200)
+
+    assert prepared.name == "carro.webp"
+    assert prepared.content_type == "image/webp"
+    with Image.open(prepared.buffer) as image:
+        assert image.format == "WEBP"
+
+
+def test_exif_orientation_is_applied():
+    """A rotação do EXIF é aplicada aos pixels antes do envio."""
+    uploaded = image_file((300, 100), "JPEG", orientation=6)
+
+    prepared = prepare_image(uploaded, "carro.jpg", max_edge=1000)
+
+    with Image.open(prepared.buffer) as image:
+        assert image.size == (100, 300)
+
+
+def test_small_jpeg_is_sent_unchanged():
+    """Sem ajustes e sem ganho na recodificação, o original é enviado."""
+    uploaded = image_file((200, 100), "JPEG")
+    uploaded_bytes = uploaded.getvalue()
+
+    prepared = prepare_image(uploaded, "carro.jpg", quality=100, max_edge=1000)
+
+    assert prepared.buffer is uploaded
+    assert prepared.buffer.read() == uploaded_bytes
+    assert prepared.name == "carro.jpg"
+    assert prepared.content_type is None
+    assert prepared.uploaded_size == prepared.original_size
+
+
+def test_original_format_skips_encoding():
+    """``original`` envia o arquivo como veio, sem decodificá-lo."""
+    uploaded = image_file((800, 400))
+
+    prepared = prepare_image(uploaded, "carro.png", "original", max_edge=200)
+
+    assert prepared.buffer is uploaded
+    assert prepared.encode_ms == 0.0
+    assert prepared.uploaded_size == prepared.original_size
+
+
+def test_unknown_format_is_rejected():
+    """Um formato desconhecido é recusado."""
+    with pytest.raises(ValueError):
+        prepare_image(image_file((10, 10)), "carro.png", "gif")
@@ -0,0 +1,269 @@
+"""Testes do micro-batching e dos códigos de erro do servidor de inferência."""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+import numpy as np
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from local_store import LocalS3Client
+from metrics import Metrics
+from server import InferenceServer, MicroBatcher
+
+
+def run_batcher(scenario: Callable[[MicroBatcher], Awaitable[Any]], **kwargs) -> Any:
+    """Executa um cenário com o laço do agrupador rodando em segundo plano."""
+
+    async def main():
+        batcher = MicroBatcher(**kwargs)
+        task = asyncio.create_task(batcher.run())
+        try:
+            return await asyncio.wait_for(scenario(batcher), 5)
+        finally:
+            task.cancel()
+
+    return asyncio.run(main())
+
+
+class RecordingPredict:
+    """Função de lote que guarda os lotes recebidos."""
+
+    def __init__(self, error: Optional[Exception] = None):
+        """Falha com ``error`` em todos os lotes, se informado."""
+        self.batches: List[List[Any]] = []
+        self.error = error
+
+    def __call__(self, items: List[Any]) -> List[Any]:
+        """Retorna o dobro de cada item."""
+        self.batches.append(list(items))
+        if self.error:
+            raise self.error
+        return [item * 2 for item in items]
+
+
+def test_batcher_flushes_when_batch_is_full():
+    """Um lote cheio é disparado sem esperar ``max_wait_ms``."""
+    predict = RecordingPredict()
+
+    async def scenario(batcher):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        return results, time.perf_counter() - start
+
+    results, elapsed = run_batcher(
+        scenario, predict=predict, max_batch_size=3, max_wait_ms=10_000, queue_size=8
+    )
+
+    assert results == [0, 2, 4]
+    assert predict.batches == [[0, 1, 2]]
+    assert elapsed < 1
+
+
+def test_batcher_flushes_after_max_wait():
+    """Um lote incompleto é disparado quando o primeiro item espera o limite."""
+    predict = RecordingPredict()
+
+    async def scenario(batcher):
+        start = time.perf_counter()
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2))
+        return results, time.perf_counter() - start, batcher.stats()
+
+    results, elapsed, stats = run_batcher(
+        scenario, predict=predict, max_batch_size=8, max_wait_ms=50, queue_size=8
+    )
+
+    assert results == [2, 4]
+    assert predict.batches == [[1, 2]]
+    assert elapsed >= 0.04
+    assert stats["batches"] == 1 and stats["mean_batch_size"] == 2
+
+
+def test_batcher_rejects_when_queue_is_full():
+    """Com a fila cheia, ``submit`` levanta ``QueueFull`` e conta a rejeição."""
+
+    async def main():
+        batcher = MicroBatcher(RecordingPredict(), 4, 10, queue_size=2)
+        pending = [asyncio.create_task(batcher.submit(i)) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.QueueFull):
+            await batcher.submit(2)
+        for task in pending:
+            task.cancel()
+        return batcher.stats()
+
+    stats = asyncio.run(main())
+
+    assert stats["rejected"] == 1
+    assert stats["queued"] == 2
+
+
+def test_batcher_error_reaches_every_future():
+    """Uma falha do lote chega a todas as requisições dele, e o laço continua."""
+    predict = RecordingPredict(error=RuntimeError("modelo indisponível"))
+
+    async def scenario(batcher):
+        results = await asyncio.gather(
+            *(batcher.submit(i) for i in range(3)), return_exceptions=True
+        )
+        predict.error = None
+        return results, await batcher.submit(5)
+
+    results, after = run_batcher(
+        scenario, predict=predict, max_batch_size=3, max_wait_ms=100, queue_size=8
+    )
+
+    assert len(predict.batches[0]) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert after == 10
+
+
+class FakeDetection:
+    """Detector sem modelo: cada imagem tem uma placa na mesma caixa."""
+
+    def __init__(self, s3_client: LocalS3Client):
+        """Inicializa o detector com o S3 local."""
+        self.s3_client = s3_client
+        self.metrics = Metrics("test", sink="none")
+        self.detect_error: Optional[Exception] = None
+        self.save_error: Optional[Exception] = None
+        self.saved: List[str] = []
+        # Liberado por padrão; o teste da fila cheia segura o modelo
+        self.release = threading.Event()
+        self.release.set()
+
+    def prepare_image(self, img_data: bytes, image_key: str) -> bytes:
+        """Devolve os bytes, sem decodificar."""
+        return img_data
+
+    def detect(self, images: List[bytes]) -> List[Any]:
+        """Retorna uma caixa por imagem, ou a falha configurada."""
+        self.release.wait(5)
+        if self.detect_error:
+            raise self.detect_error
+        return [(None, np.array([[0, 0, 10, 10]])) for _ in images]
+
+    def save_detections(self, bucket_name, image_key, img, boxes) -> None:
+        """Registra a chave gravada, ou a falha configurada."""
+        if self.save_error:
+            raise self.save_error
+        self.saved.append(image_key)
+
+
+@pytest.fixture
+def detection(tmp_path):
+    """Detector falso com uma imagem no S3 local."""
+    s3_client = LocalS3Client(str(tmp_path))
+    s3_client.put_object(Bucket="imagens", Key="carro.jpg", Body=b"jpeg")
+    return FakeDetection(s3_client)
+
+
+def run_server(
+    detection: FakeDetection,
+    scenario: Callable[[TestClient, InferenceServer], Awaitable[Any]],
+    queue_size: int = 8,
+) -> Any:
+    """Executa um cenário contra o servidor com o detector falso."""
+    server = InferenceServer(
+        detection,
+        max_batch_size=1,
+        max_wait_ms=1,
+        queue_size=queue_size,
+        persist_workers=2,
+    )
+
+    async def main():
+        async with TestClient(TestServer(server.create_app())) as client:
+            return await scenario(client, server)
+
+    return asyncio.run(main())
+
+
+async def post_json(client: TestClient, payload: Any) -> Any:
+    """Envia um JSON ao ``/detect`` e retorna o status e o corpo."""
+    response = await client.post(
+        "/detect",
+        data=json.dumps(payload),
+        headers={"Content-Type": "application/json"},
+    )
+    return response.status, await response.json()
+
+
+def test_detect_returns_boxes_and_crop_keys(detection):
+    """Uma imagem do S3 é detectada e os resultados são gravados."""
+    status, body = run_server(
+        detection,
+        lambda client, _: post_json(client, {"bucket": "imagens", "key": "carro.jpg"}),
+    )
+
+    assert status == 200
+    assert body["boxes"] == [[0, 0, 10, 10]]
+    assert body["crop_keys"] == ["ocr/carro.jpg"]
+    assert detection.saved == ["carro.jpg"]
+
+
+@pytest.mark.parametrize(
+    "payload", [["imagens", "carro.jpg"], "carro.jpg", {"bucket": "imagens"}]
+)
+def test_detect_rejects_invalid_json(detection, payload):
+    """Um JSON que não é o objeto esperado é respondido com 400."""
+    status, body = run_server(detection, lambda client, _: post_json(client, payload))
+
+    assert status == 400
+    assert body["error"]
+
+
+def test_detect_maps_missing_object_to_404(detection):
+    """Um objeto inexistente no S3 é respondido com 404."""
+    status, _ = run_server(
+        detection,
+        lambda client, _: post_json(client, {"bucket": "imagens", "key": "nada.jpg"}),
+    )
+
+    assert status == 404
+
+
+@pytest.mark.parametrize("stage", ["detect_error", "save_error"])
+def test_detect_maps_failures_to_502(detection, stage):
+    """Falhas do modelo ou da gravação dos resultados são respondidas com 502."""
+    setattr(detection, stage, RuntimeError("falha simulada"))
+
+    status, body = run_server(
+        detection,
+        lambda client, _: post_json(client, {"bucket": "imagens", "key": "carro.jpg"}),
+    )
+
+    assert status == 502
+    assert "falha simulada" in body["error"]
+
+
+def test_detect_returns_503_when_queue_is_full(detection):
+    """Com o modelo ocupado e a fila cheia, a requisição seguinte recebe 503."""
+    detection.release.clear()
+    payload = {"bucket": "imagens", "key": "carro.jpg"}
+
+    async def scenario(client, server):
+        async def wait_until(condition):
+            while not condition():
+                await asyncio.sleep(0.01)
+
+        # Uma imagem no modelo e outra na fila
+        pending = [asyncio.create_task(post_json(client, payload))]
+        await wait_until(lambda: server.batcher.items == 1)
+        pending.append(asyncio.create_task(post_json(client, payload)))
+        await wait_until(lambda: server.batcher.queue.full())
+        response = await client.post(
+            "/detect",
+            data=json.dumps(payload),
+            headers={"Content-Type": "application/json"},
+        )
+        detection.release.set()
+        return response.status, response.headers, await asyncio.gather(*pending)
+
+    status, headers, others = run_server(detection, scenario, queue_size=1)
+
+    assert status == 503
+    assert headers["Retry-After"] == "1"
+    assert [other_status for other_status, _ in others] == [200, 200]
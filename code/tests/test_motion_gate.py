@@ -0,0 +1,74 @@
+"""Testes do filtro de movimento da ingestão de vídeo com quadros sintéticos."""
+
+import numpy as np
+import pytest
+from metrics import Metrics
+from motion_gate import MotionGate, parse_roi
+
+HEIGHT, WIDTH = 120, 160
+
+
+def static_frame() -> np.ndarray:
+    """Quadro cinza uniforme, sem movimento entre cópias."""
+    return np.full((HEIGHT, WIDTH, 3), 90, dtype=np.uint8)
+
+
+def moving_frame(x: int) -> np.ndarray:
+    """Quadro com um retângulo claro na coluna ``x``, como um veículo passando."""
+    frame = static_frame()
+    frame[40:80, x : x + 40] = 230
+    return frame
+
+
+def test_first_frame_always_passes():
+    """Sem quadro de referência, o primeiro quadro segue para a detecção."""
+    gate = MotionGate("diff", keyframe_every=0)
+
+    assert [index for index, _ in gate([(0, static_frame())])] == [0]
+
+
+def test_static_frames_are_dropped():
+    """Quadros iguais ao anterior são descartados e contados."""
+    metrics = Metrics("test", sink="none")
+    gate = MotionGate("diff", keyframe_every=0, metrics=metrics)
+    frames = [(index, static_frame()) for index in range(5)]
+
+    assert [index for index, _ in gate(frames)] == [0]
+    assert gate.stats() == {"forwarded": 1, "dropped": 4, "keyframes": 0}
+    (document,) = metrics.flush()
+    assert document["motion_frames_dropped"] == 4
+
+
+def test_moving_frames_pass():
+    """Um objeto que se desloca entre os quadros faz cada quadro seguir."""
+    gate = MotionGate("diff", keyframe_every=0)
+    frames = [(0, static_frame())] + [
+        (index, moving_frame(20 * index)) for index in range(1, 5)
+    ]
+
+    assert [index for index, _ in gate(frames)] == [0, 1, 2, 3, 4]
+
+
+def test_motion_outside_roi_is_ignored():
+    """Só a região de interesse conta: movimento fora dela é descartado."""
+    gate = MotionGate("diff", roi=(0.75, 0.0, 0.25, 1.0), keyframe_every=0)
+    frames = [(0, static_frame()), (1, moving_frame(0)), (2, moving_frame(40))]
+
+    assert [index for index, _ in gate(frames)] == [0]
+
+
+def test_keyframe_after_dropped_frames():
+    """Mesmo sem movimento, um quadro-chave segue após ``keyframe_every`` descartes."""
+    gate = MotionGate("diff", keyframe_every=2)
+    frames = [(index, static_frame()) for index in range(7)]
+
+    assert [index for index, _ in gate(frames)] == [0, 3, 6]
+    assert gate.stats()["keyframes"] == 2
+
+
+def test_parse_roi():
+    """A ROI é lida em frações e valores fora de 0-1 são recusados."""
+    assert parse_roi(None) is None
+    assert parse_roi("0.1,0.2,0.5,0.5") == (0.1, 0.2, 0.5, 0.5)
+    with pytest.raises(ValueError):
+        parse_roi("0.1,0.2,1.5")
@@ -0,0 +1,59 @@
+"""Testes do notificador de resultados em processo."""
+
+import threading
+
+from src.notifier import LocalNotifier
+
+PLATE_DATA = {"PK": "carro.jpg", "detected": 1, "detected_text": ["ABC1D23"]}
+
+
+def test_wait_returns_item_published_after_subscribe():
+    """Quem se inscreve antes da publicação recebe o item."""
+    notifier = LocalNotifier()
+
+    with notifier.subscribe("carro.jpg") as subscription:
+        assert notifier.publish("carro.jpg", PLATE_DATA) == 1
+        assert subscription.wait(timeout=1) == PLATE_DATA
+
+
+def test_wait_receives_item_published_from_another_thread():
+    """O resultado chega mesmo quando publicado durante a espera."""
+    notifier = LocalNotifier()
+
+    with notifier.subscribe("carro.jpg") as subscription:
+        timer = threading.Timer(0.05, notifier.publish, ("carro.jpg", PLATE_DATA))
+        timer.start()
+        assert subscription.wait(timeout=5) == PLATE_DATA
+        timer.join()
+
+
+def test_wait_times_out_with_none():
+    """Sem publicação, a espera termina em None."""
+    notifier = LocalNotifier()
+
+    with notifier.subscribe("carro.jpg") as subscription:
+        notifier.publish("outro.jpg", PLATE_DATA)
+        assert subscription.wait(timeout=0.05) is None
+
+
+def test_publish_without_subscription_is_dropped():
+    """Itens publicados antes da inscrição ou depois dela não são entregues."""
+    notifier = LocalNotifier()
+    assert notifier.publish("carro.jpg", PLATE_DATA) == 0
+
+    with notifier.subscribe("carro.jpg") as subscription:
+        assert subscription.wait(timeout=0.05) is None
+
+    assert notifier.publish("carro.jpg", PLATE_DATA) == 0
+
+
+def test_every_subscriber_receives_the_item():
+    """Duas inscrições no mesmo objeto recebem o mesmo resultado."""
+    notifier = LocalNotifier()
+
+    with notifier.subscribe("carro.jpg") as first, notifier.subscribe(
+        "carro.jpg"
+    ) as second:
+        assert notifier.publish("carro.jpg", PLATE_DATA) == 2
+        assert first.wait(timeout=1) == PLATE_DATA
+        assert second.wait(timeout=1) == PLATE_DATA
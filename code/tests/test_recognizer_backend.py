@@ -0,0 +1,195 @@
+"""Testes dos backends do reconhecedor e da decodificação CTC compartilhada."""
+
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pytest
+from recognizer_backend import (
+    CTC_BLANK_INDEX,
+    PLATE_CHARACTERS,
+    REC_DICT_FILE,
+    REC_IMAGE_SHAPE,
+    OnnxRecognizer,
+    create_recognizer,
+    ctc_decode,
+)
+
+CHARACTERS = ["blank"] + list(PLATE_CHARACTERS)
+# Dicionário do reconhecedor sintético: o último símbolo é o espaço, como no
+# decodificador do PaddleOCR
+DICT_CHARACTERS = list(PLATE_CHARACTERS) + [" "]
+
+
+def decode_per_row(
+    preds: np.ndarray, characters: Sequence[str]
+) -> List[Tuple[str, float]]:
+    """Decodifica cada item do lote em laço, como o CTCLabelDecode do PaddleOCR."""
+    resultados = []
+    for row in preds:
+        indices = row.argmax(axis=1)
+        probs = row.max(axis=1)
+        texto, confiancas = [], []
+        for step, index in enumerate(indices):
+            if index == CTC_BLANK_INDEX:
+                continue
+            if step > 0 and indices[step - 1] == index:
+                continue
+            texto.append(characters[index])
+            confiancas.append(probs[step])
+        resultados.append(("".join(texto), float(np.mean(confiancas or [0.0]))))
+    return resultados
+
+
+def one_hot(labels: List[List[int]], confidence: float = 0.9) -> np.ndarray:
+    """Monta probabilidades ``(N, T, C)`` com o índice escolhido em cada passo."""
+    preds = np.full(
+        (len(labels), len(labels[0]), len(CHARACTERS)),
+        (1 - confidence) / (len(CHARACTERS) - 1),
+        dtype=np.float32,
+    )
+    for row, steps in enumerate(labels):
+        for step, index in enumerate(steps):
+            preds[row, step, index] = confidence
+    return preds
+
+
+def test_ctc_decode_collapses_repeats_and_blanks():
+    """Repetições consecutivas colapsam; separadas por branco, não."""
+    a, b, um = (CHARACTERS.index(c) for c in "AB1")
+    preds = one_hot([[a, a, 0, a, b, b, 0, um], [0, 0, 0, 0, 0, 0, 0, 0]])
+
+    resultados = ctc_decode(preds, CHARACTERS)
+
+    assert resultados[0][0] == "AAB1"
+    assert resultados[0][1] == pytest.approx(0.9)
+    assert resultados[1] == ("", 0.0)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_ctc_decode_matches_per_row_decoder(seed):
+    """O decodificador vetorizado dá o mesmo texto e confiança do laço por item."""
+    rng = np.random.default_rng(seed)
+    logits = rng.normal(size=(16, 40, len(CHARACTERS))).astype(np.float32)
+    # Reforça o branco para que os lotes tenham passos vazios e repetições
+    logits[..., CTC_BLANK_INDEX] += 1.5
+    preds = np.exp(logits) / np.exp(logits).sum(axis=2, keepdims=True)
+
+    resultados = ctc_decode(preds, CHARACTERS)
+    esperados = decode_per_row(preds, CHARACTERS)
+
+    assert [texto for texto, _ in resultados] == [texto for texto, _ in esperados]
+    assert [confianca for _, confianca in resultados] == pytest.approx(
+        [confianca for _, confianca in esperados], rel=1e-6
+    )
+
+
+def reference_probs(batch: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Calcula em numpy as probabilidades do reconhecedor sintético."""
+    logits = batch.mean(axis=2).transpose(0, 2, 1) @ weights
+    logits -= logits.max(axis=2, keepdims=True)
+    return np.exp(logits) / np.exp(logits).sum(axis=2, keepdims=True)
+
+
+def write_recognizer(
+    directory: str, weights: np.ndarray, metadata: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    Grava um reconhecedor sintético no formato do modelo rec do paddle2onnx.
+
+    A entrada é ``(N, 3, 48, W)`` com largura dinâmica; cada coluna vira um
+    passo de tempo, com ``softmax(média da coluna @ weights)`` por classe.
+    """
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper, numpy_helper
+
+    classes = weights.shape[1]
+    graph = helper.make_graph(
+        [
+            helper.make_node("ReduceMean", ["x"], ["columns"], axes=[2], keepdims=0),
+            helper.make_node("Transpose", ["columns"], ["steps"], perm=[0, 2, 1]),
+            helper.make_node("MatMul", ["steps", "weights"], ["logits"]),
+            helper.make_node("Softmax", ["logits"], ["probs"], axis=2),
+        ],
+        "rec",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, ["N", 3, 48, "W"])],
+        [
+            helper.make_tensor_value_info(
+                "probs", TensorProto.FLOAT, ["N", "W", classes]
+            )
+        ],
+        [numpy_helper.from_array(weights, "weights")],
+    )
+    # IR 7 (opset 13) é lido por qualquer versão recente do ONNX Runtime
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=7
+    )
+    if metadata:
+        helper.set_model_props(model, metadata)
+    path = os.path.join(directory, "model.onnx")
+    onnx.save(model, path)
+    return path
+
+
+@pytest.fixture
+def weights() -> np.ndarray:
+    """Pesos fixos do reconhecedor sintético, com o branco reforçado."""
+    rng = np.random.default_rng(0)
+    weights = rng.normal(scale=4.0, size=(3, len(DICT_CHARACTERS) + 1))
+    weights[:, CTC_BLANK_INDEX] += 1.0
+    return weights.astype(np.float32)
+
+
+def test_onnx_recognizer_matches_reference(tmp_path, weights):
+    """O backend ONNX lê o dicionário do modelo e decodifica como a referência."""
+    pytest.importorskip("onnxruntime")
+    write_recognizer(str(tmp_path), weights)
+    with open(tmp_path / REC_DICT_FILE, "w", encoding="utf-8") as file:
+        file.write("\n".join(DICT_CHARACTERS))
+    batch = np.random.default_rng(1).uniform(-1, 1, (8, 3, 48, 40))
+    batch = batch.astype(np.float32)
+
+    recognizer = create_recognizer("onnx", str(tmp_path))
+    esperados = decode_per_row(
+        reference_probs(batch, weights), ["blank"] + DICT_CHARACTERS
+    )
+
+    assert recognizer.characters == ["blank"] + DICT_CHARACTERS
+    assert recognizer.image_shape == REC_IMAGE_SHAPE
+    np.testing.assert_allclose(
+        recognizer.predict(batch), reference_probs(batch, weights), atol=1e-5
+    )
+    resultados = recognizer.recognize(batch)
+    assert [texto for texto, _ in resultados] == [texto for texto, _ in esperados]
+    assert [confianca for _, confianca in resultados] == pytest.approx(
+        [confianca for _, confianca in esperados], rel=1e-5
+    )
+
+
+def test_onnx_recognizer_prefers_metadata_characters(tmp_path, weights):
+    """Os metadados ``characters`` do ONNX dispensam o arquivo de dicionário."""
+    pytest.importorskip("onnxruntime")
+    path = write_recognizer(
+        str(tmp_path), weights, {"characters": "".join(DICT_CHARACTERS)}
+    )
+
+    assert OnnxRecognizer(path).characters == ["blank"] + DICT_CHARACTERS
+
+
+def test_onnx_recognizer_rejects_mismatched_dictionary(tmp_path, weights):
+    """Um dicionário com outro número de símbolos falha ao carregar."""
+    pytest.importorskip("onnxruntime")
+    path = write_recognizer(str(tmp_path), weights)
+    with open(tmp_path / REC_DICT_FILE, "w", encoding="utf-8") as file:
+        file.write("\n".join(DICT_CHARACTERS[:-1]))
+
+    with pytest.raises(ValueError):
+        OnnxRecognizer(path)
+
+
+def test_ocr_module_does_not_import_paddleocr():
+    """O PaddleOCR só é importado quando o pipeline completo é carregado."""
+    import ocr_plate_detection  # noqa: F401
+
+    assert "paddleocr" not in sys.modules
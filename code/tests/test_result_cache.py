@@ -0,0 +1,138 @@
+"""Testes do cache de resultados em memória e na tabela local do DynamoDB."""
+
+import time
+
+import pytest
+import result_cache
+from local_store import LocalDynamoDB
+from metrics import Metrics
+from result_cache import ResultCache, create_result_cache
+
+CACHE_TABLE = "plate-detection-cache-prod"
+RESULT = {"detected_text": ["ABC1D23"]}
+
+
+@pytest.fixture
+def table():
+    """Tabela local do cache, com a chave ``content_hash``."""
+    return LocalDynamoDB().Table(CACHE_TABLE)
+
+
+class FailingTable:
+    """Tabela que falha em toda leitura e escrita, como sem permissão."""
+
+    def get_item(self, **kwargs):
+        """Falha na leitura."""
+        raise RuntimeError("AccessDenied")
+
+    def put_item(self, **kwargs):
+        """Falha na escrita."""
+        raise RuntimeError("AccessDenied")
+
+
+def test_memory_level_evicts_least_recently_used():
+    """Acima de ``max_entries``, sai a entrada usada há mais tempo."""
+    cache = ResultCache("ocr", max_entries=2)
+    cache.put("a", {"v": "a"})
+    cache.put("b", {"v": "b"})
+    assert cache.get("a") == {"v": "a"}
+
+    cache.put("c", {"v": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": "a"}
+    assert cache.get("c") == {"v": "c"}
+
+
+def test_stats_and_metrics_count_hits_and_misses():
+    """Acertos e misses aparecem em ``stats`` e nas métricas do namespace."""
+    metrics = Metrics("test", sink="none")
+    cache = ResultCache("detect", metrics=metrics)
+    cache.put("a", RESULT)
+
+    cache.get("a")
+    cache.get("a")
+    cache.get("b")
+
+    assert cache.stats() == {"memory_hits": 2, "persistent_hits": 0, "misses": 1}
+    (document,) = metrics.flush()
+    assert document["detect_cache_memory_hits"] == 2
+    assert document["detect_cache_misses"] == 1
+
+
+def test_put_writes_through_to_the_table(table):
+    """O resultado vai para a tabela com o namespace na chave e o TTL."""
+    cache = ResultCache("ocr", table, ttl_seconds=60)
+    before = time.time()
+
+    cache.put("abc", RESULT)
+
+    (item,) = table.items()
+    assert item["content_hash"] == "ocr#abc"
+    assert item["result"] == RESULT
+    assert before + 59 <= item["expires_at"] <= time.time() + 60
+
+
+def test_get_reads_through_from_the_table(table):
+    """Outro processo lê da tabela e passa a responder da memória."""
+    ResultCache("ocr", table).put("abc", RESULT)
+    cache = ResultCache("ocr", table)
+
+    assert cache.get("abc") == RESULT
+    assert cache.get("abc") == RESULT
+    assert cache.stats() == {"memory_hits": 1, "persistent_hits": 1, "misses": 0}
+
+
+def test_namespaces_do_not_share_entries(table):
+    """As etapas dividem a tabela sem ler os resultados uma da outra."""
+    ResultCache("detect", table).put("abc", {"boxes": []})
+
+    assert ResultCache("ocr", table).get("abc") is None
+
+
+def test_expired_table_entry_is_a_miss(table):
+    """Itens vencidos ainda não removidos pelo TTL do DynamoDB são ignorados."""
+    table.put_item(
+        Item={
+            "content_hash": "ocr#abc",
+            "result": RESULT,
+            "expires_at": int(time.time()) - 1,
+        }
+    )
+
+    assert ResultCache("ocr", table).get("abc") is None
+
+
+def test_table_errors_are_treated_as_misses():
+    """Falhas da tabela não interrompem o processamento."""
+    cache = ResultCache("ocr", FailingTable())
+
+    cache.put("abc", RESULT)
+    assert cache.get("abc") == RESULT
+    assert cache.get("outro") is None
+
+
+def test_create_result_cache_uses_the_configured_table(monkeypatch):
+    """Com ``RESULT_CACHE_TABLE``, o cache usa a tabela; sem ela, só a memória."""
+    dynamodb = LocalDynamoDB()
+
+    assert create_result_cache("ocr", dynamodb).table is None
+
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_TABLE", CACHE_TABLE)
+    assert create_result_cache("ocr", dynamodb).table is dynamodb.Table(CACHE_TABLE)
+
+
+def test_create_result_cache_falls_back_when_table_is_missing(monkeypatch):
+    """Uma tabela inacessível na criação deixa o cache só em memória."""
+
+    class MissingTable:
+        def load(self):
+            raise RuntimeError("ResourceNotFoundException")
+
+    class Resource:
+        def Table(self, name):
+            return MissingTable()
+
+    monkeypatch.setattr(result_cache, "RESULT_CACHE_TABLE", CACHE_TABLE)
+
+    assert create_result_cache("ocr", Resource()).table is None
@@ -0,0 +1,132 @@
+"""Testes do rastreador de placas e da votação das leituras."""
+
+import numpy as np
+import pytest
+from tracker import (
+    PlateTrack,
+    PlateTracker,
+    box_to_measurement,
+    state_to_box,
+    vote_texts,
+)
+
+FRAME = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+
+
+def moving_box(step: int, x_min: float = 20.0, speed: float = 4.0) -> np.ndarray:
+    """Caixa de placa que anda ``speed`` pixels para a direita por quadro."""
+    x = x_min + speed * step
+    return np.array([[x, 100.0, x + 60.0, 120.0]])
+
+
+def test_measurement_round_trip():
+    """A caixa volta igual depois de passar pelo espaço do filtro."""
+    box = np.array([10.0, 20.0, 70.0, 40.0])
+    state = np.zeros((7, 1))
+    state[:4] = box_to_measurement(box)
+
+    assert state_to_box(state) == pytest.approx(box)
+
+
+def test_creates_one_track_per_unmatched_box():
+    """Cada caixa sem rastro abre um rastro novo, com o seu recorte."""
+    tracker = PlateTracker()
+    boxes = np.array([[20.0, 100.0, 80.0, 120.0], [200.0, 30.0, 260.0, 50.0]])
+
+    finished = tracker.update(FRAME, boxes, frame_index=0)
+
+    assert finished == []
+    assert [track.track_id for track in tracker.tracks] == [0, 1]
+    assert all(track.hits == 1 and len(track.crops) == 1 for track in tracker.tracks)
+
+
+def test_matches_a_moving_box_to_the_same_track():
+    """Uma placa que se move pouco entre quadros fica em um único rastro."""
+    tracker = PlateTracker(max_crops=2)
+
+    for step in range(5):
+        tracker.update(FRAME, moving_box(step), frame_index=step)
+
+    assert len(tracker.tracks) == 1
+    track = tracker.tracks[0]
+    assert (track.hits, track.first_frame, track.last_frame) == (5, 0, 4)
+    assert len(track.crops) == 2
+    assert track.crops[0][0] >= track.crops[1][0]
+
+
+def test_box_below_iou_threshold_opens_a_new_track():
+    """Uma caixa longe da prevista não é associada ao rastro existente."""
+    tracker = PlateTracker(iou_threshold=0.3)
+    tracker.update(FRAME, moving_box(0), frame_index=0)
+
+    tracker.update(FRAME, moving_box(0, x_min=200.0), frame_index=1)
+
+    assert [track.track_id for track in tracker.tracks] == [0, 1]
+    assert tracker.tracks[0].misses == 1
+
+
+def test_expires_tracks_after_max_age():
+    """Só rastros confirmados por ``min_hits`` são entregues ao expirar."""
+    tracker = PlateTracker(max_age=2, min_hits=2)
+    tracker.update(FRAME, moving_box(0), frame_index=0)
+    tracker.update(FRAME, moving_box(1), frame_index=1)
+    tracker.update(FRAME, moving_box(0, x_min=200.0), frame_index=2)
+    empty = np.zeros((0, 4))
+
+    assert tracker.update(FRAME, empty, frame_index=3) == []
+    finished = tracker.update(FRAME, empty, frame_index=4)
+
+    assert [track.track_id for track in finished] == [0]
+    assert [track.track_id for track in tracker.tracks] == [1]
+    assert tracker.update(FRAME, empty, frame_index=5) == []
+    assert tracker.tracks == []
+
+
+def test_flush_returns_only_confirmed_tracks():
+    """No fim do vídeo, os rastros com uma só detecção são descartados."""
+    tracker = PlateTracker(min_hits=2)
+    tracker.update(FRAME, moving_box(0), frame_index=0)
+    tracker.update(FRAME, moving_box(1), frame_index=1)
+    tracker.update(FRAME, moving_box(0, x_min=200.0), frame_index=2)
+
+    finished = tracker.flush()
+
+    assert [track.track_id for track in finished] == [0]
+    assert tracker.tracks == []
+
+
+def test_add_crop_keeps_the_sharpest_crops():
+    """O rastro guarda só os ``max_crops`` recortes de maior qualidade."""
+    track = PlateTrack(0, np.array([0.0, 0.0, 60.0, 20.0]), frame_index=0)
+    flat = np.full((20, 60, 3), 128, dtype=np.uint8)
+    sharp = FRAME[:20, :60]
+
+    track.add_crop(flat, 0, max_crops=2)
+    track.add_crop(sharp, 1, max_crops=2)
+    track.add_crop(flat, 2, max_crops=2)
+
+    assert [frame_index for _, frame_index, _ in track.crops] == [1, 0]
+
+
+def test_vote_texts_weights_characters_by_confidence():
+    """Cada posição fica com o caractere de maior confiança somada."""
+    leituras = [
+        ("ABC1D23", 0.9),
+        ("ABC1D28", 0.5),
+        ("A8C1D23", 0.6),
+        # Comprimento minoritário: fora da votação por posição
+        ("XYZ", 0.95),
+        ("", 0.99),
+    ]
+
+    texto, confianca = vote_texts(leituras)
+
+    assert texto == "ABC1D23"
+    # Posições unânimes valem 2.0 / 3; as posições 1 e 6 valem 1.4 / 3 e 1.5 / 3
+    assert confianca == pytest.approx((5 * 2.0 + 1.4 + 1.5) / 3 / 7)
+
+
+def test_vote_texts_without_text_returns_none():
+    """Sem leituras com texto não há resultado."""
+    assert vote_texts([("", 0.9)]) is None
+    assert vote_texts([]) is None
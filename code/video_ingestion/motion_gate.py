@@ -0,0 +1,187 @@
+"""Módulo com o filtro de movimento que decide quais quadros vão para a detecção."""
+
+import os
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+from metrics import Metrics
+
+MOTION_GATE_METHOD = os.environ.get("MOTION_GATE_METHOD", "diff")
+MOTION_GATE_WIDTH = int(os.environ.get("MOTION_GATE_WIDTH", "160"))
+# Fração dos pixels da região de interesse que precisa mudar
+MOTION_GATE_THRESHOLD = float(os.environ.get("MOTION_GATE_THRESHOLD", "0.005"))
+MOTION_GATE_KEYFRAME_EVERY = int(os.environ.get("MOTION_GATE_KEYFRAME_EVERY", "50"))
+# Diferença mínima de intensidade (0-255) para um pixel contar como mudança
+PIXEL_DIFF_THRESHOLD = 25
+
+Frame = Tuple[int, np.ndarray]
+Roi = Tuple[float, float, float, float]
+
+
+def parse_roi(value: Optional[str]) -> Optional[Roi]:
+    """
+    Lê uma região de interesse no formato ``x,y,largura,altura``.
+
+    Args:
+        value (Optional[str]): Valores em frações do quadro (0 a 1), ou None.
+
+    Returns:
+        Optional[Roi]: Região de interesse, ou None para o quadro inteiro.
+
+    Raises:
+        ValueError: Se o texto não tiver quatro frações válidas.
+    """
+    if not value:
+        return None
+    parts = tuple(float(part) for part in value.split(","))
+    if len(parts) != 4 or not all(0 <= part <= 1 for part in parts):
+        raise ValueError(f"ROI inválida '{value}'; use x,y,largura,altura em 0-1")
+    return parts
+
+
+class MotionGate:
+    """
+    Etapa de gerador que descarta quadros sem movimento antes do YOLO.
+
+    Cada quadro é reduzido para ``width`` pixels de largura, convertido para
+    tons de cinza e recortado na região de interesse; o movimento é medido por
+    diferença com o quadro anterior (``diff``) ou por subtração de fundo MOG2
+    (``mog2``). Seguem adiante os quadros em que a fração de pixels alterados
+    passa de ``threshold`` e, mesmo sem movimento, um quadro-chave a cada
+    ``keyframe_every`` quadros descartados em sequência.
+    """
+
+    def __init__(
+        self,
+        method: str = MOTION_GATE_METHOD,
+        roi: Optional[Roi] = None,
+        width: int = MOTION_GATE_WIDTH,
+        threshold: float = MOTION_GATE_THRESHOLD,
+        keyframe_every: int = MOTION_GATE_KEYFRAME_EVERY,
+        metrics: Optional[Metrics] = None,
+    ):
+        """
+        Inicializa o filtro.
+
+        Args:
+            method (str): ``diff`` (diferença de quadros) ou ``mog2``.
+            roi (Optional[Roi]): Região de interesse ``x, y, largura, altura`` em
+                frações do quadro; None usa o quadro inteiro.
+            width (int): Largura do quadro reduzido usado na medição.
+            threshold (float): Fração mínima de pixels alterados na região.
+            keyframe_every (int): Quadros sem movimento até um quadro-chave; 0
+                desativa os quadros-chave.
+            metrics (Optional[Metrics]): Onde os contadores são registrados.
+
+        Raises:
+            ValueError: Se o método for desconhecido.
+        """
+        if method not in ("diff", "mog2"):
+            raise ValueError(f"Método '{method}' desconhecido. Use diff ou mog2.")
+        self.method = method
+        self.roi = roi
+        self.width = width
+        self.threshold = threshold
+        self.keyframe_every = keyframe_every
+        self.metrics = metrics
+        self.subtractor = (
+            cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+            if method == "mog2"
+            else None
+        )
+        self.previous: Optional[np.ndarray] = None
+        self.forwarded = 0
+        self.dropped = 0
+        self.keyframes = 0
+
+    def __call__(self, frames: Iterable[Frame]) -> Iterator[Frame]:
+        """
+        Filtra uma sequência de quadros.
+
+        Args:
+            frames (Iterable[Frame]): Índice e quadro em BGR.
+
+        Yields:
+            Frame: Os quadros com movimento e os quadros-chave.
+        """
+        since_forward = 0
+        for index, frame in frames:
+            moving = self.motion_fraction(frame) > self.threshold
+            keyframe = (
+                not moving
+                and self.keyframe_every > 0
+                and since_forward >= self.keyframe_every
+            )
+            if moving or keyframe:
+                since_forward = 0
+                self.forwarded += 1
+                self._count("motion_frames_forwarded")
+                if keyframe:
+                    self.keyframes += 1
+                    self._count("motion_keyframes")
+                yield index, frame
+            else:
+                since_forward += 1
+                self.dropped += 1
+                self._count("motion_frames_dropped")
+
+    def motion_fraction(self, frame: np.ndarray) -> float:
+        """
+        Mede a fração de pixels alterados na região de interesse.
+
+        O primeiro quadro não tem referência e conta como movimento total.
+
+        Args:
+            frame (np.ndarray): Quadro em BGR.
+
+        Returns:
+            float: Fração de 0 a 1.
+        """
+        small = self._prepare(frame)
+        if self.subtractor is not None:
+            mask = self.subtractor.apply(small)
+            return float(np.count_nonzero(mask)) / mask.size
+
+        previous, self.previous = self.previous, small
+        if previous is None or previous.shape != small.shape:
+            return 1.0
+        changed = cv2.absdiff(small, previous) > PIXEL_DIFF_THRESHOLD
+        return float(np.count_nonzero(changed)) / changed.size
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna os contadores do filtro.
+
+        Returns:
+            Dict[str, int]: Quadros encaminhados, descartados e quadros-chave.
+        """
+        return {
+            "forwarded": self.forwarded,
+            "dropped": self.dropped,
+            "keyframes": self.keyframes,
+        }
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        """Reduz, converte para cinza, recorta a região e suaviza o ruído."""
+        height, width = frame.shape[:2]
+        scale = min(self.width / width, 1.0)
+        small = cv2.resize(
+            frame,
+            (max(int(width * scale), 1), max(int(height * scale), 1)),
+            interpolation=cv2.INTER_AREA,
+        )
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        if self.roi is not None:
+            x, y, roi_width, roi_height = self.roi
+            rows, cols = gray.shape
+            gray = gray[
+                int(y * rows) : max(int((y + roi_height) * rows), int(y * rows) + 1),
+                int(x * cols) : max(int((x + roi_width) * cols), int(x * cols) + 1),
+            ]
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def _count(self, name: str) -> None:
+        """Incrementa o contador no acumulador de métricas, se houver."""
+        if self.metrics is not None:
+            self.metrics.count(name)
@@ -0,0 +1,317 @@
+"""Módulo com o rastreamento de placas entre quadros de vídeo (IoU + Kalman)."""
+
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Variâncias do filtro no espaço (cx, cy, área, proporção, vcx, vcy, várea)
+INITIAL_COVARIANCE = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+PROCESS_NOISE = np.diag([1.0, 1.0, 1.0, 1e-2, 1e-2, 1e-2, 1e-4])
+MEASUREMENT_NOISE = np.diag([1.0, 1.0, 10.0, 10.0])
+
+
+def box_to_measurement(box: np.ndarray) -> np.ndarray:
+    """
+    Converta uma caixa ``x_min, y_min, x_max, y_max`` em ``cx, cy, área, proporção``.
+
+    Args:
+        box (np.ndarray): Caixa da placa.
+
+    Returns:
+        np.ndarray: Medida ``(4, 1)`` usada pelo filtro de Kalman.
+    """
+    width = box[2] - box[0]
+    height = box[3] - box[1]
+    return np.array(
+        [
+            [box[0] + width / 2],
+            [box[1] + height / 2],
+            [width * height],
+            [width / max(height, 1e-6)],
+        ]
+    )
+
+
+def state_to_box(state: np.ndarray) -> np.ndarray:
+    """
+    Converta o estado do filtro de volta em uma caixa ``x_min, y_min, x_max, y_max``.
+
+    Args:
+        state (np.ndarray): Estado ``(7, 1)`` do filtro.
+
+    Returns:
+        np.ndarray: Caixa ``(4,)`` em float.
+    """
+    cx, cy, area, ratio = state[:4, 0]
+    width = np.sqrt(max(area * ratio, 0.0))
+    height = area / width if width > 0 else 0.0
+    return np.array([cx - width / 2, cy - height / 2, cx + width / 2, cy + height / 2])
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Calcula a IoU entre todas as caixas de dois conjuntos.
+
+    Args:
+        boxes_a (np.ndarray): Caixas ``(N, 4)``.
+        boxes_b (np.ndarray): Caixas ``(M, 4)``.
+
+    Returns:
+        np.ndarray: Matriz ``(N, M)`` de IoU.
+    """
+    if len(boxes_a) == 0 or len(boxes_b) == 0:
+        return np.zeros((len(boxes_a), len(boxes_b)))
+    a = np.asarray(boxes_a, dtype=float)[:, np.newaxis]
+    b = np.asarray(boxes_b, dtype=float)[np.newaxis]
+    width = np.clip(
+        np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None
+    )
+    height = np.clip(
+        np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None
+    )
+    intersection = width * height
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return intersection / np.maximum(area_a + area_b - intersection, 1e-6)
+
+
+def crop_quality(crop: np.ndarray) -> float:
+    """
+    Pontua a qualidade de um recorte para o OCR: nitidez vezes tamanho.
+
+    A nitidez é a variância do Laplaciano em tons de cinza, que cai com o
+    desfoque de movimento; recortes maiores têm mais pixels por caractere.
+
+    Args:
+        crop (np.ndarray): Recorte da placa em BGR.
+
+    Returns:
+        float: Pontuação; maior é melhor.
+    """
+    if crop.size == 0:
+        return 0.0
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+    return float(sharpness * np.sqrt(crop.shape[0] * crop.shape[1]))
+
+
+class PlateTrack:
+    """Uma placa acompanhada ao longo dos quadros, com os melhores recortes."""
+
+    def __init__(self, track_id: int, box: np.ndarray, frame_index: int):
+        """
+        Inicia o rastro a partir da primeira detecção.
+
+        Args:
+            track_id (int): Identificador do rastro.
+            box (np.ndarray): Caixa da detecção.
+            frame_index (int): Índice do quadro da detecção.
+        """
+        self.track_id = track_id
+        self.state = np.zeros((7, 1))
+        self.state[:4] = box_to_measurement(box)
+        self.covariance = INITIAL_COVARIANCE.copy()
+        self.hits = 1
+        self.misses = 0
+        self.first_frame = frame_index
+        self.last_frame = frame_index
+        # (qualidade, índice do quadro, recorte), do melhor para o pior
+        self.crops: List[Tuple[float, int, np.ndarray]] = []
+
+    def predict(self) -> np.ndarray:
+        """
+        Avança o filtro um quadro amostrado (velocidade constante).
+
+        Returns:
+            np.ndarray: Caixa prevista.
+        """
+        if self.state[2, 0] + self.state[6, 0] <= 0:
+            self.state[6, 0] = 0.0
+        transition = np.eye(7)
+        transition[0, 4] = transition[1, 5] = transition[2, 6] = 1.0
+        self.state = transition @ self.state
+        self.covariance = transition @ self.covariance @ transition.T + PROCESS_NOISE
+        return state_to_box(self.state)
+
+    def update(self, box: np.ndarray, frame_index: int) -> None:
+        """
+        Corrige o filtro com uma nova detecção associada ao rastro.
+
+        Args:
+            box (np.ndarray): Caixa da detecção.
+            frame_index (int): Índice do quadro da detecção.
+
+        Returns:
+            None
+        """
+        observation = np.eye(4, 7)
+        residual = box_to_measurement(box) - observation @ self.state
+        innovation = observation @ self.covariance @ observation.T + MEASUREMENT_NOISE
+        gain = self.covariance @ observation.T @ np.linalg.inv(innovation)
+        self.state = self.state + gain @ residual
+        self.covariance = (np.eye(7) - gain @ observation) @ self.covariance
+        self.hits += 1
+        self.misses = 0
+        self.last_frame = frame_index
+
+    def add_crop(self, crop: np.ndarray, frame_index: int, max_crops: int) -> None:
+        """
+        Guarda o recorte se ele estiver entre os ``max_crops`` melhores do rastro.
+
+        Args:
+            crop (np.ndarray): Recorte da placa em BGR.
+            frame_index (int): Índice do quadro do recorte.
+            max_crops (int): Quantidade de recortes mantidos.
+
+        Returns:
+            None
+        """
+        self.crops.append((crop_quality(crop), frame_index, crop.copy()))
+        self.crops.sort(key=lambda item: item[0], reverse=True)
+        del self.crops[max_crops:]
+
+
+class PlateTracker:
+    """
+    Rastreador no estilo SORT: filtro de Kalman por placa e associação por IoU.
+
+    A cada quadro amostrado os rastros são previstos, associados às detecções
+    pela maior IoU e corrigidos. Um rastro sem detecção por mais de ``max_age``
+    quadros amostrados termina; só os confirmados por ``min_hits`` detecções são
+    entregues, o que descarta falsos positivos isolados.
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = 0.3,
+        max_age: int = 5,
+        min_hits: int = 2,
+        max_crops: int = 3,
+    ):
+        """
+        Inicializa o rastreador sem rastros.
+
+        Args:
+            iou_threshold (float): IoU mínima para associar detecção e rastro.
+            max_age (int): Quadros amostrados sem detecção antes de encerrar.
+            min_hits (int): Detecções para um rastro ser entregue.
+            max_crops (int): Recortes guardados por rastro para o OCR.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.max_crops = max_crops
+        self.tracks: List[PlateTrack] = []
+        self._next_id = 0
+
+    def update(
+        self, frame: np.ndarray, boxes: np.ndarray, frame_index: int
+    ) -> List[PlateTrack]:
+        """
+        Processa as detecções de um quadro.
+
+        Args:
+            frame (np.ndarray): Quadro em BGR, de onde os recortes são tirados.
+            boxes (np.ndarray): Caixas ``(N, 4)`` detectadas no quadro.
+            frame_index (int): Índice do quadro no vídeo.
+
+        Returns:
+            List[PlateTrack]: Rastros encerrados neste quadro e confirmados.
+        """
+        predicted = np.array([track.predict() for track in self.tracks]).reshape(-1, 4)
+        ious = iou_matrix(predicted, boxes)
+
+        matched_tracks, matched_boxes = set(), set()
+        # Associação gulosa pela maior IoU; com poucas placas por quadro o
+        # resultado é o mesmo do algoritmo húngaro
+        for flat in np.argsort(ious, axis=None)[::-1]:
+            track_index, box_index = np.unravel_index(flat, ious.shape)
+            if ious[track_index, box_index] < self.iou_threshold:
+                break
+            if track_index in matched_tracks or box_index in matched_boxes:
+                continue
+            matched_tracks.add(track_index)
+            matched_boxes.add(box_index)
+            track = self.tracks[track_index]
+            track.update(boxes[box_index], frame_index)
+            self._add_crop(track, frame, boxes[box_index], frame_index)
+
+        for box_index, box in enumerate(boxes):
+            if box_index not in matched_boxes:
+                track = PlateTrack(self._next_id, box, frame_index)
+                self._next_id += 1
+                self._add_crop(track, frame, box, frame_index)
+                self.tracks.append(track)
+
+        finished = []
+        for track_index, track in enumerate(list(self.tracks)):
+            if track_index in matched_tracks or track.last_frame == frame_index:
+                continue
+            track.misses += 1
+            if track.misses > self.max_age:
+                self.tracks.remove(track)
+                if track.hits >= self.min_hits:
+                    finished.append(track)
+        return finished
+
+    def flush(self) -> List[PlateTrack]:
+        """
+        Encerra todos os rastros em aberto, no fim do vídeo.
+
+        Returns:
+            List[PlateTrack]: Rastros confirmados que ainda estavam abertos.
+        """
+        finished = [track for track in self.tracks if track.hits >= self.min_hits]
+        self.tracks = []
+        return finished
+
+    def _add_crop(
+        self, track: PlateTrack, frame: np.ndarray, box: np.ndarray, frame_index: int
+    ) -> None:
+        """Recorta a placa do quadro e a oferece ao rastro."""
+        x_min, y_min, x_max, y_max = np.asarray(box, dtype=int)
+        track.add_crop(frame[y_min:y_max, x_min:x_max], frame_index, self.max_crops)
+
+
+def vote_texts(leituras: List[Tuple[str, float]]) -> Optional[Tuple[str, float]]:
+    """
+    Combina as leituras de um rastro por votação ponderada pela confiança.
+
+    Entre as leituras do comprimento mais votado (7 nas placas brasileiras), cada
+    posição fica com o caractere de maior confiança somada, o que corrige um
+    caractere errado em um recorte com os outros. A confiança final é a média,
+    por posição, das confianças das leituras que concordaram com o caractere
+    escolhido, contando como zero as que discordaram.
+
+    Args:
+        leituras (List[Tuple[str, float]]): Texto e confiança de cada recorte.
+
+    Returns:
+        Optional[Tuple[str, float]]: Texto votado e confiança, ou None se não
+        houver leituras com texto.
+    """
+    leituras = [(texto, acuracia) for texto, acuracia in leituras if texto]
+    if not leituras:
+        return None
+
+    pesos_por_tamanho: Dict[int, float] = defaultdict(float)
+    for texto, acuracia in leituras:
+        pesos_por_tamanho[len(texto)] += acuracia
+    tamanho = max(pesos_por_tamanho, key=pesos_por_tamanho.get)
+    leituras = [
+        (texto, acuracia) for texto, acuracia in leituras if len(texto) == tamanho
+    ]
+
+    texto_votado = []
+    concordancia = []
+    for posicao in range(tamanho):
+        votos: Dict[str, float] = defaultdict(float)
+        for texto, acuracia in leituras:
+            votos[texto[posicao]] += acuracia
+        caractere = max(votos, key=votos.get)
+        texto_votado.append(caractere)
+        concordancia.append(votos[caractere] / len(leituras))
+
+    return "".join(texto_votado), float(np.mean(concordancia))
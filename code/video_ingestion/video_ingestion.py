@@ -0,0 +1,344 @@
+"""Módulo com a ingestão de vídeo: detecção em quadros amostrados e OCR por veículo."""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+from local_store import LocalDynamoDB, LocalS3Client
+from metrics import Metrics, get_logger
+from motion_gate import MOTION_GATE_KEYFRAME_EVERY, MotionGate, parse_roi
+from ocr_plate_detection import OCRPlateDetection
+from plate_detection import (
+    MAX_BATCH_SIZE,
+    PLATE_ARCHIVE_PREFIX,
+    PlateDetection,
+    plate_url,
+)
+from tracker import PlateTrack, PlateTracker, vote_texts
+
+logger = get_logger(__name__)
+
+VIDEO_SAMPLE_EVERY = int(os.environ.get("VIDEO_SAMPLE_EVERY", "3"))
+VIDEO_BEST_CROPS = int(os.environ.get("VIDEO_BEST_CROPS", "3"))
+
+Frame = Tuple[int, np.ndarray]
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Agrupa os itens de um iterável em listas de até ``size`` elementos.
+
+    Args:
+        items (Iterable[Any]): Itens de entrada.
+        size (int): Tamanho máximo de cada lista.
+
+    Yields:
+        List[Any]: Próximo grupo de itens.
+    """
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def track_crop_key(video_key: str, track_id: int) -> str:
+    """
+    Monta a chave do recorte escolhido para um rastro.
+
+    O recorte fica sob ``PLATE_ARCHIVE_PREFIX``: o texto já foi votado aqui, então
+    ele não deve acionar o lambda_ocr.
+
+    Args:
+        video_key (str): Chave (ou nome) do vídeo.
+        track_id (int): Identificador do rastro.
+
+    Returns:
+        str: Chave do recorte no bucket de placas.
+    """
+    root, _ = os.path.splitext(os.path.basename(video_key))
+    return f"{PLATE_ARCHIVE_PREFIX}{root}_track{track_id}.jpg"
+
+
+class VideoIngestion:
+    """
+    Lê um vídeo, detecta placas em quadros amostrados e reconhece cada veículo.
+
+    O modelo do ``PlateDetection`` roda em lotes de quadros; as detecções
+    alimentam o ``PlateTracker`` e, quando um rastro termina, só os seus
+    melhores recortes vão ao OCR. As leituras são combinadas por votação e cada
+    rastro gera um único item no DynamoDB, com o melhor recorte no bucket de
+    placas (sem os metadados de OCR, então o lambda_ocr o ignora).
+    """
+
+    def __init__(
+        self,
+        detection: PlateDetection,
+        ocr_detection: OCRPlateDetection,
+        tracker: Optional[PlateTracker] = None,
+        sample_every: int = VIDEO_SAMPLE_EVERY,
+    ):
+        """
+        Inicializa a ingestão.
+
+        Args:
+            detection (PlateDetection): Detector com o modelo e a persistência.
+            ocr_detection (OCRPlateDetection): Motor de OCR.
+            tracker (Optional[PlateTracker]): Rastreador; por padrão, um novo com
+                ``VIDEO_BEST_CROPS`` recortes por rastro.
+            sample_every (int): Um a cada quantos quadros vai para a detecção.
+        """
+        self.detection = detection
+        self.ocr_detection = ocr_detection
+        self.tracker = tracker or PlateTracker(max_crops=VIDEO_BEST_CROPS)
+        self.sample_every = max(sample_every, 1)
+        self.metrics = detection.metrics
+
+    def read_frames(self, source: Union[str, int]) -> Iterator[Frame]:
+        """
+        Lê os quadros amostrados de um arquivo, stream ou câmera.
+
+        Os quadros fora da amostragem são só avançados (``grab``), sem
+        decodificação.
+
+        Args:
+            source (Union[str, int]): Caminho, URL (ex.: RTSP) ou índice da câmera
+                aceito pelo ``cv2.VideoCapture``.
+
+        Yields:
+            Frame: Índice do quadro no vídeo e o quadro em BGR.
+
+        Raises:
+            ValueError: Se a fonte não puder ser aberta.
+        """
+        capture = cv2.VideoCapture(source)
+        if not capture.isOpened():
+            raise ValueError(f"Não foi possível abrir o vídeo {source}")
+        try:
+            index = 0
+            while True:
+                if index % self.sample_every:
+                    if not capture.grab():
+                        break
+                    self.metrics.count("frames_read")
+                else:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    self.metrics.count("frames_read")
+                    self.metrics.count("frames_sampled")
+                    yield index, frame
+                index += 1
+        finally:
+            capture.release()
+
+    def run(
+        self, frames: Iterable[Frame], video_key: str, video_path: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Processa os quadros de um vídeo e grava um resultado por veículo.
+
+        Args:
+            frames (Iterable[Frame]): Quadros a detectar, como os de
+                ``read_frames``.
+            video_key (str): Chave de partição dos itens no DynamoDB.
+            video_path (str): Origem do vídeo, gravada como ``image_path``.
+
+        Returns:
+            List[Dict[str, Any]]: Os atributos gravados de cada rastro.
+        """
+        resultados = []
+        for batch in batched(frames, MAX_BATCH_SIZE):
+            with self.metrics.span("inference"):
+                boxes_list = self.detection.backend.predict(
+                    [frame for _, frame in batch]
+                )
+            self.metrics.count("inference_images", len(batch))
+
+            for (index, frame), boxes in zip(batch, boxes_list):
+                finished = self.tracker.update(frame, boxes, index)
+                if finished:
+                    resultados.extend(
+                        self.recognize_tracks(finished, video_key, video_path)
+                    )
+
+        resultados.extend(
+            self.recognize_tracks(self.tracker.flush(), video_key, video_path)
+        )
+        return resultados
+
+    def recognize_tracks(
+        self, tracks: List[PlateTrack], video_key: str, video_path: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Reconhece os melhores recortes dos rastros encerrados e grava o voto.
+
+        Args:
+            tracks (List[PlateTrack]): Rastros encerrados.
+            video_key (str): Chave de partição dos itens no DynamoDB.
+            video_path (str): Origem do vídeo, gravada como ``image_path``.
+
+        Returns:
+            List[Dict[str, Any]]: Os atributos gravados de cada rastro.
+        """
+        if not tracks:
+            return []
+
+        # Os recortes saem do quadro em BGR, a ordem recebida pelo recognize_batch
+        crops = [crop for track in tracks for _, _, crop in track.crops]
+        with self.metrics.span("ocr"):
+            leituras_ocr = iter(self.ocr_detection.recognize_batch(crops))
+        self.metrics.count("tracks", len(tracks))
+        self.metrics.count("ocr_crops", len(crops))
+
+        base_time = datetime.utcnow()
+        gravados = []
+        for offset, track in enumerate(tracks):
+            leituras = [
+                (resultado["detected_text"][0], float(resultado["plate_accuracy"][0]))
+                for resultado in (next(leituras_ocr) for _ in track.crops)
+                if resultado
+            ]
+            voto = vote_texts(leituras)
+            resultado = None
+            if voto:
+                texto, acuracia = voto
+                resultado = self.ocr_detection.build_result(
+                    [texto], [Decimal(str(round(acuracia, 6)))]
+                )
+            gravados.append(
+                self.save_track(
+                    track,
+                    video_key,
+                    video_path,
+                    (base_time + timedelta(microseconds=offset)).isoformat(),
+                    resultado,
+                )
+            )
+            logger.info(
+                f"Rastro {track.track_id} (quadros {track.first_frame}-"
+                f"{track.last_frame}): {leituras} -> {voto}"
+            )
+        return gravados
+
+    def save_track(
+        self,
+        track: PlateTrack,
+        video_key: str,
+        video_path: str,
+        timestamp: str,
+        resultado: Optional[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Grava o melhor recorte de um rastro e o seu item no DynamoDB.
+
+        Args:
+            track (PlateTrack): Rastro encerrado.
+            video_key (str): Chave de partição do item.
+            video_path (str): Origem do vídeo, gravada como ``image_path``.
+            timestamp (str): Sort key do item.
+            resultado (Optional[Dict[str, Any]]): Atributos do OCR, se houver.
+
+        Returns:
+            Dict[str, Any]: Os atributos extras gravados no item.
+        """
+        plate_key = track_crop_key(video_key, track.track_id)
+        self.detection.upload_crop(track.crops[0][2], plate_key)
+        atributos = {
+            "track_id": track.track_id,
+            "first_frame": track.first_frame,
+            "last_frame": track.last_frame,
+            "ocr_crops": len(track.crops),
+            **(resultado or {}),
+        }
+        self.detection.save_image_data(
+            video_key, video_path, plate_url(plate_key), 1, timestamp, atributos
+        )
+        return atributos
+
+
+def build_ingestion(
+    store: str, local_root: str, model_dir: str, sample_every: int
+) -> VideoIngestion:
+    """
+    Cria a ingestão com o detector, o OCR e a persistência escolhida.
+
+    Args:
+        store (str): ``aws`` para S3/DynamoDB reais ou ``local`` para o disco.
+        local_root (str): Diretório dos dados quando ``store`` é ``local``.
+        model_dir (str): Diretório dos arquivos do modelo de detecção.
+        sample_every (int): Um a cada quantos quadros vai para a detecção.
+
+    Returns:
+        VideoIngestion: Ingestão pronta para uso.
+    """
+    s3_client, dynamodb = None, None
+    if store == "local":
+        s3_client = LocalS3Client(os.path.join(local_root, "s3"))
+        dynamodb = LocalDynamoDB(os.path.join(local_root, "dynamodb"))
+
+    detection = PlateDetection(
+        s3_client=s3_client,
+        dynamodb=dynamodb,
+        model_dir=model_dir,
+        metrics=Metrics("video"),
+    )
+    ocr_detection = OCRPlateDetection(
+        detection.s3_client, detection.dynamodb, detection.metrics
+    )
+    return VideoIngestion(detection, ocr_detection, sample_every=sample_every)
+
+
+def main() -> None:
+    """Processa um vídeo e imprime o resultado de cada veículo."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--source", required=True, help="Arquivo, URL ou índice da câmera."
+    )
+    parser.add_argument("--key", help="Chave dos itens (padrão: nome da fonte).")
+    parser.add_argument("--sample-every", type=int, default=VIDEO_SAMPLE_EVERY)
+    parser.add_argument(
+        "--motion-gate",
+        choices=["off", "diff", "mog2"],
+        default="off",
+        help="Descarta quadros sem movimento antes da detecção.",
+    )
+    parser.add_argument("--roi", help="Região de interesse x,y,largura,altura (0-1).")
+    parser.add_argument(
+        "--keyframe-every", type=int, default=MOTION_GATE_KEYFRAME_EVERY
+    )
+    parser.add_argument("--store", choices=["aws", "local"], default="aws")
+    parser.add_argument("--local-root", default="./local_store")
+    parser.add_argument("--model-dir", default=os.environ.get("PLATE_MODEL_DIR", "."))
+    args = parser.parse_args()
+
+    source: Union[str, int] = int(args.source) if args.source.isdigit() else args.source
+    video_key = args.key or os.path.basename(str(args.source))
+    ingestion = build_ingestion(
+        args.store, args.local_root, args.model_dir, args.sample_every
+    )
+    frames = ingestion.read_frames(source)
+    if args.motion_gate != "off":
+        frames = MotionGate(
+            args.motion_gate,
+            roi=parse_roi(args.roi),
+            keyframe_every=args.keyframe_every,
+            metrics=ingestion.metrics,
+        )(frames)
+    try:
+        resultados = ingestion.run(frames, video_key, str(args.source))
+    finally:
+        ingestion.metrics.flush(Source=str(args.source))
+    print(json.dumps(resultados, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()